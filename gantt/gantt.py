@@ -30,9 +30,18 @@ __author__ = 'Alexandre Norman (norman at xael.org)'
 __version__ = '0.5.0'
 __last_modification__ = '2016.02.01'
 
+import array
+import bisect
 import codecs
+import collections
+import copy
 import datetime
+import heapq
 import logging
+import math
+import multiprocessing
+import os
+import re
 import sys
 import types
 
@@ -51,32 +60,501 @@ cm = 35.43307
 import dateutil.relativedelta
 
 
+def _open_svg_file(filename):
+    """
+    Returns (file object, True if it has to be closed by the caller) for
+    writing svg to filename
+
+    Keyword arguments:
+    filename -- string, filename to save to OR file object
+    """
+    test = False
+    import io
+
+    if sys.version_info[0] == 2:
+        test = type(filename) == types.FileType or type(filename) == types.InstanceType
+    elif sys.version_info[0] == 3:
+        test = type(filename) == io.TextIOWrapper
+
+    if test:
+        return (filename, False)
+    return (io.open(str(filename), mode='w', encoding='utf-8'), True)
+
+
 class _my_svgwrite_drawing_wrapper(svgwrite.Drawing):
     """
     Hack for beeing able to use a file descriptor as filename
     """
     def save(self, width='100%', height='100%'):
         """ Write the XML string to **filename**. """
-        test = False
-        import io
-
         # Fix height and width
         self['height'] = height
         self['width'] = width
-        
-        if sys.version_info[0] == 2:
-            test = type(self.filename) == types.FileType or type(self.filename) == types.InstanceType
-        elif sys.version_info[0] == 3:
-            test = type(self.filename) == io.TextIOWrapper
 
-        if test:
-            self.write(self.filename)
-        else:
-            fileobj = io.open(str(self.filename), mode='w', encoding='utf-8')
-            self.write(fileobj)
+        fileobj, close = _open_svg_file(self.filename)
+        self.write(fileobj)
+        if close:
             fileobj.close()
 
 
+# Shapes drawn again and again, in mm from their insertion point, see
+# _SvgElements.shape
+_SVG_SHAPES = {
+    'milestone': ('polygon', ((5, 2), (8, 5), (5, 8), (2, 5))),
+    'critical-milestone': ('polygon', ((5, 1), (9, 5), (5, 9), (1, 5))),
+    'mark': ('rect', (5, 8)),
+    'modified-mark': ('rect', (5, 4)),
+    'day-mark': ('rect', (4, 8)),
+    }
+
+
+class _SvgElements(object):
+    """
+    Base of factories of svg elements. Subclasses give constructors with
+    svgwrite signatures : Group, Marker, Pattern, Circle, Line, Path, Polygon,
+    Rect, Text, Use and Style.
+    """
+    @classmethod
+    def shape(cls, name, x, y, **extra):
+        """
+        Returns the shape name of _SVG_SHAPES inserted at (x, y)
+
+        Keyword arguments:
+        name -- string, key of _SVG_SHAPES
+        x -- number, abscissa in mm
+        y -- number, ordinate in mm
+        extra -- svg attributes of the shape
+        """
+        kind, geometry = _SVG_SHAPES[name]
+        if kind == 'polygon':
+            return cls.Polygon(points=[((x+px)*mm, (y+py)*mm) for px, py in geometry], **extra)
+        return cls.Rect(insert=(x*mm, y*mm), size=(geometry[0]*mm, geometry[1]*mm), **extra)
+
+    @classmethod
+    def dependency_marker(cls, svg):
+        """
+        Adds the marker ending a dependency line to svg and returns the
+        reference to it
+        """
+        marker = cls.Marker(insert=(5,5), size=(10,10))
+        marker.add(cls.Circle((5, 5), r=5, fill='#000000', opacity=0.5, stroke_width=0))
+        svg.add(marker)
+        return marker.get_funciri()
+
+
+class _SvgwriteElements(_SvgElements):
+    """
+    svgwrite elements, used by the svgwrite renderer
+    """
+    Group = svgwrite.container.Group
+    Marker = svgwrite.container.Marker
+    Pattern = svgwrite.pattern.Pattern
+    Circle = svgwrite.shapes.Circle
+    Line = svgwrite.shapes.Line
+    Path = svgwrite.path.Path
+    Polygon = svgwrite.shapes.Polygon
+    Rect = svgwrite.shapes.Rect
+    Text = svgwrite.text.Text
+    Use = svgwrite.container.Use
+    Style = svgwrite.container.Style
+
+
+def _svg_escape(value, attribute=False):
+    """
+    Escape value as ElementTree does it for character data or attributes
+    """
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if attribute:
+        if '"' in value:
+            value = value.replace('"', '&quot;')
+        if '\r' in value:
+            value = value.replace('\r', '&#13;')
+        if '\n' in value:
+            value = value.replace('\n', '&#10;')
+        if '\t' in value:
+            value = value.replace('\t', '&#09;')
+    return value
+
+
+class _SvgElement(object):
+    """
+    Lightweight svg element, used by the streaming renderer. It is written
+    exactly as svgwrite would write the same element, but without building
+    nor validating a DOM.
+    """
+    __slots__ = ('elementname', 'attribs', 'elements', 'text')
+
+    def __init__(self, elementname, text=None, **extra):
+        """
+        Keyword arguments:
+        elementname -- string, svg tag of the element
+        text -- string, text content of the element
+        extra -- svg attributes, '_' in names are written as '-'
+        """
+        self.elementname = elementname
+        self.text = text
+        self.elements = []
+        self.attribs = {}
+        for key, value in extra.items():
+            self.attribs[key.rstrip('_').replace('_', '-')] = value
+        return
+
+    def __setitem__(self, key, value):
+        self.attribs[key] = value
+        return
+
+    def add(self, element):
+        """
+        Add a child element and returns it
+        """
+        self.elements.append(element)
+        return element
+
+    def get_funciri(self):
+        """
+        Returns 'url(#id)' reference to the element
+        """
+        return 'url(#{0})'.format(self.attribs['id'])
+
+    def start_tag(self):
+        """
+        Returns the start tag of the element, without its closing '>'
+        """
+        parts = ['<', self.elementname]
+        for key, value in sorted(self.attribs.items()):
+            if value is None:
+                continue
+            if isinstance(value, (int, float)):
+                value = str(value)
+            if value:
+                parts.append(' %s="%s"' % (key, _svg_escape(value, attribute=True)))
+        return ''.join(parts)
+
+    def tostring(self):
+        """
+        Returns the element and its children as svg
+        """
+        if not self.text and len(self.elements) == 0:
+            return self.start_tag() + ' />'
+        parts = [self.start_tag(), '>']
+        if self.text:
+            parts.append(_svg_escape(self.text))
+        for element in self.elements:
+            parts.append(element.tostring())
+        parts.append('</{0}>'.format(self.elementname))
+        return ''.join(parts)
+
+
+class _SvgCData(object):
+    """
+    CDATA section in a _SvgElement, as svgwrite writes it
+    """
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+        return
+
+    def tostring(self):
+        return '<![CDATA[{0}]]>'.format(self.text)
+
+
+class _StreamElements(_SvgElements):
+    """
+    _SvgElement factories with svgwrite signatures, used by the streaming
+    renderer
+    """
+    @staticmethod
+    def Group(**extra):
+        return _SvgElement('g', **extra)
+
+    @staticmethod
+    def Marker(insert=None, size=None, **extra):
+        element = _SvgElement('marker', **extra)
+        if insert is not None:
+            element['refX'] = insert[0]
+            element['refY'] = insert[1]
+        if size is not None:
+            element['markerWidth'] = size[0]
+            element['markerHeight'] = size[1]
+        if 'id' not in element.attribs:
+            # same sequence of ids as svgwrite
+            element['id'] = svgwrite.utils.AutoID.next_id()
+        return element
+
+    @staticmethod
+    def Pattern(insert=None, size=None, **extra):
+        element = _SvgElement('pattern', **extra)
+        if insert is not None:
+            element['x'] = insert[0]
+            element['y'] = insert[1]
+        if size is not None:
+            element['width'] = size[0]
+            element['height'] = size[1]
+        return element
+
+    @staticmethod
+    def Circle(center=(0, 0), r=1, **extra):
+        return _SvgElement('circle', cx=center[0], cy=center[1], r=r, **extra)
+
+    @staticmethod
+    def Line(start=(0, 0), end=(0, 0), **extra):
+        return _SvgElement('line', x1=start[0], y1=start[1], x2=end[0], y2=end[1], **extra)
+
+    @staticmethod
+    def Path(d=None, **extra):
+        return _SvgElement('path', d=d, **extra)
+
+    @staticmethod
+    def Polygon(points=[], **extra):
+        return _SvgElement('polygon', points=' '.join(['%s,%s' % (x, y) for x, y in points]), **extra)
+
+    @staticmethod
+    def Rect(insert=(0, 0), size=(1, 1), **extra):
+        return _SvgElement('rect', x=insert[0], y=insert[1], width=size[0], height=size[1], **extra)
+
+    @staticmethod
+    def Text(text, insert=None, **extra):
+        element = _SvgElement('text', text=text, **extra)
+        if insert is not None:
+            element['x'] = insert[0]
+            element['y'] = insert[1]
+        return element
+
+    @staticmethod
+    def Use(href, insert=None, **extra):
+        element = _SvgElement('use', **extra)
+        element['xlink:href'] = href
+        if insert is not None:
+            element['x'] = insert[0]
+            element['y'] = insert[1]
+        return element
+
+    @staticmethod
+    def Style(content='', **extra):
+        element = _SvgElement('style', **extra)
+        element['type'] = 'text/css'
+        element.add(_SvgCData(content))
+        return element
+
+
+# Presentation attributes written as css classes in compact svg
+_SVG_STYLES = ('fill', 'stroke', 'stroke_width', 'stroke_dasharray', 'opacity', 'font_family', 'font_size', 'font_weight', 'marker_end')
+
+
+class _CompactElements(object):
+    """
+    Factory of elements for compact svg, on top of _SvgwriteElements or
+    _StreamElements : presentation attributes become css classes written by
+    style(), dependencies share one marker and shapes are <use> of the
+    elements of defs. Lines and rectangles are written as shorter paths,
+    with lengths in mm, the unit of the viewbox, rounded to precision
+    digits.
+    """
+    def __init__(self, elements, precision=3):
+        """
+        Keyword arguments:
+        elements -- _SvgwriteElements or _StreamElements
+        precision -- int, number of digits of lengths
+        """
+        self.elements = elements
+        self.precision = precision
+        self._classes = {}
+        self._styles = []
+
+        # marker units are stroke widths, not mm
+        marker = elements.Marker(insert=(5,5), size=(10,10), id='gantt-dependency')
+        marker.add(elements.Circle((5, 5), r=5, **self._class({'fill':'#000000', 'opacity':0.5, 'stroke_width':0})))
+        self.defs = [marker]
+        for name, (kind, geometry) in sorted(_SVG_SHAPES.items()):
+            if kind == 'polygon':
+                self.defs.append(elements.Polygon(points=geometry, id='gantt-' + name))
+            else:
+                self.defs.append(elements.Rect(size=geometry, id='gantt-' + name))
+        return
+
+    def _mm(self, *values):
+        """
+        Returns values, in points, as rounded mm
+        """
+        rounded = []
+        for value in values:
+            value = round(value / mm, self.precision)
+            if value == int(value):
+                value = int(value)
+            rounded.append(value)
+        return rounded
+
+    def _class(self, extra):
+        """
+        Replaces presentation attributes of extra by a css class
+        """
+        style = []
+        for key in _SVG_STYLES:
+            value = extra.pop(key, None)
+            if value is None or value == '':
+                continue
+            if key in ('stroke_width', 'font_size') and isinstance(value, (int, float)):
+                value = '{0}px'.format(self._mm(value)[0])
+            style.append('{0}:{1}'.format(key.replace('_', '-'), value))
+        if len(style) > 0:
+            style = ';'.join(style)
+            if style not in self._classes:
+                self._classes[style] = 'c{0}'.format(len(self._styles))
+                self._styles.append(style)
+            extra['class_'] = self._classes[style]
+        return extra
+
+    def Group(self, **extra):
+        return self.elements.Group(**self._class(extra))
+
+    def Pattern(self, insert=None, size=None, **extra):
+        if insert is not None:
+            insert = self._mm(*insert)
+        if size is not None:
+            size = self._mm(*size)
+        return self.elements.Pattern(insert=insert, size=size, **self._class(extra))
+
+    def Line(self, start=(0, 0), end=(0, 0), **extra):
+        x1, y1, x2, y2 = self._mm(start[0], start[1], end[0], end[1])
+        if y1 == y2:
+            d = 'M{0} {1}H{2}'.format(x1, y1, x2)
+        elif x1 == x2:
+            d = 'M{0} {1}V{2}'.format(x1, y1, y2)
+        else:
+            d = 'M{0} {1}L{2} {3}'.format(x1, y1, x2, y2)
+        return self.elements.Path(d=d, **self._class(extra))
+
+    def Rect(self, insert=(0, 0), size=(1, 1), **extra):
+        x, y, width, height = self._mm(insert[0], insert[1], size[0], size[1])
+        if width <= 0 or height <= 0:
+            # not drawn as a rect, but would be as a path
+            return self.elements.Rect(insert=(x, y), size=(width, height), **self._class(extra))
+        return self.elements.Path(d='M{0} {1}h{2}v{3}h{4}z'.format(x, y, width, height, -width), **self._class(extra))
+
+    def Text(self, text, insert=None, **extra):
+        if insert is not None:
+            insert = self._mm(*insert)
+        return self.elements.Text(text, insert=insert, **self._class(extra))
+
+    def shape(self, name, x, y, **extra):
+        """
+        Returns a <use> of the shape name of defs inserted at (x, y) mm, see
+        _SvgElements.shape
+        """
+        return self.elements.Use('#gantt-' + name, insert=(x, y), **self._class(extra))
+
+    def dependency_marker(self, svg):
+        """
+        Returns the reference to the marker of defs ending dependency lines
+        """
+        return 'url(#gantt-dependency)'
+
+    def viewbox(self, width, height):
+        """
+        Returns the viewBox attribute of a drawing of width and height points
+        """
+        return '0 0 {0} {1}'.format(*self._mm(width, height))
+
+    def style(self):
+        """
+        Returns the <style> element of css classes used so far
+        """
+        # default stroke width is 1 point
+        rules = ['svg{{stroke-width:{0}px}}'.format(self._mm(1)[0])]
+        rules.extend(['.{0}{{{1}}}'.format(self._classes[style], style) for style in self._styles])
+        return self.elements.Style('\n'.join(rules))
+
+
+class _SvgStream(object):
+    """
+    Writes svg to a file as elements are drawn, used by the streaming
+    renderer. Groups are written when their first child is, so that empty
+    ones come out as svgwrite writes them.
+    """
+    def __init__(self, filename, width, height, defs=(), viewbox=None):
+        """
+        Opens filename and writes the svg header
+
+        Keyword arguments:
+        filename -- string, filename to save to OR file object
+        width -- float, width of the drawing
+        height -- float, height of the drawing
+        defs -- list of elements of <defs>
+        viewbox -- string, viewBox attribute of the svg
+        """
+        self.fileobj, self._close = _open_svg_file(filename)
+        self._groups = []
+        svg = _SvgElement('svg', baseProfile='full', version='1.1', width=width, height=height, viewBox=viewbox)
+        svg['xmlns'] = "http://www.w3.org/2000/svg"
+        svg['xmlns:xlink'] = "http://www.w3.org/1999/xlink"
+        svg['xmlns:ev'] = "http://www.w3.org/2001/xml-events"
+        self.fileobj.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+        self.fileobj.write(svg.start_tag() + '>')
+        if len(defs) == 0:
+            self.fileobj.write('<defs />')
+        else:
+            self.fileobj.write('<defs>' + ''.join([element.tostring() for element in defs]) + '</defs>')
+        return
+
+    def _write_groups(self, nb_groups):
+        """
+        Write start tags of the first nb_groups opened groups not written yet
+        """
+        for group in self._groups[:nb_groups]:
+            if not group[1]:
+                self.fileobj.write(group[0] + '>')
+                group[1] = True
+        return
+
+    def open_group(self, group=None):
+        """
+        Open a group, following elements are written in it
+
+        Keyword arguments:
+        group -- empty _SvgElement giving attributes of the group, if any
+        """
+        if group is None:
+            self._groups.append(['<g', False])
+        else:
+            self._groups.append([group.start_tag(), False])
+        return
+
+    def close_group(self):
+        """
+        Close the last opened group
+        """
+        if self._groups[-1][1]:
+            self.fileobj.write('</g>')
+        else:
+            self._write_groups(len(self._groups) - 1)
+            self.fileobj.write(self._groups[-1][0] + ' />')
+        self._groups.pop()
+        return
+
+    def add(self, element):
+        """
+        Write element in the current group
+        """
+        self._write_groups(len(self._groups))
+        self.fileobj.write(element.tostring())
+        return element
+
+    def close(self):
+        """
+        Close the svg and the file if it was opened here
+        """
+        self.fileobj.write('</svg>')
+        if self._close:
+            self.fileobj.close()
+        return
+
+
 
 ############################################################################
 
@@ -89,6 +567,47 @@ DRAW_WITH_WEEKLY_SCALE = 'w'
 DRAW_WITH_MONTHLY_SCALE = 'm'
 DRAW_WITH_QUATERLY_SCALE = 'q'
 
+SCHEDULE_WITH_PYTHON = 'python'
+SCHEDULE_WITH_NUMPY = 'numpy'
+
+# Renderers of make_svg_for_tasks and make_svg_for_resources
+RENDER_WITH_SVGWRITE = 'svgwrite'
+RENDER_WITH_STREAM = 'stream'
+
+# Scales of the zoom levels of Project.make_svg_tiles, from the widest
+TILE_SCALES = (DRAW_WITH_MONTHLY_SCALE, DRAW_WITH_WEEKLY_SCALE, DRAW_WITH_DAILY_SCALE)
+
+# Kinds of Output of Project.make_outputs
+OUTPUT_TASKS = 'tasks'
+OUTPUT_RESOURCES = 'resources'
+OUTPUT_CSV = 'csv'
+
+# Laws of durations of tasks, see Task.set_duration_distribution
+DISTRIBUTION_TRIANGULAR = 'triangular'
+DISTRIBUTION_PERT = 'pert'
+
+# States of resources in AvailabilityMatrix
+AVAILABILITY_FREE = 0
+AVAILABILITY_BUSY = 1
+AVAILABILITY_VACATION = 2
+AVAILABILITY_NOT_WORKED = 3
+
+# Reasons of ScheduleDiagnostic, see Project.diagnostics
+DIAGNOSTIC_VACATIONS = 'vacations'
+DIAGNOSTIC_DEPENDENCIES = 'dependencies'
+DIAGNOSTIC_LATE_START = 'late_start'
+DIAGNOSTIC_START_CHANGED = 'start_changed'
+DIAGNOSTIC_LATE_END = 'late_end'
+
+# logging level and message of each reason
+_DIAGNOSTIC_MESSAGES = {
+    DIAGNOSTIC_VACATIONS: (logging.WARNING, '** Due to vacations, Task "{0}", will not start on date {1} but {2}'),
+    DIAGNOSTIC_DEPENDENCIES: (logging.WARNING, '** Due to dependencies, Task "{0}", will not start on date {1} but {2}'),
+    DIAGNOSTIC_LATE_START: (logging.ERROR, '** Due to dependencies, Task "{0}", could not be finished on time (should start as last on {1} but will start on {2})'),
+    DIAGNOSTIC_START_CHANGED: (logging.WARNING, '** starting date for task "{0}" is changed from {1} to {2}'),
+    DIAGNOSTIC_LATE_END: (logging.WARNING, '** task "{0}" will not be finished on time : end_date is changed from {1} to {2}'),
+    }
+
 ############################################################################
 
 # Unworked days (0: Monday ... 6: Sunday)
@@ -104,6 +623,7 @@ def define_not_worked_days(list_of_days):
     """
     global NOT_WORKED_DAYS
     NOT_WORKED_DAYS = list_of_days
+    _reset_working_days()
     return
 
 
@@ -169,936 +689,5771 @@ def _font_attributes():
 # list of vacations as datetime (non worked days)
 VACATIONS = []
 
+# Repeated vacations (see add_vacations), computed on demand
+RECURRING_VACATIONS = []
+
 
 ############################################################################
 
 
-def add_vacations(start_date, end_date=None):
+class _Intervals(object):
     """
-    Add vacations to a resource begining at [start_date] to [end_date]
-    (included). If [end_date] is not defined, vacation will be for [start_date]
-    day only
-
-    Keyword arguments:
-    start_date -- datetime.date begining of vacation
-    end_date -- datetime.date end of vacation of vacation
+    Sorted list of disjoint intervals of days, adjacent or overlapping
+    intervals are merged when added. Used for storing vacations, days are
+    looked up with a binary search.
     """
-    __LOG__.debug('** add_vacations {0}'.format({'start_date':start_date, 'end_date':end_date}))
-
-    global VACATIONS
-    
-    if end_date is None:
-        if start_date not in VACATIONS:
-            VACATIONS.append(start_date)
-    else:
-        while start_date <= end_date:
-            if start_date not in VACATIONS:
-                VACATIONS.append(start_date)
-                
-            start_date += datetime.timedelta(days=1)
-
-    __LOG__.debug('** add_vacations {0}'.format({'start_date':start_date, 'end_date':end_date, 'vac':VACATIONS}))
+    def __init__(self):
+        """
+        Init an empty list of intervals
+        """
+        # first and last days (included) of each interval
+        self.starts = []
+        self.ends = []
+        # number of items of the source list already added and version of
+        # the source they were added from, see update_from
+        self.nb_source = 0
+        self.version = None
+        return
 
-    return
 
-############################################################################
+    def add(self, dfrom, dto=None):
+        """
+        Add interval [dfrom, dto] (included), merging it with overlapping or
+        adjacent intervals
 
-def init_log_to_sysout(level=logging.INFO):
-    """
-    Init global variable __LOG__ used for logging purpose
+        Keyword arguments:
+        dfrom -- datetime.date first day
+        dto -- datetime.date last day, default dfrom
+        """
+        if dto is None:
+            dto = dfrom
+        if dto < dfrom:
+            return
+        one_day = datetime.timedelta(days=1)
+        # intervals [i, j) overlap or touch the new one
+        i = bisect.bisect_left(self.ends, dfrom - one_day)
+        j = bisect.bisect_right(self.starts, dto + one_day)
+        if i < j:
+            dfrom = min(dfrom, self.starts[i])
+            dto = max(dto, self.ends[j - 1])
+        self.starts[i:j] = [dfrom]
+        self.ends[i:j] = [dto]
+        return
 
-    Keyword arguments:
-    level -- logging level (from logging.debug to logging.critical)
-    """
-    global __LOG__
-    logger = logging.getLogger("Gantt")
-    logger.setLevel(level)
-    fh = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
-    __LOG__ = logging.getLogger("Gantt")
-    return
 
-############################################################################
+    def update_from(self, source, version=None):
+        """
+        Add items appended to source since last call. Items are either
+        datetime.date or (dfrom, dto) tuples. If source has shrunk or its
+        version changed, intervals are rebuilt from scratch.
 
-def _show_version(name, **kwargs):
-    """
-    Show version
-    """
-    import os
-    print("{0} version {1}".format(os.path.basename(name), __version__))
-    return True
+        Keyword arguments:
+        source -- list of datetime.date or of tuples of datetime.date
+        version -- int, version of source, bumped when it is changed
+                   otherwise than by appending items, default None
+        """
+        if len(source) < self.nb_source or version != self.version:
+            self.starts = []
+            self.ends = []
+            self.nb_source = 0
+            self.version = version
+
+        if len(source) > self.nb_source:
+            for item in source[self.nb_source:]:
+                if isinstance(item, tuple):
+                    self.add(item[0], item[1])
+                else:
+                    self.add(item)
+            self.nb_source = len(source)
+        return self
 
 
-############################################################################
+    def contains(self, day):
+        """
+        Returns True if day is in one of the intervals
 
+        Keyword arguments:
+        day -- datetime.date
+        """
+        i = bisect.bisect_right(self.starts, day) - 1
+        return i >= 0 and self.ends[i] >= day
 
-def _flatten(l, ltypes=(list, tuple)):
-    """
-    Return a flatten list from a list like [1,2,[4,5,1]]
-    """
-    ltype = type(l)
-    l = list(l)
-    i = 0
-    while i < len(l):
-        while isinstance(l[i], ltypes):
-            if not l[i]:
-                l.pop(i)
-                i -= 1
-                break
-            else:
-                l[i:i + 1] = l[i]
-        i += 1
-    return ltype(l)
 
-############################################################################
-class GroupOfResources(object):
-    """
-    Class for grouping resources
-    """
-    def __init__(self, name, fullname=None):
+    def gaps(self, dfrom, dto):
         """
-        Init a group of resource resource
+        Returns list of (first, last) intervals of days between dfrom and dto
+        (included) which are not covered
 
         Keyword arguments:
-        name -- name given to the resource (id)
-        fullname -- long name given to the resource
+        dfrom -- datetime.date first day
+        dto -- datetime.date last day
         """
-        __LOG__.debug('** GroupOfResources::__init__ {0}'.format({'name':name}))
-        self.name = name
-        self.vacations = []
-        if fullname is not None:
-            self.fullname = fullname
-        else:
-            self.fullname = name
+        one_day = datetime.timedelta(days=1)
+        result = []
+        cday = dfrom
+        i = bisect.bisect_left(self.ends, dfrom)
+        while cday <= dto:
+            if i >= len(self.starts) or self.starts[i] > dto:
+                result.append((cday, dto))
+                break
+            if self.starts[i] > cday:
+                result.append((cday, self.starts[i] - one_day))
+            cday = self.ends[i] + one_day
+            i += 1
+        return result
 
-        self.resources = []
 
-        self.tasks = []
-        return
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
 
-    def add_resource(self, resource):
-        """
-        Add a resource to the group of resources
 
-        Keyword arguments:
-        resource -- Resource object
-        """
-        if resource not in self.resources:
-            self.resources.append(resource)
-            resource.add_group(self)
-        return
+    def __len__(self):
+        return len(self.starts)
+
+
+
+def _add_months(day, months):
+    """
+    Returns day moved by a number of months, on the last day of the month
+    if it is too short
+
+    Keyword arguments:
+    day -- datetime.date
+    months -- int, number of months
+    """
+    m = day.year * 12 + day.month - 1 + months
+    year, month = m // 12, m % 12 + 1
+    if month == 12:
+        month_end = datetime.date(year, 12, 31)
+    else:
+        month_end = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)
+    return datetime.date(year, month, min(day.day, month_end.day))
 
 
-    def add_vacations(self, dfrom, dto=None):
+class _Recurrence(object):
+    """
+    Vacations repeated every n days, weeks, months or years, up to an
+    optional last day. Occurrences are computed when looked for, they are
+    never stored.
+    """
+    def __init__(self, dfrom, dto=None, repeat='+1w', until=None):
         """
-        Add vacations to a resource begining at [dfrom] to [dto] (included). If
-        [dto] is not defined, vacation will be for [dfrom] day only
+        Init repeated vacations
 
         Keyword arguments:
-        dfrom -- datetime.date begining of vacation
-        dto -- datetime.date end of vacation of vacation
+        dfrom -- datetime.date, first day of the first vacations
+        dto -- datetime.date, last day of the first vacations, default dfrom
+        repeat -- string, org-mode like repeater : number and unit (d, w, m, y)
+                  optionally preceded by +, ++ or .+ (ie '+1w', '++1y', '2m')
+        until -- datetime.date, no vacation after this day, default None
         """
-        __LOG__.debug('** Resource::add_vacations {0}'.format({'name':self.name, 'dfrom':dfrom, 'dto':dto}))
         if dto is None:
-            self.vacations.append((dfrom, dfrom))
-        else:
-            self.vacations.append((dfrom, dto))
+            dto = dfrom
+        m = re.match(r'^(\.\+|\+\+|\+)?([1-9][0-9]*)([dwmy])$', repeat.strip())
+        if m is None:
+            raise ValueError('Bad repeater for vacations: {0} (should be like +1w, ++1y or 2m)'.format(repeat))
+        if dto < dfrom:
+            raise ValueError('Vacations end before they begin: {0} - {1}'.format(dfrom, dto))
+        self.dfrom = dfrom
+        self.length = (dto - dfrom).days
+        self.every = int(m.group(2))
+        self.unit = m.group(3)
+        self.until = until
         return
 
 
-
-    def nb_elements(self):
+    def _start(self, k):
         """
-        Returns the number of resources
+        Returns first day of the kth occurrence (0 for the first one)
         """
-        __LOG__.debug('** GroupOfResources::nb_elements ({0})'.format({'name':self.name}))
-        return len(self.resources)
+        if self.unit == 'd':
+            return self.dfrom + datetime.timedelta(days=k * self.every)
+        elif self.unit == 'w':
+            return self.dfrom + datetime.timedelta(days=7 * k * self.every)
+        elif self.unit == 'm':
+            return _add_months(self.dfrom, k * self.every)
+        return _add_months(self.dfrom, 12 * k * self.every)
 
 
+    def _first_index(self, day):
+        """
+        Returns the index of the first occurrence ending on day or after
+        """
+        target = day - datetime.timedelta(days=self.length)
+        if self.unit in ('d', 'w'):
+            step = self.every * (7 if self.unit == 'w' else 1)
+            return max(0, -(-(target - self.dfrom).days // step))
+
+        step = self.every * (12 if self.unit == 'y' else 1)
+        months = (target.year - self.dfrom.year) * 12 + target.month - self.dfrom.month
+        k = max(0, months // step)
+        while self._start(k) < target:
+            k += 1
+        while k > 0 and self._start(k - 1) >= target:
+            k -= 1
+        return k
+
+
+    def occurrences(self, dfrom, dto):
+        """
+        Yields (first day, last day) of each occurrence between dfrom and dto
 
-    def is_available(self, date):
+        Keyword arguments:
+        dfrom -- datetime.date, first day to look at
+        dto -- datetime.date, last day to look at
         """
-        Returns True if any resource is available at given date, False if not.
-        Availibility is taken from the global VACATIONS and resource's ones.
+        k = self._first_index(dfrom)
+        while True:
+            start = self._start(k)
+            if start > dto or (self.until is not None and start > self.until):
+                return
+            end = start + datetime.timedelta(days=self.length)
+            if self.until is not None and end > self.until:
+                end = self.until
+            if end >= dfrom:
+                yield (start, end)
+            k += 1
+
+
+    def contains(self, day):
+        """
+        Returns True if day is in one of the occurrences
 
         Keyword arguments:
-        date -- datetime.date day to look for
+        day -- datetime.date
         """
-        # Global VACATIONS
-        if date in VACATIONS:
-            __LOG__.debug('** GroupOfResources::is_available {0} : False (global vacation)'.format({'name':self.name, 'date':date}))
-            return False
+        for occurrence in self.occurrences(day, day):
+            return True
+        return False
 
-        # Group vacations
-        for h in self.vacations:
-            dfrom, dto = h
-            if date >= dfrom and date <= dto:
-                __LOG__.debug('** GroupOfResources::is_available {0} : False (group vacation)'.format({'name':self.name, 'date':date}))
-                return False
 
-        # Test if at least one resource is avalaible
-        for r in self.resources:
-            if r.is_available(date):
-                __LOG__.debug('** GroupOfResources::is_available {0} : True {1}'.format({'name':self.name, 'date':date}, r.name))
-                return True
-
-        __LOG__.debug('** GroupOfResources::is_available {0} : False'.format({'name':self.name, 'date':date}))
-        return False
 
+_VACATIONS_INTERVALS = _Intervals()
 
-    def add_task(self, task):
-        """
-        Tell the resource that we have assigned a task
 
-        Keyword arguments:
-        task -- Task object
-        """
-        if task not in self.tasks:
-            self.tasks.append(task)
-        return
+def _global_vacations():
+    """
+    Returns global VACATIONS as _Intervals
+    """
+    return _VACATIONS_INTERVALS.update_from(VACATIONS, _CALENDAR_VERSION)
 
 
-    def search_for_task_conflicts(self, all_tasks = False):
-        """
-        Returns a dictionnary of all days (datetime.date) containing for each
-        overcharged day the list of task for this day.
+def add_vacations(start_date, end_date=None, repeat=None, until=None):
+    """
+    Add vacations to a resource begining at [start_date] to [end_date]
+    (included). If [end_date] is not defined, vacation will be for [start_date]
+    day only
 
-        It examines all resources member and group tasks.
+    If [repeat] is given, vacations are repeated (every week for '+1w', every
+    two months for '+2m'...) until [until] if given. They are kept in
+    RECURRING_VACATIONS.
 
-        Keyword arguments:
-        all_tasks -- if True return all tasks for all days, not just overcharged days
-        """
-        # Get for each resource
-        affected_days = {}
-        for r in self.resources:
-            ad = r.search_for_task_conflicts(all_tasks = True)
-            for d in ad:
-                try:
-                    affected_days[d].append(ad[d])
-                except KeyError:
-                    affected_days[d] = [ ad[d] ]
+    Keyword arguments:
+    start_date -- datetime.date begining of vacation
+    end_date -- datetime.date end of vacation of vacation
+    repeat -- string, org-mode like repeater ('+1d', '+1w', '++1m', '.+1y'...), default None
+    until -- datetime.date, last day of repeated vacations, default None
+    """
+    _DEFAULT_CONTEXT.add_vacations(start_date, end_date, repeat, until)
+    return
 
-        # inspect project
-        for t in self.tasks:
-            cday = t.start_date()
-            while cday <= t.end_date():
-                if cday.weekday() not in _not_worked_days():
-                    try:
-                        affected_days[cday].append(t.fullname)
-                    except KeyError:
-                        affected_days[cday] = [t.fullname]
-                  
-                cday += datetime.timedelta(days=1)
+############################################################################
 
 
-        # compile everything
-        overcharged_days = {}
-        ke = list(affected_days.keys())
-        ke.sort()
-        for d in ke:
-            affected_days[d] = _flatten(affected_days[d])
-            if all_tasks:
-                overcharged_days[d] = affected_days[d]
+class _WorkingDays(object):
+    """
+    Compiled calendar of worked days, built from NOT_WORKED_DAYS, VACATIONS
+    and RECURRING_VACATIONS. Days are stored by ordinal over a window which grows on
+    demand, with a worked/not worked bitmap, prefix sums of worked days and
+    the position of each worked day, so that snapping to a worked day or
+    moving by N worked days are O(1) lookups.
+    """
+    # number of days added around the requested window when growing
+    MARGIN = 366
 
-            elif len(affected_days[d]) > self.nb_elements():
-                overcharged_days[d] = affected_days[d]
-                __LOG__.warning('** GroupOfResources "{2}" has more than {3} tasks on day {0} / {1}'.format(d, affected_days[d], self.name, self.nb_elements()))
-                
-        return overcharged_days
+    def __init__(self, not_worked_days, vacations, recurrences=(), version=0):
+        """
+        Init the calendar, nothing is compiled before the first lookup
 
+        Keyword arguments:
+        not_worked_days -- list of integer (0: Monday ... 6: Sunday)
+        vacations -- list of datetime.date
+        recurrences -- list of _Recurrence, default none
+        version -- int, version of the calendar it is built from, default 0
+        """
+        self.not_worked_days = frozenset(not_worked_days)
+        self.vacations = frozenset(d.toordinal() for d in vacations)
+        self.nb_vacations = len(vacations)
+        self.recurrences = tuple(recurrences)
+        self.version = version
+        if len(self.not_worked_days) >= 7:
+            raise ValueError('At least one day of the week should be worked ({0})'.format(sorted(self.not_worked_days)))
+
+        # ordinals of the compiled window [first, last)
+        self.first = 0
+        self.last = 0
+        # worked[i] is 1 if first + i is worked
+        self.worked = bytearray()
+        # prefix[i] is the number of worked days in [first, first + i)
+        self.prefix = [0]
+        # positions[k] is the offset of the (k+1)th worked day
+        self.positions = []
+        return
 
 
-    def is_vacant(self, from_date, to_date):
+    def _compile(self, ofrom, oto):
         """
-        Check if any resource from the group is unallocated between for a given timeframe.
-        Returns a list of available ressource name.
-        
+        Compile calendar for ordinals [ofrom, oto)
+
         Keyword arguments:
-        from_date -- first day
-        to_date --  last day
+        ofrom -- ordinal of first day
+        oto -- ordinal of day after the last one
         """
-        availables = []
-        for r in self.resources:
-            if len(r.is_vacant(from_date, to_date)) >0:
-                availables.append(r.name)
-                
-        return availables
-
+        ofrom = max(1, ofrom)
+        oto = min(datetime.date.max.toordinal() + 1, oto)
+        nwd = self.not_worked_days
+        vac = self.vacations
+        if len(self.recurrences) > 0:
+            # repeated vacations of the window only
+            vac = set(vac)
+            dfrom = datetime.date.fromordinal(ofrom)
+            dto = datetime.date.fromordinal(oto - 1)
+            for r in self.recurrences:
+                for (start, end) in r.occurrences(dfrom, dto):
+                    vac.update(range(max(start.toordinal(), ofrom), min(end.toordinal(), oto - 1) + 1))
+        worked = bytearray(oto - ofrom)
+        prefix = [0] * (oto - ofrom + 1)
+        positions = []
+        nb = 0
+        for i in range(oto - ofrom):
+            o = ofrom + i
+            # ordinal 1 (0001-01-01) is a Monday
+            if (o - 1) % 7 not in nwd and o not in vac:
+                worked[i] = 1
+                positions.append(i)
+                nb += 1
+            prefix[i + 1] = nb
+
+        self.first = ofrom
+        self.last = oto
+        self.worked = worked
+        self.prefix = prefix
+        self.positions = positions
+        return
 
-############################################################################
 
-class Resource(object):
-    """
-    Class for handling resources assigned to tasks
-    """
-    def __init__(self, name, fullname=None):
+    def _cover(self, ofrom, oto):
         """
-        Init a resource
+        Make sure ordinals [ofrom, oto) are compiled
 
         Keyword arguments:
-        name -- name given to the resource (id)
-        fullname -- long name given to the resource
+        ofrom -- ordinal of first day
+        oto -- ordinal of day after the last one
         """
-        __LOG__.debug('** Resource::__init__ {0}'.format({'name':name}))
-        self.name = name
-        if fullname is not None:
-            self.fullname = fullname
-        else:
-            self.fullname = name
-
-        self.vacations = []
-        self.member_of_groups = []
-
-        self.tasks = []
+        if len(self.worked) == 0:
+            self._compile(ofrom - self.MARGIN, oto + self.MARGIN)
+        elif ofrom < self.first or oto > self.last:
+            # grow at least twice as big to amortize rebuilds
+            size = self.last - self.first
+            self._compile(min(self.first, ofrom - max(self.MARGIN, size)),
+                          max(self.last, oto + max(self.MARGIN, size)))
         return
 
-    def add_vacations(self, dfrom, dto=None):
+
+    def _offset(self, day):
         """
-        Add vacations to a resource begining at [dfrom] to [dto] (included). If
-        [dto] is not defined, vacation will be for [dfrom] day only
+        Returns offset of day in the compiled window, compiling it if needed
 
         Keyword arguments:
-        dfrom -- datetime.date begining of vacation
-        dto -- datetime.date end of vacation of vacation
+        day -- datetime.date
         """
-        __LOG__.debug('** Resource::add_vacations {0}'.format({'name':self.name, 'dfrom':dfrom, 'dto':dto}))
-        if dto is None:
-            self.vacations.append((dfrom, dfrom))
-        else:
-            self.vacations.append((dfrom, dto))
-        return
+        o = day.toordinal()
+        self._cover(o, o + 1)
+        return o - self.first
 
 
-    def nb_elements(self):
+    def _day(self, offset):
         """
-        Returns the number of resources, 1 here
+        Returns datetime.date for an offset of the compiled window
         """
-        __LOG__.debug('** Resource::nb_elements ({0})'.format({'name':self.name}))
-        return 1
+        return datetime.date.fromordinal(self.first + offset)
 
 
-    def is_available(self, date):
+    def is_worked(self, day):
         """
-        Returns True if the resource is available at given date, False if not.
-        Availibility is taken from the global VACATIONS and resource's ones.
+        Returns True if day is worked
 
         Keyword arguments:
-        date -- datetime.date day to look for
+        day -- datetime.date
         """
-        # global VACATIONS
-        if date in VACATIONS:
-            __LOG__.debug('** Resource::is_available {0} : False (global vacation)'.format({'name':self.name, 'date':date}))
+        o = day.toordinal()
+        if self.first <= o < self.last:
+            return self.worked[o - self.first] == 1
+        if (o - 1) % 7 in self.not_worked_days or o in self.vacations:
             return False
-        
-        # GroupOfResources vacation
-        for g in self.member_of_groups:
-            for h in g.vacations:
-                dfrom, dto = h
-                if date >= dfrom and date <= dto:
-                    __LOG__.debug('** Resource::is_available {0} : False (Group {1})'.format({'name':self.name, 'date':date}, g.name))
-                    return False
-        
-
-        # Resource vacation
-        for h in self.vacations:
-            dfrom, dto = h
-            if date >= dfrom and date <= dto:
-                __LOG__.debug('** Resource::is_available {0} : False'.format({'name':self.name, 'date':date}))
+        for r in self.recurrences:
+            if r.contains(day):
                 return False
-        __LOG__.debug('** Resource::is_available {0} : True'.format({'name':self.name, 'date':date}))
         return True
 
 
-    def add_group(self, groupofresources):
+    def nth_worked_day(self, day, n=1):
         """
-        Tell the resource it belongs to a GroupOfResources
-        
+        Returns the nth worked day from day (included)
+
         Keyword arguments:
-        groupofresources -- GroupOfResources
+        day -- datetime.date
+        n -- int, 1 for the first worked day
         """
-        if groupofresources not in self.member_of_groups:
-            self.member_of_groups.append(groupofresources)
-        return
-
+        i = self._offset(day)
+        k = self.prefix[i] + n - 1
+        while k >= len(self.positions):
+            if self.last > datetime.date.max.toordinal():
+                raise OverflowError('date value out of range')
+            self._cover(self.first, self.last + (k - len(self.positions) + 1) * 7)
+            i = day.toordinal() - self.first
+            k = self.prefix[i] + n - 1
+        return self._day(self.positions[k])
+
+
+    def nth_worked_day_backward(self, day, n=1):
+        """
+        Returns the nth worked day going backward from day (included)
 
-    def add_task(self, task):
+        Keyword arguments:
+        day -- datetime.date
+        n -- int, 1 for the last worked day
         """
-        Tell the resource that we have assigned a task
+        i = self._offset(day)
+        k = self.prefix[i + 1] - n
+        while k < 0:
+            if self.first <= 1:
+                raise OverflowError('date value out of range')
+            self._cover(self.first + k * 7, self.last)
+            i = day.toordinal() - self.first
+            k = self.prefix[i + 1] - n
+        return self._day(self.positions[k])
+
+
+    def next_worked_day(self, day):
+        """
+        Returns the first worked day from day (included)
 
         Keyword arguments:
-        task -- Task object
+        day -- datetime.date
         """
-        if task not in self.tasks:
-            self.tasks.append(task)
-        return
+        return self.nth_worked_day(day, 1)
 
 
-    def search_for_task_conflicts(self, all_tasks=False):
+    def previous_worked_day(self, day):
         """
-        Returns a dictionnary of all days (datetime.date) containing for each
-        overcharged day the list of task for this day.
+        Returns the last worked day before day (included)
 
         Keyword arguments:
-        all_tasks -- if True return all tasks for all days, not just overcharged days
+        day -- datetime.date
         """
-        affected_days = {}
-        for t in self.tasks:
-            cday = t.start_date()
-            while cday <= t.end_date():
-                if cday.weekday() not in _not_worked_days():
-                    try:
-                        affected_days[cday].append(t.fullname)
-                    except KeyError:
-                        affected_days[cday] = [t.fullname]
-                    
-                cday += datetime.timedelta(days=1)
-
-        # return all
-        if all_tasks:
-            return affected_days
-
-        # compile only overcharge
-        overcharged_days = {}
-        ke = list(affected_days.keys())
-        ke.sort()
-        for d in ke:
-            if len(affected_days[d]) > 1:
-                overcharged_days[d] = affected_days[d]
-                __LOG__.warning('** Resource "{2}" has more than one task on day {0} / {1}'.format(d, affected_days[d], self.name))
-                
-        return overcharged_days
-            
+        return self.nth_worked_day_backward(day, 1)
 
 
-    def is_vacant(self, from_date, to_date):
+    def nb_worked_days(self, dfrom, dto):
         """
-        Check if the resource is unallocated between for a given timeframe.
-        Returns True if the resource is free, False otherwise
-        
+        Returns the number of worked days between dfrom and dto (included)
+
         Keyword arguments:
-        from_date -- first day
-        to_date --  last day
+        dfrom -- datetime.date first day
+        dto -- datetime.date last day
         """
-        non_vacant_days = self.search_for_task_conflicts(all_tasks=True)
-        cday = from_date
-        while cday <= to_date:
-            if cday.weekday() not in _not_worked_days():
-                if not self.is_available(cday):
-                    __LOG__.debug('** Ressource "{0}" is not available on day {1} (vacation)'.format(self.name, cday))
-                    return []
-                if cday in non_vacant_days:
-                    __LOG__.debug('** Ressource "{0}" is not available on day {1} (other task : {2})'.format(self.name, cday, non_vacant_days[cday]))
-                    return []
+        if dto < dfrom:
+            return 0
+        ofrom = dfrom.toordinal()
+        oto = dto.toordinal()
+        self._cover(ofrom, oto + 1)
+        return self.prefix[oto - self.first + 1] - self.prefix[ofrom - self.first]
 
-            cday += datetime.timedelta(days=1)
-        return [self.name]
 
-############################################################################
 
+_WORKING_DAYS = None
 
-class Task(object):
+# bumped each time NOT_WORKED_DAYS, VACATIONS or RECURRING_VACATIONS change,
+# see _reset_working_days
+_CALENDAR_VERSION = 0
+
+
+def _working_days():
     """
-    Class for manipulating Tasks
+    Returns the compiled calendar of worked days, built from NOT_WORKED_DAYS,
+    VACATIONS and RECURRING_VACATIONS
     """
-    def __init__(self, name, start=None, stop=None, duration=None, depends_of=None, resources=None, percent_done=0, color=None, fullname=None, display=True, state=''):
-        """
-        Initialize task object. Two of start, stop or duration may be given.
-        This task can rely on other task and will be completed with resources.
-        If percent done is given, a progress bar will be included on the task.
-        If color is specified, it will be used for the task.
+    global _WORKING_DAYS
+    # lengths catch vacations appended to the lists without add_vacations
+    if _WORKING_DAYS is None \
+       or _WORKING_DAYS.version != _CALENDAR_VERSION \
+       or _WORKING_DAYS.nb_vacations != len(VACATIONS) \
+       or len(_WORKING_DAYS.recurrences) != len(RECURRING_VACATIONS):
+        _WORKING_DAYS = _WorkingDays(_not_worked_days(), VACATIONS, RECURRING_VACATIONS, _CALENDAR_VERSION)
+    return _WORKING_DAYS
 
-        Keyword arguments:
-        name -- name of the task (id)
-        fullname -- long name given to the resource
-        start -- datetime.date, first day of the task, default None
-        stop -- datetime.date, last day of the task, default None
-        duration -- int, duration of the task, default None
-        depends_of -- list of Task which are parents of this one, default None
-        resources -- list of Resources assigned to the task, default None
-        percent_done -- int, percent of achievment, default 0
-        color -- string, html color, default None
-        display -- boolean, display this task, default True
-        state -- string, state of the task
-        """
-        __LOG__.debug('** Task::__init__ {0}'.format({'name':name, 'start':start, 'stop':stop, 'duration':duration, 'depends_of':depends_of, 'resources':resources, 'percent_done':percent_done}))
-        self.name = name
-        if fullname is not None:
-            self.fullname = fullname
-        else:
-            self.fullname = name
 
-        self.start = start
-        self.stop = stop
-        self.duration = duration
-        self.color = color
-        self.display = display
-        self.state = state
+def _reset_working_days():
+    """
+    Bump the version of the calendar of worked days, it will be compiled
+    again on next use
+    """
+    global _CALENDAR_VERSION
+    _CALENDAR_VERSION += 1
+    return
 
-        ends = (self.start, self.stop, self.duration)
-        nonecount = 0
-        for e in ends:
-            if e is None:
-                nonecount += 1
 
-        # check limits (2 must be set on 4) or scheduling is defined by duration and dependencies
-        if nonecount != 1 and  (self.duration is None or depends_of is None):
-            __LOG__.error('** Task "{1}" must be defined by two of three limits ({0})'.format({'start':self.start, 'stop':self.stop, 'duration':self.duration}, fullname))
-            # Bug ? may be defined later
-            #raise ValueError('Task "{1}" must be defined by two of three limits ({0})'.format({'start':self.start, 'stop':self.stop, 'duration':self.duration}, fullname))
+def _nb_days_from_duration(duration):
+    """
+    Returns the number of worked days covered by a duration, at least one.
+    A duration of None counts for one day.
 
-        if type(depends_of) is type([]):
-            self.depends_of = depends_of
-        elif depends_of is not None:
-            self.depends_of = [depends_of]
-        else:
-            self.depends_of = None
+    Keyword arguments:
+    duration -- int, duration of a task
+    """
+    if duration is None or duration <= 1:
+        return 1
+    return int(math.ceil(duration))
 
-        self.resources = resources
-        self.percent_done = percent_done
-        self.drawn_x_begin_coord = None
-        self.drawn_x_end_coord = None
-        self.drawn_y_coord = None
-        self.cache_start_date = None
-        self.cache_end_date = None
 
-        # tell each resource we have
-        # assigned a new task
-        if resources is not None:
-            for r in resources:
-                r.add_task(self)
+def _dependency_lag(task, depend):
+    """
+    Returns the number of days task starts at least after the end of depend,
+    following each case of Task.start_date() : a task starts the next worked
+    day after a task, and the same day as a milestone unless it is placed
+    from its stop date or from its first dependency. A task placed from its
+    stop date is only pushed by a dependency ending after the day it starts
+    on, see analyse_slack
 
-        return
+    Keyword arguments:
+    task -- Task object
+    depend -- Task object task depends of
+    """
+    if not isinstance(depend, Milestone):
+        return 1
+    if task.start is not None:
+        return 0
+    if task.stop is None and depend is not task.depends_of[0]:
+        return 0
+    return 1
 
 
-    def add_depends(self, depends_of):
+def _copy_task(task, copies):
+    """
+    Returns a copy of a task to schedule it again without changing it, see
+    Scenario and Project.level_resources. The copy depends of the copies of
+    the tasks task depends of, if any.
+
+    Keyword arguments:
+    task -- Task object
+    copies -- dictionnary of copies of tasks already made
+    """
+    c = copy.copy(task)
+    c._successors = ()
+    if task.depends_of is not None:
+        c._depends_of = [copies.get(d, d) for d in task.depends_of]
+    c.cache_start_date = None
+    c.cache_end_date = None
+    c._diagnostics = ()
+    return c
+
+
+def _move_task(task, start, calendar):
+    """
+    Makes a copy of a task start on start, keeping its number of worked days
+
+    Keyword arguments:
+    task -- Task object, copy made by _copy_task
+    start -- datetime.date, new first day
+    calendar -- _WorkingDays of the project
+    """
+    length = calendar.nb_worked_days(task.start_date(), task.end_date())
+    task._start = start
+    if isinstance(task, Milestone):
+        task._stop = start
+    else:
+        task._stop = None
+        task._duration = length
+    task.cache_start_date = None
+    task.cache_end_date = None
+    task._diagnostics = ()
+    return
+
+
+class _FreeSlots(object):
+    """
+    Free days between busy intervals of days, with the number of worked days
+    of each free interval kept in a max segment tree. The next free interval
+    of at least n worked days is found in O(log(number of intervals)).
+    """
+    def __init__(self, busy, calendar):
         """
-        Adds dependency to a task
+        Init index from busy intervals
 
         Keyword arguments:
-        depends_of -- list of Task which are parents of this one
+        busy -- list of (dfrom, dto) busy days (included), in any order
+        calendar -- _WorkingDays used for counting worked days
         """
-        if type(depends_of) is type([]):
-            if self.depends_of is None:
-                self.depends_of = depends_of
-            else:
-                for d in depends_of:
-                    self.depends_of.append(d)
-        else:
-            if self.depends_of is None:
-                self.depends_of = depends_of
+        self.calendar = calendar
+        one_day = datetime.timedelta(days=1)
+
+        # free intervals, unbounded ones begin at date.min or end at date.max
+        self.starts = [datetime.date.min]
+        self.ends = []
+        for (dfrom, dto) in sorted(busy):
+            if dto < dfrom:
+                continue
+            if dfrom <= self.starts[-1]:
+                # overlaps or touches previous busy interval
+                if dto >= self.starts[-1]:
+                    self.starts[-1] = dto + one_day
+                continue
+            self.ends.append(dfrom - one_day)
+            self.starts.append(dto + one_day)
+        self.ends.append(datetime.date.max)
+
+        self.size = 1
+        while self.size < len(self.starts):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        for i in range(len(self.starts)):
+            if self.starts[i] == datetime.date.min or self.ends[i] == datetime.date.max:
+                self.tree[self.size + i] = float('inf')
             else:
-                self.depends_of.append(depends_of)
-
+                self.tree[self.size + i] = calendar.nb_worked_days(self.starts[i], self.ends[i])
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
         return
 
 
-    def start_date(self):
+    def _next_interval(self, i, n):
         """
-        Returns the first day of the task, either the one which was given at
-        task creation or the one calculated after checking dependencies
+        Returns index of the first free interval from i with at least n
+        worked days, None if there is none
+
+        Keyword arguments:
+        i -- int, index of the first free interval to look at
+        n -- int, number of worked days
         """
-        if self.cache_start_date is not None:
-            return self.cache_start_date
+        if i >= len(self.starts):
+            return None
+        pos = self.size + i
+        if self.tree[pos] < n:
+            # go up until a right sibling has enough days
+            while pos > 1:
+                if pos % 2 == 0 and self.tree[pos + 1] >= n:
+                    pos += 1
+                    break
+                pos //= 2
+            else:
+                return None
+            # then down to its first leaf with enough days
+            while pos < self.size:
+                if self.tree[2 * pos] >= n:
+                    pos = 2 * pos
+                else:
+                    pos = 2 * pos + 1
+        return pos - self.size
 
-        __LOG__.debug('** Task::start_date ({0})'.format(self.name))
-        if self.start is not None:
-            # start date setted, calculate begining
-            if self.depends_of is None:
-                # depends of nothing... start date is start
-                #__LOG__.debug('*** Do not depend of other task')
-                start = self.start
-                while start.weekday() in _not_worked_days() or start in VACATIONS:
-                    start = start + datetime.timedelta(days=1)
 
-                if start > self.start:
-                    __LOG__.warning('** Due to vacations, Task "{0}", will not start on date {1} but {2}'.format(self.fullname, self.start, start))
+    def find(self, n, after, before=None):
+        """
+        Returns list of (first day, last day) of free intervals, cut to
+        [after, before], with at least n worked days. First and last days are
+        worked days, last day is None if free from first day on.
 
-                self.cache_start_date = start
-                return self.cache_start_date
+        Keyword arguments:
+        n -- int, number of worked days
+        after -- datetime.date, first day to look at
+        before -- datetime.date, last day to look at, default None
+        """
+        wd = self.calendar
+        slots = []
+        i = bisect.bisect_left(self.ends, after)
+        if i < len(self.starts) and self.tree[self.size + i] < n:
+            i = self._next_interval(i, n)
+        while i is not None:
+            dfrom = max(self.starts[i], after)
+            if before is None and self.ends[i] == datetime.date.max:
+                slots.append((wd.next_worked_day(dfrom), None))
+                break
+            dto = self.ends[i]
+            if before is not None:
+                dto = min(dto, before)
+            if dfrom > dto:
+                break
+            if wd.nb_worked_days(dfrom, dto) >= n:
+                slots.append((wd.next_worked_day(dfrom), wd.previous_worked_day(dto)))
+            i = self._next_interval(i + 1, n)
+        return slots
+
+############################################################################
+
+class Context(object):
+    """
+    Calendar (not worked days and vacations) and font attributes used for
+    scheduling and drawing projects. A Project uses its own context, the one
+    of the project it was added to or the default one, built from module
+    globals (see define_not_worked_days, add_vacations and
+    define_font_attributes). Tasks and resources use the context of the
+    first project they belong to.
+    """
+    def __init__(self, not_worked_days=None, font_attributes=None):
+        """
+        Init a context without vacations
+
+        Keyword arguments:
+        not_worked_days -- list of integer (0: Monday ... 6: Sunday) - default [5, 6]
+        font_attributes -- dictionnary of font attributes, see define_font_attributes
+        """
+        if not_worked_days is None:
+            not_worked_days = [5, 6]
+        self.not_worked_days = list(not_worked_days)
+        if font_attributes is None:
+            font_attributes = {
+                'fill': 'black',
+                'stroke': 'black',
+                'stroke_width': 0,
+                'font_family': 'Verdana',
+                }
+        self.font_attributes = dict(font_attributes)
+        # list of vacations as datetime (non worked days)
+        self.vacations = []
+        # repeated vacations, see add_vacations
+        self.recurring_vacations = []
+        self._vacations_intervals = _Intervals()
+        self._compiled = None
+        # bumped each time not worked days or vacations change
+        self._version = 0
+        return
+
+
+    def define_not_worked_days(self, list_of_days):
+        """
+        Define specific days off
+
+        Keyword arguments:
+        list_of_days -- list of integer (0: Monday ... 6: Sunday)
+        """
+        self.not_worked_days = list_of_days
+        self._reset_working_days()
+        return
+
+
+    def define_font_attributes(self, fill='black', stroke='black', stroke_width=0, font_family="Verdana"):
+        """
+        Define font attributes
+
+        Keyword arguments:
+        fill -- fill - default 'black'
+        stroke -- stroke - default 'black'
+        stroke_width -- stroke width - default 0
+        font_family -- font family - default 'Verdana'
+        """
+        self.font_attributes = {
+            'fill': fill,
+            'stroke' : stroke,
+            'stroke_width': stroke_width,
+            'font_family': font_family,
+            }
+        return
+
+
+    def add_vacations(self, start_date, end_date=None, repeat=None, until=None):
+        """
+        Add vacations begining at [start_date] to [end_date] (included). If
+        [end_date] is not defined, vacation will be for [start_date] day only
+
+        If [repeat] is given, vacations are repeated (every week for '+1w',
+        every two months for '+2m'...) until [until] if given. They are kept
+        in recurring_vacations.
+
+        Keyword arguments:
+        start_date -- datetime.date begining of vacation
+        end_date -- datetime.date end of vacation of vacation
+        repeat -- string, org-mode like repeater ('+1d', '+1w', '++1m', '.+1y'...), default None
+        until -- datetime.date, last day of repeated vacations, default None
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** add_vacations {0}'.format({'start_date':start_date, 'end_date':end_date, 'repeat':repeat, 'until':until}))
+
+        if repeat is not None:
+            self.recurring_vacations.append(_Recurrence(start_date, end_date, repeat, until))
+            self._reset_working_days()
+            return
+
+        if end_date is None:
+            end_date = start_date
+
+        # only add days which are not already in vacations
+        vacations = self._vacations()
+        for dfrom, dto in vacations.gaps(start_date, end_date):
+            while dfrom <= dto:
+                self.vacations.append(dfrom)
+                dfrom += datetime.timedelta(days=1)
+        vacations.add(start_date, end_date)
+
+        self._reset_working_days()
+        # intervals are already up to date with the new version
+        vacations.nb_source = len(self.vacations)
+        vacations.version = self._version
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** add_vacations {0}'.format({'start_date':start_date, 'end_date':end_date, 'vac':self.vacations}))
+        return
+
+
+    def _vacations(self):
+        """
+        Returns vacations as _Intervals
+        """
+        return self._vacations_intervals.update_from(self.vacations, self._version)
+
+
+    def is_vacation(self, day):
+        """
+        Returns True if day is in vacations or repeated vacations
+
+        Keyword arguments:
+        day -- datetime.date
+        """
+        if self._vacations().contains(day):
+            return True
+        for r in self.recurring_vacations:
+            if r.contains(day):
+                return True
+        return False
+
+
+    def _working_days(self):
+        """
+        Returns the compiled calendar of worked days of the context
+        """
+        # lengths catch vacations appended to the lists without add_vacations
+        if self._compiled is None \
+           or self._compiled.version != self._version \
+           or self._compiled.nb_vacations != len(self.vacations) \
+           or len(self._compiled.recurrences) != len(self.recurring_vacations):
+            self._compiled = _WorkingDays(self.not_worked_days, self.vacations, self.recurring_vacations, self._version)
+        return self._compiled
+
+
+    def _reset_working_days(self):
+        """
+        Bump the version of the calendar of worked days, it will be compiled
+        again on next use
+        """
+        self._version += 1
+        return
+
+
+
+class _DefaultContext(Context):
+    """
+    Context read from module globals NOT_WORKED_DAYS, VACATIONS,
+    RECURRING_VACATIONS and FONT_ATTR
+    """
+    def __init__(self):
+        return
+
+
+    @property
+    def not_worked_days(self):
+        return _not_worked_days()
+
+
+    @property
+    def font_attributes(self):
+        return _font_attributes()
+
+
+    @property
+    def vacations(self):
+        return VACATIONS
+
+
+    @property
+    def recurring_vacations(self):
+        return RECURRING_VACATIONS
+
+
+    @property
+    def _version(self):
+        return _CALENDAR_VERSION
+
+
+    def define_not_worked_days(self, list_of_days):
+        define_not_worked_days(list_of_days)
+        return
+
+
+    def define_font_attributes(self, fill='black', stroke='black', stroke_width=0, font_family="Verdana"):
+        define_font_attributes(fill, stroke, stroke_width, font_family)
+        return
+
+
+    def _vacations(self):
+        return _global_vacations()
+
+
+    def _working_days(self):
+        return _working_days()
+
+
+    def _reset_working_days(self):
+        _reset_working_days()
+        return
+
+
+
+_DEFAULT_CONTEXT = _DefaultContext()
+
+############################################################################
+
+# handler added by init_log_to_sysout
+_LOG_HANDLER = None
+
+
+def init_log_to_sysout(level=logging.INFO):
+    """
+    Init global variable __LOG__ used for logging purpose. Calling it again
+    only changes the level.
+
+    Keyword arguments:
+    level -- logging level (from logging.debug to logging.critical)
+    """
+    global __LOG__
+    global _LOG_HANDLER
+    logger = logging.getLogger("Gantt")
+    logger.setLevel(level)
+    if _LOG_HANDLER is None or _LOG_HANDLER not in logger.handlers:
+        fh = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        fh.setFormatter(formatter)
+        logger.addHandler(fh)
+        _LOG_HANDLER = fh
+    __LOG__ = logging.getLogger("Gantt")
+    return
+
+############################################################################
+
+def _show_version(name, **kwargs):
+    """
+    Show version
+    """
+    import os
+    print("{0} version {1}".format(os.path.basename(name), __version__))
+    return True
+
+
+############################################################################
+
+
+if sys.version_info[0] == 2:
+    _intern_string = intern
+else:
+    _intern_string = sys.intern
+
+
+def _intern(value):
+    """
+    Returns the interned copy of a string, so that colors, states or names
+    used by many objects are stored once. Other values are returned as is.
+
+    Keyword arguments:
+    value -- string or any value
+    """
+    if type(value) is str:
+        return _intern_string(value)
+    return value
+
+
+def _flatten(l, ltypes=(list, tuple)):
+    """
+    Return a flatten list from a list like [1,2,[4,5,1]]
+    """
+    ltype = type(l)
+    l = list(l)
+    i = 0
+    while i < len(l):
+        while isinstance(l[i], ltypes):
+            if not l[i]:
+                l.pop(i)
+                i -= 1
+                break
             else:
-                # depends of other task, start date could vary
-                #__LOG__.debug('*** Do depend of other tasks')
-                start = self.start
-                while start.weekday() in _not_worked_days() or start in VACATIONS:
-                    start = start + datetime.timedelta(days=1)
+                l[i:i + 1] = l[i]
+        i += 1
+    return ltype(l)
 
-                prev_task_end = start
-                for t in self.depends_of:
-                    if isinstance(t, Milestone):
-                        if t.end_date() >= prev_task_end:
-                            prev_task_end = t.end_date()
-                    elif isinstance(t, Task):
-                        if t.end_date() >= prev_task_end:
-                            prev_task_end = t.end_date() + datetime.timedelta(days=1)
 
-                while prev_task_end.weekday() in _not_worked_days() or prev_task_end in VACATIONS:
-                    prev_task_end = prev_task_end + datetime.timedelta(days=1)
+def _find_cycle(tasks, predecessors, nb_predecessors):
+    """
+    Returns a list of Tasks forming a cycle, first one repeated at the end,
+    among tasks still having predecessors after a topological sort
 
-                if prev_task_end > self.start:
-                    __LOG__.warning('** Due to dependencies, Task "{0}", will not start on date {1} but {2}'.format(self.fullname, self.start, prev_task_end))
+    Keyword arguments:
+    tasks -- list of Tasks
+    predecessors -- dictionnary of list of Tasks each Task depends of
+    nb_predecessors -- dictionnary of remaining predecessors of each Task
+    """
+    # every remaining task has a remaining predecessor, walk up until we loop
+    t = [x for x in tasks if nb_predecessors[x] > 0][0]
+    path = []
+    seen = {}
+    while t not in seen:
+        seen[t] = len(path)
+        path.append(t)
+        t = [p for p in predecessors[t] if nb_predecessors[p] > 0][0]
+    cycle = path[seen[t]:] + [t]
+    cycle.reverse()
+    return cycle
+
+
+def _sweep_overloads(entries, capacity, dfrom=None, dto=None, all_entries=False, not_worked_days=None):
+    """
+    Returns a list of (first day, last day, list of names) for each run of
+    days where more than capacity entries overlap, from a sweep over the
+    first and last days of entries. Names are in entries order. Not worked
+    days of the week do not begin or end a run.
 
-                self.cache_start_date = prev_task_end
-                return self.cache_start_date
+    Keyword arguments:
+    entries -- list of (datetime.date, datetime.date, name), first and last day of each entry
+    capacity -- int, number of entries allowed the same day
+    dfrom -- datetime.date, first day to look at, default None
+    dto -- datetime.date, last day to look at, default None
+    all_entries -- if True return runs of days with at least one entry
+    not_worked_days -- list of days off (0: Monday ... 6: Sunday), default NOT_WORKED_DAYS
+    """
+    if not_worked_days is None:
+        not_worked_days = _not_worked_days()
+    events = []
+    for i, (start, end, name) in enumerate(entries):
+        if dfrom is not None and start < dfrom:
+            start = dfrom
+        if dto is not None and end > dto:
+            end = dto
+        if start <= end:
+            events.append((start, 1, i))
+            events.append((end + datetime.timedelta(days=1), -1, i))
+    events.sort()
+
+    if all_entries:
+        capacity = 0
+
+    runs = []
+    active = set()
+    k = 0
+    while k < len(events):
+        day = events[k][0]
+        while k < len(events) and events[k][0] == day:
+            if events[k][1] > 0:
+                active.add(events[k][2])
+            else:
+                active.discard(events[k][2])
+            k += 1
+
+        if len(active) > capacity:
+            # same entries until next event
+            first = day
+            last = events[k][0] - datetime.timedelta(days=1)
+            while first <= last and first.weekday() in not_worked_days:
+                first += datetime.timedelta(days=1)
+            while last >= first and last.weekday() in not_worked_days:
+                last -= datetime.timedelta(days=1)
+            if first <= last:
+                runs.append((first, last, [entries[i][2] for i in sorted(active)]))
+    return runs
+
+
+def _days_of_runs(runs, not_worked_days=None):
+    """
+    Returns a dictionnary of all worked days of the week (datetime.date) of
+    runs as returned by _sweep_overloads, with the list of names of the run
 
-        elif self.duration is None: # start and stop fixed
-            current_day = self.start
-            # check depends
-            if self.depends_of is not None:
-                prev_task_end = self.depends_of[0].end_date()
-                for t in self.depends_of:
-                    if isinstance(t, Milestone):
-                        if t.end_date() > prev_task_end:
-                            prev_task_end = t.end_date() - datetime.timedelta(days=1)
-                    elif isinstance(t, Task):
-                        if t.end_date() > prev_task_end:
-                            prev_task_end = t.end_date()
-                    # if t.end_date() > prev_task_end:
-                    #     #__LOG__.debug('*** latest one {0} which end on {1}'.format(t.name, t.end_date()))
-                    #     prev_task_end = t.end_date()
-                if prev_task_end > current_day:
-                    depend_start_date = prev_task_end
-                else:
-                    start = self.start
-                    while start.weekday() in _not_worked_days() or start in VACATIONS:
-                        start = start + datetime.timedelta(days=1)
-                    depend_start_date = start
+    Keyword arguments:
+    runs -- list of (datetime.date, datetime.date, list of names)
+    not_worked_days -- list of days off (0: Monday ... 6: Sunday), default NOT_WORKED_DAYS
+    """
+    if not_worked_days is None:
+        not_worked_days = _not_worked_days()
+    days = {}
+    for (first, last, names) in runs:
+        cday = first
+        while cday <= last:
+            if cday.weekday() not in not_worked_days:
+                days[cday] = list(names)
+            cday += datetime.timedelta(days=1)
+    return days
 
-                    if depend_start_date > current_day:
-                        __LOG__.error('** Due to dependencies, Task "{0}", could not be finished on time (should start as last on {1} but will start on {2})'.format(self.fullname, current_day, depend_start_date))
-                    self.cache_start_date = depend_start_date           
+
+def _schedule_with_numpy(order, predecessors, context=None):
+    """
+    Computes and caches dates of not yet scheduled tasks with numpy, level
+    by level of the dependencies graph : all tasks of a level only depend
+    of tasks of previous levels and are computed together with
+    numpy.busday_offset.
+
+    Dates follow exactly Task.start_date() and Task.end_date(). Tasks in a
+    case those methods do not handle (no date to start from, start, stop
+    and duration all given, dependency on something else than a Task...),
+    tasks of another context and tasks depending of them are computed one by
+    one with those methods.
+
+    Keyword arguments:
+    order -- list of Tasks in topological order
+    predecessors -- dictionnary of list of Tasks each Task depends of
+    context -- Context of the calendar, default None for the default one
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is needed for scheduling with SCHEDULE_WITH_NUMPY, see http://www.numpy.org/')
+
+    if context is None:
+        context = _DEFAULT_CONTEXT
+    epoch = datetime.date(1970, 1, 1).toordinal()
+
+    def offset(days, n, roll):
+        return numpy.busday_offset(days.astype('datetime64[D]'), n, roll=roll, busdaycal=calendar).astype('int64')
+
+    def to_day(d):
+        if d is None:
+            return 0
+        return d.toordinal() - epoch
+
+    def diagnose(t, latest, real_end):
+        t._diagnostics = ()
+        for (reason, old_date, new_date) in _dates_diagnostics(t, t.cache_start_date, t.cache_end_date, latest, real_end):
+            t._diagnose(reason, old_date, new_date)
+        return
+
+    todo = [t for t in order if not t._is_scheduled()]
+    if len(todo) == 0:
+        return
+    index = {}
+    for i, t in enumerate(todo):
+        index[t] = i
+
+    # dates of tasks already scheduled, needed as dependencies
+    known_end = {}
+    for t in order:
+        if t not in index:
+            known_end[t] = to_day(t.end_date())
+
+    # level of each task and tasks left to Task.start_date()/end_date()
+    nb = len(todo)
+    level = [0] * nb
+    one_by_one = [False] * nb
+    for i, t in enumerate(todo):
+        for p in predecessors[t]:
+            if p in index:
+                level[i] = max(level[i], level[index[p]] + 1)
+        if t._context() is not context:
+            one_by_one[i] = True
+        elif t.start is None:
+            if t.duration is None or (t.stop is None and t.depends_of is None):
+                # no date to start from
+                one_by_one[i] = True
+            elif t.depends_of is not None \
+                 and (len(t.depends_of) == 0 or not isinstance(t.depends_of[0], Task)):
+                one_by_one[i] = True
+        elif not isinstance(t, Milestone) and t.stop is None and t.duration is None:
+            # no date to end to
+            one_by_one[i] = True
+        elif not isinstance(t, Milestone) and t.stop is not None and t.duration is not None:
+            # start, stop and duration given
+            one_by_one[i] = True
+
+    is_milestone = numpy.array([isinstance(t, Milestone) for t in todo], dtype=bool)
+    has_start = numpy.array([t.start is not None for t in todo], dtype=bool)
+    has_stop = numpy.array([t.stop is not None for t in todo], dtype=bool)
+    has_deps = numpy.array([t.depends_of is not None for t in todo], dtype=bool)
+    positive = numpy.array([t.duration is not None and t.duration > 0 for t in todo], dtype=bool)
+    nb_days = numpy.array([_nb_days_from_duration(t.duration) for t in todo], dtype='int64')
+
+    holidays = [d.toordinal() - epoch for d in context.vacations]
+    if len(context.recurring_vacations) > 0:
+        # repeated vacations around given dates, with room for the longest
+        # chain of dependent tasks
+        dates = [d.toordinal() for t in todo for d in (t.start, t.stop) if d is not None]
+        dates.extend([o + epoch for o in known_end.values()])
+        if len(dates) > 0:
+            chain = [0] * nb
+            for i, t in enumerate(todo):
+                for p in predecessors[t]:
+                    if p in index:
+                        chain[i] = max(chain[i], chain[index[p]])
+                chain[i] += int(nb_days[i])
+            margin = 366 + 7 * max(chain)
+            first = datetime.date.fromordinal(max(min(dates) - margin, 1))
+            last = datetime.date.fromordinal(min(max(dates) + margin, datetime.date.max.toordinal()))
+            for r in context.recurring_vacations:
+                for (dfrom, dto) in r.occurrences(first, last):
+                    holidays.extend(range(dfrom.toordinal() - epoch, dto.toordinal() - epoch + 1))
+    calendar = numpy.busdaycalendar(
+        weekmask=[0 if d in context.not_worked_days else 1 for d in range(7)],
+        holidays=numpy.array(holidays, dtype='int64').astype('datetime64[D]'))
+    start = numpy.array([to_day(t.start) for t in todo], dtype='int64')
+    stop = numpy.array([to_day(t.stop) for t in todo], dtype='int64')
+    level = numpy.array(level, dtype='int64')
+    one_by_one = numpy.array(one_by_one, dtype=bool)
+
+    # edges of the dependencies graph, from a predecessor to a task
+    edge_from = []
+    edge_to = []
+    edge_known = []
+    edge_milestone = []
+    first_dep = numpy.full(nb, -1, dtype='int64')
+    first_dep_known = numpy.zeros(nb, dtype='int64')
+    for i, t in enumerate(todo):
+        for p in predecessors[t]:
+            edge_to.append(i)
+            edge_milestone.append(isinstance(p, Milestone))
+            if p in index:
+                edge_from.append(index[p])
+                edge_known.append(0)
             else:
-                # should be first day of start...
-                self.cache_start_date = current_day            
+                edge_from.append(-1)
+                edge_known.append(known_end[p])
+        if t.depends_of is not None and len(t.depends_of) > 0 and isinstance(t.depends_of[0], Task):
+            if t.depends_of[0] in index:
+                first_dep[i] = index[t.depends_of[0]]
+            else:
+                first_dep_known[i] = known_end[t.depends_of[0]]
+    edge_from = numpy.array(edge_from, dtype='int64')
+    edge_to = numpy.array(edge_to, dtype='int64')
+    edge_known = numpy.array(edge_known, dtype='int64')
+    edge_milestone = numpy.array(edge_milestone, dtype=bool)
+    edge_level = level[edge_to] if len(edge_to) > 0 else edge_to
+
+    start_day = numpy.zeros(nb, dtype='int64')
+    end_day = numpy.zeros(nb, dtype='int64')
+    # latest start before stop and last worked day until stop, for diagnostics
+    latest_day = numpy.zeros(nb, dtype='int64')
+    real_end_day = numpy.zeros(nb, dtype='int64')
+    lowest = numpy.iinfo('int64').min
+    after_start = numpy.empty(nb, dtype='int64')
+    after_duration = numpy.empty(nb, dtype='int64')
+    after_stop = numpy.empty(nb, dtype='int64')
+
+    # tasks and edges sorted by level
+    task_order = numpy.argsort(level, kind='mergesort')
+    task_bounds = numpy.searchsorted(level[task_order], numpy.arange(int(level.max()) + 2))
+    edge_order = numpy.argsort(edge_level, kind='mergesort')
+    edge_bounds = numpy.searchsorted(edge_level[edge_order], numpy.arange(int(level.max()) + 2))
+
+    for lvl in range(int(level.max()) + 1):
+        in_level = task_order[task_bounds[lvl]:task_bounds[lvl + 1]]
+        tasks = in_level[~one_by_one[in_level]]
+        if len(tasks) > 0:
+            # end of predecessors, as seen by each kind of start_date() case
+            edges = edge_order[edge_bounds[lvl]:edge_bounds[lvl + 1]]
+            dep_end = numpy.where(edge_from[edges] >= 0, end_day[numpy.maximum(edge_from[edges], 0)], edge_known[edges])
+            dep_milestone = edge_milestone[edges]
+            after_start[tasks] = lowest
+            numpy.maximum.at(after_start, edge_to[edges], numpy.where(dep_milestone, dep_end, dep_end + 1))
+            after_duration[tasks] = lowest
+            numpy.maximum.at(after_duration, edge_to[edges], numpy.where(dep_milestone, dep_end - 1, dep_end))
+            after_stop[tasks] = lowest
+            numpy.maximum.at(after_stop, edge_to[edges], dep_end)
+            first_end = numpy.where(first_dep[tasks] >= 0, end_day[numpy.maximum(first_dep[tasks], 0)], first_dep_known[tasks])
+
+            ts = tasks[has_start[tasks]]
+            if len(ts) > 0:
+                s = offset(start[ts], 0, 'forward')
+                s = numpy.where(has_deps[ts], numpy.maximum(s, after_start[ts]), s)
+                start_day[ts] = offset(s, 0, 'forward')
+
+            after_deps = ~has_start[tasks] & ~has_stop[tasks]
+            tf = tasks[after_deps]
+            if len(tf) > 0:
+                s = numpy.maximum(first_end[after_deps], after_duration[tf])
+                start_day[tf] = offset(s + 1, 0, 'forward')
+
+            before_stop = ~has_start[tasks] & has_stop[tasks]
+            tb = tasks[before_stop]
+            if len(tb) > 0:
+                s = numpy.where(positive[tb], offset(stop[tb], 1 - nb_days[tb], 'backward'), stop[tb] + 1)
+                latest_day[tb] = s
+                prev_end = numpy.maximum(first_end[before_stop], after_stop[tb])
+                s_deps = offset(numpy.where(prev_end > s, prev_end + 1, s), 0, 'forward')
+                start_day[tb] = numpy.where(has_deps[tb], s_deps, s)
+
+            nth = offset(start_day[tasks], nb_days[tasks] - 1, 'forward')
+            real_end = offset(stop[tasks], 0, 'backward')
+            real_end_day[tasks] = real_end
+            e = numpy.where(has_stop[tasks] & (real_end > start_day[tasks]), real_end, nth)
+            end_day[tasks] = numpy.where(is_milestone[tasks], start_day[tasks], e)
+
+            for i, d, e, l, r in zip(tasks.tolist(),
+                                     (start_day[tasks] + epoch).tolist(),
+                                     (end_day[tasks] + epoch).tolist(),
+                                     (latest_day[tasks] + epoch).tolist(),
+                                     (real_end_day[tasks] + epoch).tolist()):
+                t = todo[i]
+                t.cache_start_date = datetime.date.fromordinal(d)
+                if not isinstance(t, Milestone):
+                    t.cache_end_date = datetime.date.fromordinal(e)
+                diagnose(t, datetime.date.fromordinal(l), datetime.date.fromordinal(r))
+
+        for i in in_level[one_by_one[in_level]].tolist():
+            t = todo[i]
+            if t.start_date() is None or t.end_date() is None:
+                # successors will fail the same way in Task.start_date()
+                one_by_one[edge_to[edge_from == i]] = True
+                continue
+            start_day[i] = to_day(t.start_date())
+            end_day[i] = to_day(t.end_date())
+
+    return
+
+
+def _dates_diagnostics(task, start_date, end_date, latest, real_end):
+    """
+    Returns list of (reason, old date, new date) of the diagnostics
+    Task.start_date() and Task.end_date() record for computed dates, for
+    tasks computed elsewhere
+
+    Keyword arguments:
+    task -- Task object
+    start_date -- datetime.date, first day computed
+    end_date -- datetime.date, last day computed
+    latest -- datetime.date, latest first day before stop, used if only
+              stop and duration are given
+    real_end -- datetime.date, last worked day until stop, used if stop is
+                given
+    """
+    diagnostics = []
+    if task.start is not None:
+        if start_date > task.start:
+            diagnostics.append((DIAGNOSTIC_VACATIONS if task.depends_of is None else DIAGNOSTIC_DEPENDENCIES, task.start, start_date))
+    else:
+        if task.stop is not None and task.depends_of is not None and start_date > latest:
+            diagnostics.append((DIAGNOSTIC_LATE_START, latest, start_date))
+        diagnostics.append((DIAGNOSTIC_START_CHANGED, None, start_date))
+    if not isinstance(task, Milestone) and task.stop is not None and (real_end <= start_date or real_end != task.stop):
+        diagnostics.append((DIAGNOSTIC_LATE_END, task.stop, end_date))
+    return diagnostics
+
+
+def _invalidate_projects(projects, nb_elements=False):
+    """
+    Drop cached start and end dates and progress of projects and of the
+    projects containing them, up to the root of each one
+
+    Keyword arguments:
+    projects -- list of Project objects
+    nb_elements -- boolean, also drop cached number of elements
+    """
+    todo = list(projects)
+    seen = set(todo)
+    while len(todo) > 0:
+        p = todo.pop()
+        p.cache_start_date = None
+        p.cache_end_date = None
+        p.cache_progress = None
+        if nb_elements:
+            p.cache_nb_elements = None
+        for x in p._parents:
+            if x not in seen:
+                seen.add(x)
+                todo.append(x)
+    return
+
+
+def _simulate_batch(graph, nb_samples, seed=None):
+    """
+    Simulates nb_samples schedules of a dependencies graph exported by
+    Project._simulation_graph. Durations of tasks are drawn for all samples
+    together and dates, counted in worked days, are computed task by task in
+    scheduling order on arrays of samples.
+
+    Returns (finishes, nb_critical) where :
+    finishes -- array, last day of each group of tasks for each sample
+    nb_critical -- array, number of samples where each task is critical
+
+    Keyword arguments:
+    graph -- dictionnary of arrays describing tasks and dependencies
+    nb_samples -- int, number of schedules to simulate
+    seed -- int, seed of the random generator, default None
+    """
+    import numpy
+
+    random = numpy.random.RandomState(seed)
+    nb = len(graph['days'])
+    lowest = numpy.iinfo('int64').min // 4
+
+    # durations in worked days
+    days = numpy.empty((nb, nb_samples), dtype='int64')
+    for i in range(nb):
+        law = graph['law'][i]
+        low, mode, high = graph['low'][i], graph['mode'][i], graph['high'][i]
+        if law == 0:
+            days[i] = graph['days'][i]
+            continue
+        if high <= low:
+            x = numpy.full(nb_samples, low)
+        elif law == 1:
+            x = random.triangular(low, mode, high, nb_samples)
+        else:
+            alpha = 1 + 4 * (mode - low) / (high - low)
+            beta = 1 + 4 * (high - mode) / (high - low)
+            x = low + random.beta(alpha, beta, nb_samples) * (high - low)
+        days[i] = numpy.maximum(numpy.ceil(x), 1)
+
+    # forward pass, see Task.start_date() and Task.end_date()
+    es = numpy.empty((nb, nb_samples), dtype='int64')
+    ef = numpy.empty((nb, nb_samples), dtype='int64')
+    ptr, pred, lag = graph['pred_ptr'], graph['pred_index'], graph['pred_lag']
+    for i in range(nb):
+        if graph['backward'][i]:
+            start = graph['deadline'][i] - days[i] + 1
+        else:
+            start = numpy.full(nb_samples, graph['fixed'][i], dtype='int64')
+        for k in range(ptr[i], ptr[i + 1]):
+            start = numpy.maximum(start, ef[pred[k]] + lag[k])
+        es[i] = start
+        if graph['milestone'][i]:
+            ef[i] = start
+        elif graph['deadline'][i] > lowest:
+            ef[i] = numpy.where(graph['deadline'][i] > start, graph['deadline'][i], start + days[i] - 1)
+        else:
+            ef[i] = start + days[i] - 1
+
+    # backward pass, a task is critical if it can not end later
+    finish = ef.max(axis=0)
+    nb_critical = numpy.zeros(nb, dtype='int64')
+    ls = numpy.empty((nb, nb_samples), dtype='int64')
+    ptr, succ, lag = graph['succ_ptr'], graph['succ_index'], graph['succ_lag']
+    for i in reversed(range(nb)):
+        late = finish
+        for k in range(ptr[i], ptr[i + 1]):
+            late = numpy.minimum(late, ls[succ[k]] - lag[k])
+        ls[i] = late - (ef[i] - es[i])
+        nb_critical[i] = numpy.count_nonzero(late <= ef[i])
+
+    finishes = numpy.empty((len(graph['groups']), nb_samples), dtype='int64')
+    for g, group in enumerate(graph['groups']):
+        finishes[g] = ef[group].max(axis=0)
+
+    return (finishes, nb_critical)
+
+
+# Graph given to each process of Project.simulate pool
+_SIMULATION_GRAPH = None
+
+
+def _init_simulation_worker(graph):
+    """
+    Keeps the graph to simulate in the process, see Project.simulate
+    """
+    global _SIMULATION_GRAPH
+    _SIMULATION_GRAPH = graph
+    return
+
+
+def _simulate_batch_in_worker(batch):
+    """
+    Simulates a batch (nb_samples, seed) of the graph of the process
+    """
+    return _simulate_batch(_SIMULATION_GRAPH, batch[0], batch[1])
+
+
+def _resources_of(order):
+    """
+    Returns list of resources and groups of resources of tasks, in order of
+    first use
+
+    Keyword arguments:
+    order -- list of Tasks
+    """
+    resources = []
+    seen = set()
+    for t in order:
+        for r in (getattr(t, 'resources', None) or []):
+            if r not in seen:
+                seen.add(r)
+                resources.append(r)
+    return resources
+
+
+def _default_context_state():
+    """
+    Returns module globals of the default context (not worked days, font
+    attributes, vacations and repeated vacations), to give them to the
+    processes of a pool which do not inherit them, see
+    _set_default_context_state
+    """
+    return (NOT_WORKED_DAYS, FONT_ATTR, VACATIONS, RECURRING_VACATIONS)
+
+
+def _set_default_context_state(state):
+    """
+    Installs module globals of the default context given by
+    _default_context_state in the process
+
+    Keyword arguments:
+    state -- tuple (not worked days, font attributes, vacations, repeated vacations)
+    """
+    global NOT_WORKED_DAYS, FONT_ATTR
+    NOT_WORKED_DAYS = list(state[0])
+    FONT_ATTR = dict(state[1])
+    VACATIONS[:] = state[2]
+    RECURRING_VACATIONS[:] = state[3]
+    _reset_working_days()
+    return
+
+
+class _SnapshotRef(object):
+    """
+    Position of an object in a snapshot, see _snapshot. Position -1 is the
+    default context of the process
+    """
+    __slots__ = ('index',)
+
+    def __init__(self, index):
+        self.index = index
+        return
+
+
+def _slots_of(cls):
+    """
+    Returns dictionnary of slot descriptors of cls and of its base classes,
+    read directly as subclasses may hide some of them with properties
+
+    Keyword arguments:
+    cls -- class
+    """
+    slots = {}
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name not in ('__dict__', '__weakref__'):
+                slots[name] = klass.__dict__[name]
+    return slots
+
+
+def _snapshot(value):
+    """
+    Returns a flat copy of value, to give it to the processes of a pool :
+    each object of this module reachable from value is listed once with its
+    attributes, other objects being replaced by their position in the list.
+    Pickling it does not follow chains of dependencies, successors or tasks
+    of resources recursively. See _from_snapshot
+
+    Keyword arguments:
+    value -- object, list or tuple of objects to copy
+    """
+    objects = []
+    position = {}
+    refs = [_SnapshotRef(-1)]
+
+    def _flat(x):
+        t = type(x)
+        if t is list:
+            return [_flat(y) for y in x]
+        if t is tuple:
+            return tuple([_flat(y) for y in x])
+        if t is set or t is frozenset:
+            return t([_flat(y) for y in x])
+        if t is dict:
+            return dict([(_flat(k), _flat(v)) for (k, v) in x.items()])
+        if t.__module__ != __name__:
+            return x
+        if x is _DEFAULT_CONTEXT:
+            return refs[0]
+        i = position.get(id(x))
+        if i is None:
+            i = len(objects)
+            position[id(x)] = i
+            objects.append(x)
+            refs.append(_SnapshotRef(i))
+        return refs[i + 1]
+
+    root = _flat(value)
+    states = []
+    # objects found while copying attributes are appended to the list
+    k = 0
+    while k < len(objects):
+        x = objects[k]
+        slots = []
+        for (name, descriptor) in _slots_of(type(x)).items():
+            try:
+                slots.append((name, _flat(descriptor.__get__(x, type(x)))))
+            except AttributeError:
+                # slot not set
+                pass
+        attributes = None
+        if hasattr(x, '__dict__'):
+            attributes = _flat(x.__dict__)
+        states.append((type(x), slots, attributes))
+        k += 1
+    return (states, root)
+
+
+def _from_snapshot(snapshot):
+    """
+    Returns the copy of the value given to _snapshot
+
+    Keyword arguments:
+    snapshot -- tuple returned by _snapshot
+    """
+    states, root = snapshot
+    objects = [cls.__new__(cls) for (cls, slots, attributes) in states]
+
+    def _object(x):
+        t = type(x)
+        if t is list:
+            return [_object(y) for y in x]
+        if t is tuple:
+            return tuple([_object(y) for y in x])
+        if t is set or t is frozenset:
+            return t([_object(y) for y in x])
+        if t is dict:
+            return dict([(_object(k), _object(v)) for (k, v) in x.items()])
+        if t is _SnapshotRef:
+            if x.index < 0:
+                return _DEFAULT_CONTEXT
+            return objects[x.index]
+        return x
+
+    for (obj, (cls, slots, attributes)) in zip(objects, states):
+        descriptors = _slots_of(cls)
+        for (name, value) in slots:
+            descriptors[name].__set__(obj, _object(value))
+        if attributes is not None:
+            obj.__dict__.update(_object(attributes))
+    return _object(root)
+
+
+# Project given to each process of Project.compare_scenarios pool
+_SCENARIO_PROJECT = None
+
+
+def _init_scenario_worker(context, snapshot):
+    """
+    Keeps the project to compare scenarios of in the process, with the
+    default context of the parent process, see Project.compare_scenarios
+
+    Keyword arguments:
+    context -- default context state, see _default_context_state
+    snapshot -- project as given by _snapshot
+    """
+    global _SCENARIO_PROJECT
+    _set_default_context_state(context)
+    _SCENARIO_PROJECT = _from_snapshot(snapshot)
+    return
+
+
+def _run_scenario_in_worker(portable):
+    """
+    Runs a scenario of the project of the process given as (changes,
+    vacations) with tasks and resources by position, see Scenario._portable.
+    Returns list of (task position, start, end) of tasks whose dates changed
+    """
+    order = _SCENARIO_PROJECT.schedule()
+    resources = _resources_of(order)
+    scenario = Scenario(_SCENARIO_PROJECT)
+    for (attribute, i, value) in portable[0]:
+        scenario._changes.append((attribute, order[i], value))
+    for (j, dfrom, dto) in portable[1]:
+        scenario._vacations.append((resources[j], dfrom, dto))
+
+    position = {}
+    for i, t in enumerate(order):
+        position[t] = i
+    dates = scenario._run(order)
+    return [(position[t], dates[t][0], dates[t][1]) for t in dates]
+
+
+# Scheduled project (project, order, outputs) given to each process of
+# Project.make_outputs pool
+_OUTPUTS_SNAPSHOT = None
+
+
+def _init_outputs_worker(context, snapshot):
+    """
+    Keeps the scheduled project to render outputs of in the process, with
+    the default context of the parent process, see Project.make_outputs
+
+    Keyword arguments:
+    context -- default context state, see _default_context_state
+    snapshot -- (project, order, outputs) as given by _snapshot
+    """
+    global _OUTPUTS_SNAPSHOT
+    _set_default_context_state(context)
+    _OUTPUTS_SNAPSHOT = _from_snapshot(snapshot)
+    return
+
+
+def _make_output_in_worker(i):
+    """
+    Renders the output at position i of the project of the process, without
+    scheduling it again
+    """
+    project, order, outputs = _OUTPUTS_SNAPSHOT
+    return project._make_output(order, outputs[i])
+
+############################################################################
+class GroupOfResources(object):
+    """
+    Class for grouping resources
+    """
+    __slots__ = ('name', 'fullname', 'vacations', 'recurring_vacations', '_vacations_intervals',
+                 'resources', '_resources_set', 'tasks', '_tasks_set', '_task_tables', 'context')
+
+    def __init__(self, name, fullname=None, context=None):
+        """
+        Init a group of resource resource
+
+        Keyword arguments:
+        name -- name given to the resource (id)
+        fullname -- long name given to the resource
+        context -- Context of the group, default None for the one of its
+                   first task or resource
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** GroupOfResources::__init__ {0}'.format({'name':name}))
+        self.name = _intern(name)
+        self.vacations = []
+        self.recurring_vacations = []
+        self._vacations_intervals = _Intervals()
+        if fullname is not None:
+            self.fullname = _intern(fullname)
+        else:
+            self.fullname = self.name
+
+        self.resources = []
+        self._resources_set = set()
+
+        self.tasks = []
+        self._tasks_set = set()
+        # TaskTables with rows assigned to the resource
+        self._task_tables = []
+        self.context = context
+        return
+
+
+    def _context(self):
+        """
+        Returns the Context of the group: its own one, the one of its first
+        task or resource, or the default one
+        """
+        if self.context is not None:
+            return self.context
+        for x in self.tasks + self.resources:
+            return x._context()
+        return _DEFAULT_CONTEXT
+
+
+    def add_resource(self, resource):
+        """
+        Add a resource to the group of resources
+
+        Keyword arguments:
+        resource -- Resource object
+        """
+        if resource not in self._resources_set:
+            self._resources_set.add(resource)
+            self.resources.append(resource)
+            resource.add_group(self)
+        return
+
+
+    def add_vacations(self, dfrom, dto=None, repeat=None, until=None):
+        """
+        Add vacations to a resource begining at [dfrom] to [dto] (included). If
+        [dto] is not defined, vacation will be for [dfrom] day only
+
+        If [repeat] is given, vacations are repeated (every week for '+1w',
+        every two months for '+2m'...) until [until] if given.
+
+        Keyword arguments:
+        dfrom -- datetime.date begining of vacation
+        dto -- datetime.date end of vacation of vacation
+        repeat -- string, org-mode like repeater ('+1d', '+1w', '++1m', '.+1y'...), default None
+        until -- datetime.date, last day of repeated vacations, default None
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Resource::add_vacations {0}'.format({'name':self.name, 'dfrom':dfrom, 'dto':dto, 'repeat':repeat, 'until':until}))
+        if repeat is not None:
+            self.recurring_vacations.append(_Recurrence(dfrom, dto, repeat, until))
+        elif dto is None:
+            self.vacations.append((dfrom, dfrom))
+        else:
+            self.vacations.append((dfrom, dto))
+        return
+
+
+    def _vacations(self):
+        """
+        Returns vacations as _Intervals
+        """
+        return self._vacations_intervals.update_from(self.vacations)
+
+
+    def _is_on_vacation(self, day):
+        """
+        Returns True if day is in vacations or repeated vacations
+
+        Keyword arguments:
+        day -- datetime.date
+        """
+        if self._vacations().contains(day):
+            return True
+        for r in self.recurring_vacations:
+            if r.contains(day):
+                return True
+        return False
+
+
+    def _vacations_between(self, dfrom, dto):
+        """
+        Returns list of (first day, last day) of vacations and repeated
+        vacations between dfrom and dto
+
+        Keyword arguments:
+        dfrom -- datetime.date, first day to look at
+        dto -- datetime.date, last day to look at
+        """
+        vacations = list(self._vacations())
+        for r in self.recurring_vacations:
+            vacations.extend(r.occurrences(dfrom, dto))
+        return vacations
+
+
+
+    def nb_elements(self):
+        """
+        Returns the number of resources
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** GroupOfResources::nb_elements ({0})'.format({'name':self.name}))
+        return len(self.resources)
+
+
+
+    def is_available(self, date):
+        """
+        Returns True if any resource is available at given date, False if not.
+        Availibility is taken from the global VACATIONS and resource's ones.
+
+        Keyword arguments:
+        date -- datetime.date day to look for
+        """
+        # Global VACATIONS
+        if self._context().is_vacation(date):
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** GroupOfResources::is_available {0} : False (global vacation)'.format({'name':self.name, 'date':date}))
+            return False
+
+        # Group vacations
+        if self._is_on_vacation(date):
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** GroupOfResources::is_available {0} : False (group vacation)'.format({'name':self.name, 'date':date}))
+            return False
+
+        # Test if at least one resource is avalaible
+        for r in self.resources:
+            if r.is_available(date):
+                if __LOG__.isEnabledFor(logging.DEBUG):
+                    __LOG__.debug('** GroupOfResources::is_available {0} : True {1}'.format({'name':self.name, 'date':date}, r.name))
+                return True
+
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** GroupOfResources::is_available {0} : False'.format({'name':self.name, 'date':date}))
+        return False
+
+
+    def add_task(self, task):
+        """
+        Tell the resource that we have assigned a task
+
+        Keyword arguments:
+        task -- Task object
+        """
+        if task not in self._tasks_set:
+            self._tasks_set.add(task)
+            self.tasks.append(task)
+        return
+
+
+    def _add_task_table(self, table):
+        """
+        Tell the resource that rows of a TaskTable are assigned to it
+
+        Keyword arguments:
+        table -- TaskTable object
+        """
+        if table not in self._task_tables:
+            self._task_tables.append(table)
+        return
+
+
+    def _task_entries(self):
+        """
+        Returns list of (first day, last day, fullname) of tasks and rows of
+        TaskTables assigned to the resource
+        """
+        entries = [(t.start_date(), t.end_date(), t.fullname) for t in self.tasks]
+        for table in self._task_tables:
+            entries.extend(table._task_entries(self))
+        return entries
+
+
+    def search_for_task_overloads(self, dfrom=None, dto=None, all_tasks=False):
+        """
+        Returns a list of (first day, last day, list of tasks) for each run of
+        days (datetime.date) where the group has more tasks than resources.
+
+        It examines all resources member and group tasks.
+
+        Keyword arguments:
+        dfrom -- datetime.date, first day to look at, default None
+        dto -- datetime.date, last day to look at, default None
+        all_tasks -- if True return all runs of days with tasks, not just overcharged ones
+        """
+        entries = []
+        for r in self.resources:
+            entries.extend(r._task_entries())
+        entries.extend(self._task_entries())
+
+        runs = _sweep_overloads(entries, self.nb_elements(), dfrom, dto, all_tasks, self._context().not_worked_days)
+        if not all_tasks:
+            for (first, last, tasks) in runs:
+                __LOG__.warning('** GroupOfResources "{3}" has more than {4} tasks from day {0} to {1} / {2}'.format(first, last, tasks, self.name, self.nb_elements()))
+        return runs
+
+
+    def search_for_task_conflicts(self, all_tasks = False):
+        """
+        Returns a dictionnary of all days (datetime.date) containing for each
+        overcharged day the list of task for this day.
+
+        It examines all resources member and group tasks.
+
+        Keyword arguments:
+        all_tasks -- if True return all tasks for all days, not just overcharged days
+        """
+        return _days_of_runs(self.search_for_task_overloads(all_tasks=all_tasks), self._context().not_worked_days)
+
+
+
+    def is_vacant(self, from_date, to_date):
+        """
+        Check if any resource from the group is unallocated between for a given timeframe.
+        Returns a list of available ressource name.
+        
+        Keyword arguments:
+        from_date -- first day
+        to_date --  last day
+        """
+        availables = []
+        for r in self.resources:
+            if len(r.is_vacant(from_date, to_date)) >0:
+                availables.append(r.name)
+                
+        return availables
+
+
+    def find_free_slots(self, duration, after, before=None):
+        """
+        Returns a list of (first day, last day, resource) of periods between
+        after and before where a resource of the group has neither task nor
+        vacations, of at least duration worked days, sorted by first day.
+        Last day is None if the resource is free from first day on.
+
+        Tasks given to the group itself are not taken into account, they are
+        not affected to one resource.
+
+        Keyword arguments:
+        duration -- int, number of worked days needed
+        after -- datetime.date, first day to look at
+        before -- datetime.date, last day to look at, default None
+        """
+        slots = []
+        for (i, r) in enumerate(self.resources):
+            for (dfrom, dto) in r.find_free_slots(duration, after, before):
+                slots.append((dfrom, i, dto, r))
+        slots.sort(key=lambda x: (x[0], x[1]))
+        return [(dfrom, dto, r) for (dfrom, i, dto, r) in slots]
+
+
+############################################################################
+
+class Resource(object):
+    """
+    Class for handling resources assigned to tasks
+    """
+    __slots__ = ('name', 'fullname', 'vacations', 'recurring_vacations', '_vacations_intervals',
+                 'member_of_groups', 'tasks', '_tasks_set', '_task_tables', 'context',
+                 '_free_slots_index', '_free_slots_key', '_free_slots_window')
+
+    def __init__(self, name, fullname=None, context=None):
+        """
+        Init a resource
+
+        Keyword arguments:
+        name -- name given to the resource (id)
+        fullname -- long name given to the resource
+        context -- Context of the resource, default None for the one of its
+                   first task
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Resource::__init__ {0}'.format({'name':name}))
+        self.name = _intern(name)
+        if fullname is not None:
+            self.fullname = _intern(fullname)
+        else:
+            self.fullname = self.name
+
+        self.vacations = []
+        self.recurring_vacations = []
+        self._vacations_intervals = _Intervals()
+        self.member_of_groups = []
+
+        self.tasks = []
+        self._tasks_set = set()
+        # TaskTables with rows assigned to the resource
+        self._task_tables = []
+        self.context = context
+        self._free_slots_index = None
+        self._free_slots_key = None
+        self._free_slots_window = None
+        return
+
+
+    def _context(self):
+        """
+        Returns the Context of the resource: its own one, the one of its
+        first task or the default one
+        """
+        if self.context is not None:
+            return self.context
+        for t in self.tasks:
+            return t._context()
+        return _DEFAULT_CONTEXT
+
+
+    def add_vacations(self, dfrom, dto=None, repeat=None, until=None):
+        """
+        Add vacations to a resource begining at [dfrom] to [dto] (included). If
+        [dto] is not defined, vacation will be for [dfrom] day only
+
+        If [repeat] is given, vacations are repeated (every week for '+1w',
+        every two months for '+2m'...) until [until] if given.
+
+        Keyword arguments:
+        dfrom -- datetime.date begining of vacation
+        dto -- datetime.date end of vacation of vacation
+        repeat -- string, org-mode like repeater ('+1d', '+1w', '++1m', '.+1y'...), default None
+        until -- datetime.date, last day of repeated vacations, default None
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Resource::add_vacations {0}'.format({'name':self.name, 'dfrom':dfrom, 'dto':dto, 'repeat':repeat, 'until':until}))
+        if repeat is not None:
+            self.recurring_vacations.append(_Recurrence(dfrom, dto, repeat, until))
+        elif dto is None:
+            self.vacations.append((dfrom, dfrom))
+        else:
+            self.vacations.append((dfrom, dto))
+        return
+
+
+    def _vacations(self):
+        """
+        Returns vacations as _Intervals
+        """
+        return self._vacations_intervals.update_from(self.vacations)
+
+
+    def _is_on_vacation(self, day):
+        """
+        Returns True if day is in vacations or repeated vacations
+
+        Keyword arguments:
+        day -- datetime.date
+        """
+        if self._vacations().contains(day):
+            return True
+        for r in self.recurring_vacations:
+            if r.contains(day):
+                return True
+        return False
+
+
+    def _vacations_between(self, dfrom, dto):
+        """
+        Returns list of (first day, last day) of vacations and repeated
+        vacations between dfrom and dto
+
+        Keyword arguments:
+        dfrom -- datetime.date, first day to look at
+        dto -- datetime.date, last day to look at
+        """
+        vacations = list(self._vacations())
+        for r in self.recurring_vacations:
+            vacations.extend(r.occurrences(dfrom, dto))
+        return vacations
+
+
+    def nb_elements(self):
+        """
+        Returns the number of resources, 1 here
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Resource::nb_elements ({0})'.format({'name':self.name}))
+        return 1
+
+
+    def is_available(self, date):
+        """
+        Returns True if the resource is available at given date, False if not.
+        Availibility is taken from the global VACATIONS and resource's ones.
+
+        Keyword arguments:
+        date -- datetime.date day to look for
+        """
+        # global VACATIONS
+        if self._context().is_vacation(date):
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** Resource::is_available {0} : False (global vacation)'.format({'name':self.name, 'date':date}))
+            return False
+        
+        # GroupOfResources vacation
+        for g in self.member_of_groups:
+            if g._is_on_vacation(date):
+                if __LOG__.isEnabledFor(logging.DEBUG):
+                    __LOG__.debug('** Resource::is_available {0} : False (Group {1})'.format({'name':self.name, 'date':date}, g.name))
+                return False
+
+        # Resource vacation
+        if self._is_on_vacation(date):
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** Resource::is_available {0} : False'.format({'name':self.name, 'date':date}))
+            return False
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Resource::is_available {0} : True'.format({'name':self.name, 'date':date}))
+        return True
+
+
+    def add_group(self, groupofresources):
+        """
+        Tell the resource it belongs to a GroupOfResources
+        
+        Keyword arguments:
+        groupofresources -- GroupOfResources
+        """
+        if groupofresources not in self.member_of_groups:
+            self.member_of_groups.append(groupofresources)
+        return
+
+
+    def add_task(self, task):
+        """
+        Tell the resource that we have assigned a task
+
+        Keyword arguments:
+        task -- Task object
+        """
+        if task not in self._tasks_set:
+            self._tasks_set.add(task)
+            self.tasks.append(task)
+        return
+
+
+    def _add_task_table(self, table):
+        """
+        Tell the resource that rows of a TaskTable are assigned to it
+
+        Keyword arguments:
+        table -- TaskTable object
+        """
+        if table not in self._task_tables:
+            self._task_tables.append(table)
+        return
+
+
+    def _task_entries(self):
+        """
+        Returns list of (first day, last day, fullname) of tasks and rows of
+        TaskTables assigned to the resource
+        """
+        entries = [(t.start_date(), t.end_date(), t.fullname) for t in self.tasks]
+        for table in self._task_tables:
+            entries.extend(table._task_entries(self))
+        return entries
+
+
+    def search_for_task_overloads(self, dfrom=None, dto=None, all_tasks=False):
+        """
+        Returns a list of (first day, last day, list of tasks) for each run of
+        days (datetime.date) where the resource has more than one task.
+
+        Keyword arguments:
+        dfrom -- datetime.date, first day to look at, default None
+        dto -- datetime.date, last day to look at, default None
+        all_tasks -- if True return all runs of days with tasks, not just overcharged ones
+        """
+        entries = self._task_entries()
+        runs = _sweep_overloads(entries, 1, dfrom, dto, all_tasks, self._context().not_worked_days)
+        if not all_tasks:
+            for (first, last, tasks) in runs:
+                __LOG__.warning('** Resource "{3}" has more than one task from day {0} to {1} / {2}'.format(first, last, tasks, self.name))
+        return runs
+
+
+    def search_for_task_conflicts(self, all_tasks=False):
+        """
+        Returns a dictionnary of all days (datetime.date) containing for each
+        overcharged day the list of task for this day.
+
+        Keyword arguments:
+        all_tasks -- if True return all tasks for all days, not just overcharged days
+        """
+        return _days_of_runs(self.search_for_task_overloads(all_tasks=all_tasks), self._context().not_worked_days)
+            
+
+
+    def is_vacant(self, from_date, to_date):
+        """
+        Check if the resource is unallocated between for a given timeframe.
+        Returns True if the resource is free, False otherwise
+        
+        Keyword arguments:
+        from_date -- first day
+        to_date --  last day
+        """
+        for (first, last, tasks) in self.search_for_task_overloads(from_date, to_date, all_tasks=True):
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** Ressource "{0}" is not available on day {1} (other task : {2})'.format(self.name, first, tasks))
+            return []
+
+        cday = from_date
+        while cday <= to_date:
+            if cday.weekday() not in self._context().not_worked_days:
+                if not self.is_available(cday):
+                    if __LOG__.isEnabledFor(logging.DEBUG):
+                        __LOG__.debug('** Ressource "{0}" is not available on day {1} (vacation)'.format(self.name, cday))
+                    return []
+
+            cday += datetime.timedelta(days=1)
+        return [self.name]
+
+
+    def _free_slots(self, after, before):
+        """
+        Returns _FreeSlots of days without task nor vacations of the
+        resource and last day it is valid for, built again when tasks,
+        vacations or calendar changed.
+
+        Repeated vacations are only taken between after and before, or for
+        two years after the last task if before is None.
+
+        Keyword arguments:
+        after -- datetime.date, first day to look at
+        before -- datetime.date, last day to look at or None
+        """
+        groups = self.member_of_groups
+        key = (self._context()._working_days(), len(self.tasks),
+               len(self.vacations), len(self.recurring_vacations),
+               tuple([(g, len(g.vacations), len(g.recurring_vacations)) for g in groups]))
+        repeated = len(self.recurring_vacations) + sum([len(g.recurring_vacations) for g in groups]) > 0
+
+        if self._free_slots_index is not None and self._free_slots_key == key:
+            window = self._free_slots_window
+            if window is None:
+                return (self._free_slots_index, None)
+            if after >= window[0] and ((before is not None and before <= window[1])
+                                       or (before is None and after + datetime.timedelta(days=366) <= window[1])):
+                return (self._free_slots_index, window[1])
+
+        busy = [(t.start_date(), t.end_date()) for t in self.tasks]
+        window = None
+        if repeated:
+            last = before
+            if last is None:
+                last = max([after] + [e for (b, e) in busy]) + datetime.timedelta(days=2 * 366)
+            window = (after, last)
+        busy.extend(self._vacations_between(after, window[1] if window else after))
+        for g in groups:
+            busy.extend(g._vacations_between(after, window[1] if window else after))
+        self._free_slots_index = _FreeSlots(busy, self._context()._working_days())
+        self._free_slots_key = key
+        self._free_slots_window = window
+        return (self._free_slots_index, None if window is None else window[1])
+
+
+    def find_free_slots(self, duration, after, before=None):
+        """
+        Returns a list of (first day, last day) of periods between after and
+        before without task nor vacations of the resource, of at least
+        duration worked days. Last day is None if the resource is free from
+        first day on. With repeated vacations and no before, periods are
+        looked for up to two years after the last task.
+
+        Keyword arguments:
+        duration -- int, number of worked days needed
+        after -- datetime.date, first day to look at
+        before -- datetime.date, last day to look at, default None
+        """
+        index, last = self._free_slots(after, before)
+        if before is None:
+            before = last
+        return index.find(_nb_days_from_duration(duration), after, before)
+
+############################################################################
+
+
+def _svg_bar_extent(first, last, start, end, scale=DRAW_WITH_DAILY_SCALE):
+    """
+    Returns (x, width, begin mark, end mark) of a bar from first to last
+    day drawn between start and end, x and width in mm, marks True if the
+    bar begins before start or ends after end. Returns None if the bar is
+    not drawn.
+
+    Keyword arguments:
+    first -- datetime.date, first day of the bar
+    last -- datetime.date, last day of the bar
+    start -- datetime.date of first day to draw
+    end -- datetime.date of last day to draw
+    scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+    """
+    add_begin_mark = False
+    add_end_mark = False
+
+    if scale == DRAW_WITH_DAILY_SCALE:
+        def _time_diff(e, s):
+            return (e - s).days
+        def _time_diff_d(e, s):
+            return _time_diff(e, s) + 1
+
+    elif scale == DRAW_WITH_WEEKLY_SCALE:
+        def _time_diff(end_date, start_date):
+            td = 0
+            guess = start_date
+            while guess.weekday() != 0:
+                guess = guess + dateutil.relativedelta.relativedelta(days=-1)
+
+            while end_date.weekday() != 6:
+                end_date = end_date + dateutil.relativedelta.relativedelta(days=+1)
+                
+            while guess + dateutil.relativedelta.relativedelta(days=+6) < end_date:
+                td += 1
+                guess = guess + dateutil.relativedelta.relativedelta(weeks=+1)
+
+            return td 
+        def _time_diff_d(e, s):
+            return _time_diff(e, s) + 1
+
+    elif scale == DRAW_WITH_MONTHLY_SCALE:
+        def _time_diff(end_date, start_date):
+            return dateutil.relativedelta.relativedelta(end_date, start_date).months + dateutil.relativedelta.relativedelta(end_date, start_date).years*12
+        def _time_diff_d(e, s):
+            return _time_diff(e, s) + 1
+
+
+    elif scale == DRAW_WITH_QUATERLY_SCALE:
+        __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
+        sys.exit(1)
+
+
+
+    # cas 1 -s--S==E--e-
+    if first >= start and last <= end:
+        x = _time_diff(first, start) * 10
+        d = _time_diff_d(last, first) * 10
+    # cas 5 -s--e--S==E-
+    elif first > end:
+        return None
+    # cas 6 -S==E-s--e-
+    elif last < start:
+        return None
+    # cas 2 -S==s==E--e-
+    elif first < start and last <= end:
+        x = 0
+        d = _time_diff_d(last, start) * 10
+        add_begin_mark = True
+    # cas 3 -s--S==e==E-
+    elif first >= start and  last > end:
+        x = _time_diff(first, start) * 10 
+        d = _time_diff_d(end, first) * 10
+        add_end_mark = True
+    # cas 4 -S==s==e==E-
+    elif first < start and last > end:
+        x = 0
+        d = _time_diff_d(end, start) * 10 
+        add_end_mark = True
+        add_begin_mark = True
+    else:
+        return None
+
+    return (x, d, add_begin_mark, add_end_mark)
+
+
+def _svg_dependency_line(elements, svg, start, end, arrow):
+    """
+    Adds a dashed line of dependency to svg, ending with the dependency
+    marker if arrow is True
+
+    Keyword arguments:
+    elements -- _SvgwriteElements, _StreamElements or _CompactElements
+    svg -- element to add the line to
+    start -- (x, y) in mm
+    end -- (x, y) in mm
+    arrow -- boolean
+    """
+    if not arrow:
+        svg.add(elements.Line(
+                start=(start[0]*mm, start[1]*mm),
+                end=(end[0]*mm, end[1]*mm),
+                stroke='black',
+                stroke_dasharray='5,3',
+                ))
+        return
+    marker_end = elements.dependency_marker(svg)
+    svg.add(elements.Line(
+            start=(start[0]*mm, start[1]*mm),
+            end=(end[0]*mm, end[1]*mm),
+            stroke='black',
+            stroke_dasharray='5,3',
+            marker_end=marker_end,
+            ))
+    return
+
+
+class _TileIndex(object):
+    """
+    Layout of a project at one scale, cut in square tiles of size columns
+    and lines : tasks, milestones, titles of projects and lines of
+    dependencies are indexed by the tiles they intersect, so that drawing a
+    tile only draws what is visible in it.
+    """
+    def __init__(self, project, start, end, scale=DRAW_WITH_DAILY_SCALE, size=32, title_align_on_left=False, critical_tasks=None):
+        """
+        Lays project out, without drawing it
+
+        Keyword arguments:
+        project -- scheduled Project to draw
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        size -- int, number of columns and lines of a tile
+        title_align_on_left -- boolean, align task title on left
+        critical_tasks -- set of Tasks to highlight as critical
+        """
+        self.project = project
+        self.start = start
+        self.end = end
+        self.scale = scale
+        self.size = size
+        self.title_align_on_left = title_align_on_left
+        self.critical_tasks = critical_tasks
+        # number of columns and lines of the whole drawing
+        self.width = project._svg_width(start, end, scale) + 1
+        self.height = project._svg_height(start, end) + 3
+        # tile -> tasks and titles, tile -> lines of dependencies
+        self.items = collections.defaultdict(list)
+        self.lines = collections.defaultdict(list)
+        self._layout(project, 2, project.color, 0)
+        self._layout_dependencies(project)
+        return
+
+    @staticmethod
+    def _text_width(text, font_size):
+        """
+        Returns an estimate of the width in mm of text
+        """
+        return len(text) * font_size * 0.6 / mm
+
+    def _index(self, index, item, x0, y0, x1, y1):
+        """
+        Adds item to index for the tiles intersecting the box from (x0, y0)
+        to (x1, y1) in mm, lower bounds included
+        """
+        size = self.size * 10
+        for tx in range(int(x0 // size), max(int(math.ceil(x1 / size)), int(x0 // size) + 1)):
+            for ty in range(int(y0 // size), max(int(math.ceil(y1 / size)), int(y0 // size) + 1)):
+                index[(tx, ty)].append(item)
+        return
+
+    def _layout(self, project, prev_y, color, level):
+        """
+        Indexes project drawn from line prev_y as Project._svg would draw
+        it, caches coordinates of its tasks and returns its number of lines
+        """
+        if color is None or project.color is not None:
+            color = project.color
+
+        height = project._svg_height(self.start, self.end, level)
+        if height == 0:
+            return 0
+
+        if project._svg_has_title(self.start, self.end, level):
+            x1 = 6*level + 3 + self._text_width(project.name, 15+3)
+            self._index(self.items, ('title', project, prev_y, height, level), 0, prev_y*10, x1, (prev_y+height)*10)
+
+        cy = prev_y + 1*(project.name != "")
+        for t in project.tasks:
+            if isinstance(t, Project):
+                cy += self._layout(t, cy, color, level+1)
+                continue
+            theight = t._svg_height(self.start, self.end, level+1)
+            extent = t._svg_extent(self.start, self.end, self.scale)
+            if theight == 0 or extent is None:
+                continue
+            x, d = extent[0], extent[1]
+            y = cy * 10
+            t.drawn_x_begin_coord = x
+            t.drawn_x_end_coord = x+d
+            t.drawn_y_coord = y
+
+            if self.title_align_on_left:
+                tx = 5
+            else:
+                tx = x+2
+            x1 = max(x + max(d, 10), tx + self._text_width(t.fullname, 15))
+            if not isinstance(t, Milestone) and t.resources is not None:
+                x1 = max(x1, x + 2 + self._text_width(" / ".join([r.name for r in t.resources]), 15-5))
+            self._index(self.items, ('task', t, cy, color, level+1), min(x, tx), y, x1, y + theight*10)
+            cy += theight
+        return height
+
+    def _layout_dependencies(self, project):
+        """
+        Indexes lines of dependencies of tasks of project, once tasks are
+        laid out
+        """
+        for t in project.tasks:
+            if isinstance(t, Project):
+                self._layout_dependencies(t)
+                continue
+            for line in t._svg_dependency_lines(self.project):
+                (x0, y0), (x1, y1), arrow = line
+                # room for the marker
+                self._index(self.lines, line, min(x0, x1) - 3, min(y0, y1) - 3, max(x0, x1) + 3, max(y0, y1) + 3)
+        return
+
+    def nb_tiles(self):
+        """
+        Returns (number of tiles along x, number of tiles along y)
+        """
+        return ((self.width + self.size - 1) // self.size, (self.height + self.size - 1) // self.size)
+
+    def svg(self, filename, tx, ty, today=None):
+        """
+        Draws the tile (tx, ty) and output it to filename. The viewBox of
+        the tile is its part of the whole drawing, so tiles put side by side
+        draw it.
+
+        Keyword arguments:
+        filename -- string, filename to save to OR file object
+        tx -- int, column of the tile
+        ty -- int, line of the tile
+        today -- datetime.date of day marked as a reference
+        """
+        elements = _StreamElements
+        size = self.size * cm
+        stream = _SvgStream(filename, width=size, height=size, viewbox='{0} {1} {2} {3}'.format(tx*size, ty*size, size, size))
+        stream.add(elements.Rect(
+                    insert=(tx*size, ty*size),
+                    size=(size, size),
+                    fill='white',
+                    stroke_width=0,
+                    opacity=1
+                    ))
+
+        # calendar of the columns of the tile
+        first = tx * self.size
+        nb_columns = min(self.size, self.width - first)
+        if nb_columns > 0:
+            if self.scale == DRAW_WITH_DAILY_SCALE:
+                first_date = self.start + dateutil.relativedelta.relativedelta(days=+first)
+            elif self.scale == DRAW_WITH_WEEKLY_SCALE:
+                first_date = self.start + dateutil.relativedelta.relativedelta(weeks=+first)
+            else:
+                first_date = self.start + dateutil.relativedelta.relativedelta(months=+first)
+            stream.open_group(elements.Group(transform='translate({0},0)'.format(first*cm)))
+            # names of days, weeks, months and years are in the first lines
+            self.project._svg_calendar(nb_columns-1, self.height-3, first_date, today, self.scale, elements=elements, stream=stream, header=(ty == 0))
+            stream.close_group()
+
+        stream.open_group()
+        for item in self.items.get((tx, ty), ()):
+            if item[0] == 'title':
+                void, project, prev_y, height, level = item
+                for element in project._svg_title(elements, prev_y, prev_y + height, level):
+                    stream.add(element)
+            else:
+                void, t, cy, color, level = item
+                trepr, theight = t._svg(elements, cy, start=self.start, end=self.end, color=color, level=level, scale=self.scale, title_align_on_left=self.title_align_on_left, critical_tasks=self.critical_tasks)
+                stream.add(trepr)
+
+        lines = self.lines.get((tx, ty), ())
+        if len(lines) > 0:
+            dep = elements.Group()
+            for start, end, arrow in lines:
+                _svg_dependency_line(elements, dep, start, end, arrow)
+            stream.add(dep)
+        stream.close_group()
+        stream.close()
+        return
+
+
+class _TaskDrawing(object):
+    """
+    Coordinates of a Task as last drawn, kept apart from the task so that
+    tasks never drawn do not carry them
+    """
+    __slots__ = ('x_begin', 'x_end', 'y')
+
+    def __init__(self):
+        self.x_begin = None
+        self.x_end = None
+        self.y = None
+        return
+
+
+
+class Task(object):
+    """
+    Class for manipulating Tasks
+    """
+    __slots__ = ('name', 'fullname', '_start', '_stop', '_duration', '_depends_of',
+                 '_resources', '_percent_done', 'color', 'display', 'state',
+                 'duration_distribution', 'cache_start_date', 'cache_end_date',
+                 '_successors', '_projects', '_diagnostics', '_drawing')
+
+    def __init__(self, name, start=None, stop=None, duration=None, depends_of=None, resources=None, percent_done=0, color=None, fullname=None, display=True, state=''):
+        """
+        Initialize task object. Two of start, stop or duration may be given.
+        This task can rely on other task and will be completed with resources.
+        If percent done is given, a progress bar will be included on the task.
+        If color is specified, it will be used for the task.
+
+        Keyword arguments:
+        name -- name of the task (id)
+        fullname -- long name given to the resource
+        start -- datetime.date, first day of the task, default None
+        stop -- datetime.date, last day of the task, default None
+        duration -- int, duration of the task, default None
+        depends_of -- list of Task which are parents of this one, default None
+        resources -- list of Resources assigned to the task, default None
+        percent_done -- int, percent of achievment, default 0
+        color -- string, html color, default None
+        display -- boolean, display this task, default True
+        state -- string, state of the task
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::__init__ {0}'.format({'name':name, 'start':start, 'stop':stop, 'duration':duration, 'depends_of':depends_of, 'resources':resources, 'percent_done':percent_done}))
+        self.cache_start_date = None
+        self.cache_end_date = None
+        # Tasks depending of this one, empty tuple until there is one
+        self._successors = ()
+        # Projects the task was added to
+        self._projects = ()
+        # ScheduleDiagnostic of the cached dates, empty tuple until there is one
+        self._diagnostics = ()
+        # _TaskDrawing, once the task is drawn
+        self._drawing = None
+
+        self.name = name
+        if fullname is not None:
+            self.fullname = fullname
+        else:
+            self.fullname = name
+
+        self.start = start
+        self.stop = stop
+        self.duration = duration
+        self.color = _intern(color)
+        self.display = display
+        self.state = _intern(state)
+
+        ends = (self.start, self.stop, self.duration)
+        nonecount = 0
+        for e in ends:
+            if e is None:
+                nonecount += 1
+
+        # check limits (2 must be set on 4) or scheduling is defined by duration and dependencies
+        if nonecount != 1 and  (self.duration is None or depends_of is None):
+            __LOG__.error('** Task "{1}" must be defined by two of three limits ({0})'.format({'start':self.start, 'stop':self.stop, 'duration':self.duration}, fullname))
+            # Bug ? may be defined later
+            #raise ValueError('Task "{1}" must be defined by two of three limits ({0})'.format({'start':self.start, 'stop':self.stop, 'duration':self.duration}, fullname))
+
+        self.depends_of = depends_of
+
+        self.resources = resources
+        self.percent_done = percent_done
+        # (law, minimum, likely, maximum), see set_duration_distribution
+        self.duration_distribution = None
+
+        return
+
+
+    # Changing start, stop, duration or dependencies of a task drops the
+    # cached dates of the task and of all the tasks depending of it
+
+    @property
+    def start(self):
+        return self._start
+
+    @start.setter
+    def start(self, start):
+        self._start = start
+        self._invalidate_dates()
+
+
+    @property
+    def stop(self):
+        return self._stop
+
+    @stop.setter
+    def stop(self, stop):
+        self._stop = stop
+        self._invalidate_dates()
+
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @duration.setter
+    def duration(self, duration):
+        self._duration = duration
+        self._invalidate_dates()
+
+
+    @property
+    def percent_done(self):
+        return self._percent_done
+
+    @percent_done.setter
+    def percent_done(self, percent_done):
+        # progress of projects is cached, dates of tasks do not change
+        self._percent_done = percent_done
+        _invalidate_projects(self._projects)
+
+
+    @property
+    def resources(self):
+        return self._resources
+
+    @resources.setter
+    def resources(self, resources):
+        old_resources = getattr(self, '_resources', None) or []
+        self._resources = resources
+
+        # tell each resource we have
+        # assigned a new task
+        if resources is not None:
+            for r in resources:
+                r.add_task(self)
+
+        # tasks of each resource are indexed by projects containing the task
+        todo = list(self._projects)
+        seen = set(todo)
+        while len(todo) > 0:
+            p = todo.pop()
+            for r in old_resources:
+                tasks = p._tasks_of_resource.get(r)
+                if tasks is not None and self in tasks:
+                    tasks.remove(self)
+                    if len(tasks) == 0:
+                        del p._tasks_of_resource[r]
+            for r in (resources or []):
+                p._tasks_of_resource.setdefault(r, []).append(self)
+            p._resources_list = None
+            for x in p._parents:
+                if x not in seen:
+                    seen.add(x)
+                    todo.append(x)
+
+
+    @property
+    def depends_of(self):
+        return self._depends_of
+
+    @depends_of.setter
+    def depends_of(self, depends_of):
+        for d in (depends_of if type(depends_of) is type([]) else [depends_of]):
+            if isinstance(d, _TaskView):
+                raise ValueError('Task "{0}" can not depend of "{1}", a row of a TaskTable, add it to the table instead'.format(self.name, d.name))
+        old_depends_of = getattr(self, '_depends_of', None)
+        if old_depends_of is not None:
+            for d in old_depends_of:
+                if isinstance(d, Task) and len(d._successors) > 0:
+                    d._successors.discard(self)
+
+        if type(depends_of) is type([]):
+            self._depends_of = depends_of
+        elif depends_of is not None:
+            self._depends_of = [depends_of]
+        else:
+            self._depends_of = None
+
+        if self._depends_of is not None:
+            for d in self._depends_of:
+                if isinstance(d, Task):
+                    # set made on first successor, most tasks have none
+                    if len(d._successors) == 0:
+                        d._successors = set()
+                    d._successors.add(self)
+
+        self._invalidate_dates()
+
+
+    # Coordinates of the last drawing of the task, see _TaskDrawing
+
+    def _drawing_state(self):
+        if self._drawing is None:
+            self._drawing = _TaskDrawing()
+        return self._drawing
+
+    @property
+    def drawn_x_begin_coord(self):
+        if self._drawing is None:
+            return None
+        return self._drawing.x_begin
+
+    @drawn_x_begin_coord.setter
+    def drawn_x_begin_coord(self, value):
+        if value is not None or self._drawing is not None:
+            self._drawing_state().x_begin = value
+
+
+    @property
+    def drawn_x_end_coord(self):
+        if self._drawing is None:
+            return None
+        return self._drawing.x_end
+
+    @drawn_x_end_coord.setter
+    def drawn_x_end_coord(self, value):
+        if value is not None or self._drawing is not None:
+            self._drawing_state().x_end = value
+
+
+    @property
+    def drawn_y_coord(self):
+        if self._drawing is None:
+            return None
+        return self._drawing.y
+
+    @drawn_y_coord.setter
+    def drawn_y_coord(self, value):
+        if value is not None or self._drawing is not None:
+            self._drawing_state().y = value
+
+
+    def _invalidate_dates(self):
+        """
+        Drop cached dates of the task and of every task depending of it,
+        directly or not
+        """
+        todo = [self]
+        seen = set(todo)
+        projects = set()
+        while len(todo) > 0:
+            t = todo.pop()
+            t.cache_start_date = None
+            t.cache_end_date = None
+            t._diagnostics = ()
+            for r in getattr(t, 'resources', None) or []:
+                # free days of resources depend on tasks dates
+                if isinstance(r, Resource):
+                    r._free_slots_index = None
+            projects.update(t._projects)
+            for s in t._successors:
+                if s not in seen:
+                    seen.add(s)
+                    todo.append(s)
+        _invalidate_projects(projects)
+        return
+
+
+    def _diagnose(self, reason, old_date, new_date):
+        """
+        Records a ScheduleDiagnostic for the task and logs it if its level is
+        enabled
+
+        Keyword arguments:
+        reason -- DIAGNOSTIC_* constant
+        old_date -- datetime.date, date given or expected
+        new_date -- datetime.date, date computed
+        """
+        diagnostic = ScheduleDiagnostic(self, reason, old_date, new_date)
+        if len(self._diagnostics) == 0:
+            self._diagnostics = []
+        self._diagnostics.append(diagnostic)
+        if __LOG__.isEnabledFor(diagnostic.level()):
+            __LOG__.log(diagnostic.level(), diagnostic.message())
+        return
+
+
+    def _is_scheduled(self):
+        """
+        Returns True if start and end dates of the task are cached
+        """
+        return self.cache_start_date is not None and self.cache_end_date is not None
+
+
+    def _context(self):
+        """
+        Returns the Context of the task: the one of the first project it was
+        added to or the default one
+        """
+        for p in self._projects:
+            return p._context()
+        return _DEFAULT_CONTEXT
+
+
+    def add_depends(self, depends_of):
+        """
+        Adds dependency to a task
+
+        Keyword arguments:
+        depends_of -- list of Task which are parents of this one
+        """
+        if depends_of is None:
+            return
+
+        if type(depends_of) is not type([]):
+            depends_of = [depends_of]
+
+        if self.depends_of is None:
+            self.depends_of = depends_of
+        else:
+            self.depends_of = self.depends_of + depends_of
+
+        return
+
+
+    def set_duration_distribution(self, minimum, likely, maximum, law=DISTRIBUTION_TRIANGULAR):
+        """
+        Gives the uncertainty on the duration of the task, used by
+        Project.simulate. Durations are counted in days, as duration.
+
+        Keyword arguments:
+        minimum -- float, shortest duration
+        likely -- float, most likely duration
+        maximum -- float, longest duration
+        law -- DISTRIBUTION_TRIANGULAR or DISTRIBUTION_PERT (beta law with the
+               same three estimates)
+        """
+        if law not in (DISTRIBUTION_TRIANGULAR, DISTRIBUTION_PERT):
+            raise ValueError('Unknown law of distribution: {0}'.format(law))
+        if not 0 <= minimum <= likely <= maximum:
+            raise ValueError('Task "{0}": durations should be 0 <= minimum <= likely <= maximum ({1}, {2}, {3})'.format(self.fullname, minimum, likely, maximum))
+        self.duration_distribution = (law, minimum, likely, maximum)
+        return
+
+
+    def start_date(self):
+        """
+        Returns the first day of the task, either the one which was given at
+        task creation or the one calculated after checking dependencies
+        """
+        if self.cache_start_date is not None:
+            return self.cache_start_date
+
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::start_date ({0})'.format(self.name))
+        wd = self._context()._working_days()
+        if self.start is not None:
+            # start date setted, calculate begining
+            if self.depends_of is None:
+                # depends of nothing... start date is start
+                #__LOG__.debug('*** Do not depend of other task')
+                start = wd.next_worked_day(self.start)
+
+                if start > self.start:
+                    self._diagnose(DIAGNOSTIC_VACATIONS, self.start, start)
+
+                self.cache_start_date = start
+                return self.cache_start_date
+            else:
+                # depends of other task, start date could vary
+                #__LOG__.debug('*** Do depend of other tasks')
+                start = wd.next_worked_day(self.start)
+
+                prev_task_end = start
+                for t in self.depends_of:
+                    if isinstance(t, Milestone):
+                        if t.end_date() >= prev_task_end:
+                            prev_task_end = t.end_date()
+                    elif isinstance(t, Task):
+                        if t.end_date() >= prev_task_end:
+                            prev_task_end = t.end_date() + datetime.timedelta(days=1)
+
+                prev_task_end = wd.next_worked_day(prev_task_end)
+
+                if prev_task_end > self.start:
+                    self._diagnose(DIAGNOSTIC_DEPENDENCIES, self.start, prev_task_end)
+
+                self.cache_start_date = prev_task_end
+                return self.cache_start_date
+
+        elif self.duration is None: # start and stop fixed
+            current_day = self.start
+            # check depends
+            if self.depends_of is not None:
+                prev_task_end = self.depends_of[0].end_date()
+                for t in self.depends_of:
+                    if isinstance(t, Milestone):
+                        if t.end_date() > prev_task_end:
+                            prev_task_end = t.end_date() - datetime.timedelta(days=1)
+                    elif isinstance(t, Task):
+                        if t.end_date() > prev_task_end:
+                            prev_task_end = t.end_date()
+                    # if t.end_date() > prev_task_end:
+                    #     #__LOG__.debug('*** latest one {0} which end on {1}'.format(t.name, t.end_date()))
+                    #     prev_task_end = t.end_date()
+                if prev_task_end > current_day:
+                    depend_start_date = prev_task_end
+                else:
+                    depend_start_date = wd.next_worked_day(self.start)
+
+                    if depend_start_date > current_day:
+                        self._diagnose(DIAGNOSTIC_LATE_START, current_day, depend_start_date)
+                    self.cache_start_date = depend_start_date           
+            else:
+                # should be first day of start...
+                self.cache_start_date = current_day            
+
+            return self.cache_start_date
+
+        elif self.duration is not None and self.depends_of is not None and self.stop is None :  # duration and dependencies fixed
+            prev_task_end = self.depends_of[0].end_date()
+            for t in self.depends_of:
+                if isinstance(t, Milestone):
+                    if t.end_date() > prev_task_end:
+                        prev_task_end = t.end_date() - datetime.timedelta(days=1)
+                elif isinstance(t, Task):
+                    if t.end_date() > prev_task_end:
+                        prev_task_end = t.end_date()
+                # if t.end_date() > prev_task_end:
+                #     __LOG__.debug('*** latest one {0} which end on {1}'.format(t.name, t.end_date()))
+                #     prev_task_end = t.end_date()
+
+            start = wd.next_worked_day(prev_task_end + datetime.timedelta(days=1))
+
+            # should be first day of start...
+            self.cache_start_date = start
+
+        elif self.start is None and self.stop is not None: # stop and duration fixed
+            # start date not setted, calculate from end_date + depends
+            if self.duration is not None and self.duration > 0:
+                current_day = wd.nth_worked_day_backward(self.stop, _nb_days_from_duration(self.duration))
+            else:
+                current_day = self.stop + datetime.timedelta(days=1)
+
+            # check depends
+            if self.depends_of is not None:
+                prev_task_end = self.depends_of[0].end_date()
+                for t in self.depends_of:
+                    if isinstance(t, Milestone):
+                        if t.end_date() > prev_task_end:
+                            prev_task_end = t.end_date()
+                    elif isinstance(t, Task):
+                        if t.end_date() > prev_task_end:
+                            prev_task_end = t.end_date()
+                    # if t.end_date() > prev_task_end:
+                    #     __LOG__.debug('*** latest one {0} which end on {1}'.format(t.name, t.end_date()))
+                    #     prev_task_end = t.end_date()
+
+                if prev_task_end > current_day:
+                    start = prev_task_end + datetime.timedelta(days=1)
+                    #return prev_task_end
+                else:
+                    start = current_day
+
+                depend_start_date = wd.next_worked_day(start)
+
+                if depend_start_date > current_day:
+                    self._diagnose(DIAGNOSTIC_LATE_START, current_day, depend_start_date)
+                    self.cache_start_date = depend_start_date           
+                else:
+                    # should be first day of start...
+                    self.cache_start_date = depend_start_date
+            else:
+                # should be first day of start...
+                self.cache_start_date = current_day            
+
+
+        if self.cache_start_date != self.start:
+            self._diagnose(DIAGNOSTIC_START_CHANGED, self.start, self.cache_start_date)
+        return self.cache_start_date
+
+
+    def end_date(self):
+        """
+        Returns the last day of the task, either the one which was given at task
+        creation or the one calculated after checking dependencies
+        """
+        # Should take care of resources vacations ?
+        if self.cache_end_date is not None:
+            return self.cache_end_date
+
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::end_date ({0})'.format(self.name))
+        wd = self._context()._working_days()
+
+        if self.duration is None or self.start is None and self.stop is not None:
+            # Take care of vacations
+            real_end = wd.previous_worked_day(self.stop)
+
+            if real_end <= self.start_date():
+                self.cache_end_date = wd.nth_worked_day(self.start_date(), _nb_days_from_duration(self.duration))
+                self._diagnose(DIAGNOSTIC_LATE_END, self.stop, self.cache_end_date)
+                return self.cache_end_date
+                    
+
+            self.cache_end_date = real_end
+            if real_end != self.stop:
+                self._diagnose(DIAGNOSTIC_LATE_END, self.stop, self.cache_end_date)
+
+
+                
+            return self.cache_end_date
+
+        if self.stop is None:
+            self.cache_end_date = wd.nth_worked_day(self.start_date(), _nb_days_from_duration(self.duration))
+            return self.cache_end_date
+
+        raise(ValueError)
+        return None
+
+    def svg(self, prev_y=0, start=None, end=None, color=None, level=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None):
+        """
+        Return SVG for drawing this task.
+
+        Keyword arguments:
+        prev_y -- int, line to start to draw
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        color -- string of color for drawing the project
+        level -- int, indentation level of the project, not used here
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        title_align_on_left -- boolean, align task title on left
+        critical_tasks -- set of Tasks to highlight as critical
+        """
+        return self._svg(_SvgwriteElements, prev_y, start, end, color, level, scale, title_align_on_left, critical_tasks)
+
+
+    def _svg_height(self, start, end, level=None):
+        """
+        Returns the number of lines svg draws for this task, without drawing
+        it
+
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        level -- int, indentation level of the project, not used here
+        """
+        if not self.display or self.start_date() > end or self.end_date() < start:
+            return 0
+        return 1
+
+
+    def _svg_extent(self, start, end, scale=DRAW_WITH_DAILY_SCALE):
+        """
+        Returns (x, width, begin mark, end mark) of the bar of the task
+        between start and end, or None if the task is not drawn, see
+        _svg_bar_extent
+
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        """
+        return _svg_bar_extent(self.start_date(), self.end_date(), start, end, scale)
+
+
+    def _svg(self, elements, prev_y=0, start=None, end=None, color=None, level=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None):
+        """
+        Return (element, number of lines) for drawing this task, built with
+        elements (_SvgwriteElements, _StreamElements or _CompactElements).
+        See svg for other arguments.
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::svg ({0})'.format({'name':self.name, 'prev_y':prev_y, 'start':start, 'end':end, 'color':color, 'level':level}))
+
+        if not self.display:
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** Task::svg ({0}) display off'.format({'name':self.name}))
+            return(None, 0)
+
+        add_modified_begin_mark = False
+        add_modified_end_mark = False
+
+        if start is None:
+            start = self.start_date()
+
+        if self.start is not None and self.start_date() != self.start:
+            add_modified_begin_mark = True
+
+        if end is None:
+            end = self.end_date()
+
+        if self.stop is not None and self.end_date() != self.stop:
+            add_modified_end_mark = True
+
+        # override project color if defined
+        if self.color is not None:
+            color = self.color
+
+        extent = self._svg_extent(start, end, scale)
+        if extent is None:
+            return (None, 0)
+        x, d, add_begin_mark, add_end_mark = extent
+        self.drawn_x_begin_coord = x
+        self.drawn_x_end_coord = x+d
+
+        y = prev_y * 10
+        self.drawn_y_coord = y
+
+        svg = elements.Group(id=self.name.replace(' ', '_'))
+        svg.add(elements.Rect(
+                insert=((x+1)*mm, (y+1)*mm),
+                size=((d-2)*mm, 8*mm),
+                fill=color,
+                stroke=color,
+                stroke_width=2,
+                opacity=0.85,
+                ))
+        svg.add(elements.Rect(
+                insert=((x+1)*mm, (y+6)*mm),
+                size=(((d-2))*mm, 3*mm),
+                fill="#909090",
+                stroke=color,
+                stroke_width=1,
+                opacity=0.2,
+                ))
+
+        if add_modified_begin_mark:
+            svg.add(elements.shape('modified-mark', x+1, y+1,
+                    fill="#0000FF",
+                    stroke=color,
+                    stroke_width=1,
+                    opacity=0.35,
+                    ))
+
+        if add_modified_end_mark:
+            svg.add(elements.shape('modified-mark', x+d-7+1, y+1,
+                    fill="#0000FF",
+                    stroke=color,
+                    stroke_width=1,
+                    opacity=0.35,
+                    ))
+        
+
+        if add_begin_mark:
+            svg.add(elements.shape('mark', x+1, y+1,
+                    fill="#000000",
+                    stroke=color,
+                    stroke_width=1,
+                    opacity=0.2,
+                    ))
+        if add_end_mark:
+            svg.add(elements.shape('mark', x+d-7+1, y+1,
+                    fill="#000000",
+                    stroke=color,
+                    stroke_width=1,
+                    opacity=0.2,
+                    ))
+
+        if self.percent_done is not None and self.percent_done > 0:
+            # Bar shade
+            svg.add(elements.Rect(
+                    insert=((x+1)*mm, (y+6)*mm),
+                    size=(((d-2)*self.percent_done/100)*mm, 3*mm),
+                    fill="#F08000",
+                    stroke=color,
+                    stroke_width=1,
+                    opacity=0.35,
+                ))
+
+        if critical_tasks is not None and self in critical_tasks:
+            svg.add(elements.Rect(
+                    insert=((x+1)*mm, (y+1)*mm),
+                    size=((d-2)*mm, 8*mm),
+                    fill='none',
+                    stroke="#FF0000",
+                    stroke_width=4,
+                    opacity=0.85,
+                    ))
+
+        if not title_align_on_left:
+            tx = x+2
+        else:
+            tx = 5
+            
+        svg.add(elements.Text(self.fullname, insert=((tx)*mm, (y + 5)*mm), fill=self._context().font_attributes['fill'], stroke=self._context().font_attributes['stroke'], stroke_width=self._context().font_attributes['stroke_width'], font_family=self._context().font_attributes['font_family'], font_size=15))
+
+        if self.resources is not None:
+            t = " / ".join(["{0}".format(r.name) for r in self.resources])
+            svg.add(elements.Text("{0}".format(t), insert=((x+2)*mm, (y + 8.5)*mm), fill='purple', stroke=self._context().font_attributes['stroke'], stroke_width=self._context().font_attributes['stroke_width'], font_family=self._context().font_attributes['font_family'], font_size=15-5))
+
+
+        return (svg, 1)
+
+
+    def svg_dependencies(self, prj):
+        """
+        Draws svg dependencies between task and project according to coordinates
+        cached when drawing tasks
+
+        Keyword arguments:
+        prj -- Project object to check against
+        """
+        return self._svg_dependencies(_SvgwriteElements, prj)
+
+
+    def _svg_dependencies(self, elements, prj):
+        """
+        Return element of dependencies of the task, built with elements
+        (_SvgwriteElements, _StreamElements or _CompactElements). See
+        svg_dependencies.
+        """
+        if self.depends_of is None:
+            return None
+        svg = elements.Group()
+        for start, end, arrow in self._svg_dependency_lines(prj):
+            _svg_dependency_line(elements, svg, start, end, arrow)
+        return svg
+
+
+    def _svg_dependency_lines(self, prj):
+        """
+        Returns the lines drawing dependencies of the task, as a list of
+        (start, end, arrow) with start and end in mm and arrow True for the
+        line ending on the task
+
+        Keyword arguments:
+        prj -- Project object to check against
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::svg_dependencies ({0})'.format({'name':self.name, 'prj':prj}))
+        lines = []
+        if self.depends_of is None:
+            return lines
+        for t in self.depends_of:
+            if t.drawn_x_end_coord is None or t.drawn_y_coord is None or self.drawn_x_begin_coord is None or not prj.is_in_project(t):
+                continue
+            if isinstance(t, Milestone):
+                if t.drawn_x_end_coord < self.drawn_x_begin_coord:
+                    # horizontal line
+                    lines.append(((t.drawn_x_end_coord + 9, t.drawn_y_coord + 5), (self.drawn_x_begin_coord, t.drawn_y_coord + 5), False))
+                    # vertical line
+                    lines.append(((self.drawn_x_begin_coord, t.drawn_y_coord + 5), (self.drawn_x_begin_coord, self.drawn_y_coord + 5), True))
+                else:
+                    # horizontal line
+                    lines.append(((t.drawn_x_end_coord + 9, t.drawn_y_coord + 5), (self.drawn_x_begin_coord + 10, t.drawn_y_coord + 5), False))
+                    # vertical
+                    lines.append(((self.drawn_x_begin_coord + 10, t.drawn_y_coord + 5), (self.drawn_x_begin_coord + 10, t.drawn_y_coord + 15), False))
+                    # horizontal line
+                    lines.append(((self.drawn_x_begin_coord, t.drawn_y_coord + 15), (self.drawn_x_begin_coord + 10, t.drawn_y_coord + 15), False))
+                    # vertical line
+                    lines.append(((self.drawn_x_begin_coord, t.drawn_y_coord + 15), (self.drawn_x_begin_coord, self.drawn_y_coord + 5), True))
+            elif isinstance(t, Task):
+                # horizontal line
+                lines.append(((t.drawn_x_end_coord - 2, t.drawn_y_coord + 5), (self.drawn_x_begin_coord, t.drawn_y_coord + 5), False))
+                # vertical line
+                lines.append(((self.drawn_x_begin_coord, t.drawn_y_coord + 5), (self.drawn_x_begin_coord, self.drawn_y_coord + 5), True))
+        return lines
+
+
+    def nb_elements(self):
+        """
+        Returns the number of task, 1 here
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::nb_elements ({0})'.format({'name':self.name}))
+        return 1
+
+
+    def _reset_coord(self):
+        """
+        Reset cached elements of task
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::reset_coord ({0})'.format({'name':self.name}))
+        self._drawing = None
+        self.cache_start_date = None
+        self.cache_end_date = None
+        self._diagnostics = ()
+        return
+
+    def _reset_drawing(self):
+        """
+        Reset coordinates of the last drawing of task, keeping its schedule
+        """
+        self._drawing = None
+        return
+
+
+    def is_in_project(self, task):
+        """
+        Return True if the given Task is itself... (lazy coding ;)
+        
+        Keyword arguments:
+        task -- Task object 
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Task::is_in_project ({0})'.format({'name':self.name, 'task':task}))
+        if task is self:
+            return True
+
+        return False
+
+
+    def get_resources(self):
+        """
+        Returns Resources used in the task
+        """
+        return self.resources
+
+
+
+    def check_conflicts_between_task_and_resources_vacations(self):
+        """
+        Displays a warning for each conflict between tasks and vacation of
+        resources affected to the task
+
+        And returns a dictionnary for resource vacation conflicts
+        """
+        conflicts = []
+        if self.get_resources() is None:
+            return conflicts
+        for r in self.get_resources():
+            cday = self.start_date()
+            while cday <= self.end_date():
+                if cday.weekday() not in self._context().not_worked_days and not r.is_available(cday):
+                    conflicts.append({'resource':r.name,'date':cday, 'task':self.name})
+                    __LOG__.warning('** Caution resource "{0}" is affected on task "{2}" during vacations on day {1}'.format(r.name, cday, self.fullname))
+                cday += datetime.timedelta(days=1)
+        return conflicts
+
+
+    def csv(self, csv=None):
+        """
+        Create CSV output from tasks
+
+        Keyword arguments:
+        csv -- None, dymmy object
+        """
+        if self.resources is not None:
+            resources = ', '.join([x.fullname for x in self.resources])
+        else:
+            resources = ''
+            
+        csv_text = '"{0}";"{1}";{2};{3};{4};"{5}";\r\n'.format(
+            self.state.replace('"', '\\"'),
+            self.fullname.replace('"', '\\"'),
+            self.start_date(),
+            self.end_date(),
+            self.duration,
+            resources.replace('"', '\\"')
+            )
+        return csv_text
+
+
+############################################################################
+
+
+class Milestone(Task):
+    """
+    Class for manipulating Milestones
+    """
+    __slots__ = ()
+
+    def __init__(self, name, start=None, depends_of=None, color=None, fullname=None, display=True):
+        """
+        Initialize milestone object. Two of start, stop or duration may be given.
+        This milestone can rely on other milestone and will be completed with resources.
+        If percent done is given, a progress bar will be included on the milestone.
+        If color is specified, it will be used for the milestone.
+
+        Keyword arguments:
+        name -- name of the milestone (id)
+        fullname -- long name given to the resource
+        start -- datetime.date, first day of the milestone, default None
+        depends_of -- list of Milestone which are parents of this one, default None
+        color -- string, html color, default None
+        display -- boolean, display this milestone, default True
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Milestone::__init__ {0}'.format({'name':name, 'start':start, 'depends_of':depends_of}))
+        self.cache_start_date = None
+        self.cache_end_date = None
+        # Tasks depending of this milestone, empty tuple until there is one
+        self._successors = ()
+        # Projects the milestone was added to
+        self._projects = ()
+        # ScheduleDiagnostic of the cached date, empty tuple until there is one
+        self._diagnostics = ()
+        # _TaskDrawing, once the milestone is drawn
+        self._drawing = None
+
+        self.name = name
+        if fullname is not None:
+            self.fullname = fullname
+        else:
+            self.fullname = name
+
+        self.start = start
+        self.stop = start
+        self.duration = 0
+        if color is not None:
+            self.color = _intern(color)
+        else:
+            self.color = '#FF3030'
+            
+        self.display = display
+        self.state = 'Milestone'
+
+        self.depends_of = depends_of
+        self.duration_distribution = None
+
+        return
+
+
+    def end_date(self):
+        """
+        Returns the last day of the milestone, either the one which was given at milestone
+        creation or the one calculated after checking dependencies
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Milestone::end_date ({0})'.format(self.name))
+        #return self.start_date() - datetime.timedelta(days=1)
+        return self.start_date()
+
+
+    def _is_scheduled(self):
+        """
+        Returns True if the date of the milestone is cached
+        """
+        return self.cache_start_date is not None
+
+
+    def _svg_height(self, start, end, level=None):
+        """
+        Returns the number of lines svg draws for this milestone, without
+        drawing it
+
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        level -- int, indentation level of the project, not used here
+        """
+        if not self.display or self.start_date() < start or self.end_date() > end:
+            return 0
+        return 2
+
+
+    def _svg_extent(self, start, end, scale=DRAW_WITH_DAILY_SCALE):
+        """
+        Returns (x, 0, False, False) where x in mm is the position of the
+        milestone, or None if it is not drawn between start and end. See
+        Task._svg_extent
+        """
+        if scale == DRAW_WITH_DAILY_SCALE:
+            def _time_diff(e, s):
+                return (e - s).days
+            def _time_diff_d(e, s):
+                return _time_diff(e, s) + 1
+
+        elif scale == DRAW_WITH_WEEKLY_SCALE:
+            def _time_diff(end_date, start_date):
+                td = 0
+                guess = start_date
+                # find first day of the week
+                while guess.weekday() != 0:
+                    guess = guess + dateutil.relativedelta.relativedelta(days=-1)
+                # find last day of the week                
+                while end_date.weekday() != 6:
+                    end_date = end_date + dateutil.relativedelta.relativedelta(days=+1)
+                    
+                while guess <= end_date:
+                    td += 1
+                    guess = guess + dateutil.relativedelta.relativedelta(weeks=+1)
+
+                return td - 1
+            def _time_diff_d(e, s):
+                return _time_diff(e, s) + 1
+
+        elif scale == DRAW_WITH_MONTHLY_SCALE:
+            def _time_diff(end_date, start_date):
+                return dateutil.relativedelta.relativedelta(end_date, start_date).months + dateutil.relativedelta.relativedelta(end_date, start_date).years*12
+            def _time_diff_d(e, s):
+                return _time_diff(e, s) + 1
+
+
+        elif scale == DRAW_WITH_QUATERLY_SCALE:
+            __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
+            sys.exit(1)
+
+
+
+        # cas 1 -s--X--e-
+        if self.start_date() >= start and self.end_date() <= end:
+            return (_time_diff(self.start_date(), start) * 10, 0, False, False)
+        return None
+
+
+    def _svg(self, elements, prev_y=0, start=None, end=None, color=None, level=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None):
+        """
+        Return (element, number of lines) for drawing this milestone, built
+        with elements.
+
+        Keyword arguments:
+        elements -- _SvgwriteElements, _StreamElements or _CompactElements
+        prev_y -- int, line to start to draw
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        color -- string of color for drawing the project
+        level -- int, indentation level of the project, not used here
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        title_align_on_left -- boolean, align milestone title on left
+        critical_tasks -- set of Tasks to highlight as critical
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Milestone::svg ({0})'.format({'name':self.name, 'prev_y':prev_y, 'start':start, 'end':end, 'color':color, 'level':level}))
+
+        if not self.display:
+            if __LOG__.isEnabledFor(logging.DEBUG):
+                __LOG__.debug('** Milestone::svg ({0}) display off'.format({'name':self.name}))
+            return(None, 0)
+
+        #add_modified_begin_mark = False
+        #add_modified_end_mark = False
+
+        if start is None:
+            start = self.start_date()
+
+        #if self.start_date() != self.start and self.start is not None:
+        #    add_modified_begin_mark = True
+
+        if end is None:
+            end = self.end_date()
+
+        #if self.end_date() != self.stop and self.stop is not None:
+        #    add_modified_end_mark = True
+
+        # override project color if defined
+        if self.color is not None:
+            color = self.color
+
+        #add_begin_mark = False
+        #add_end_mark = False
+
+        extent = self._svg_extent(start, end, scale)
+        if extent is None:
+            return (None, 0)
+        x = extent[0]
+        self.drawn_x_begin_coord = x
+        self.drawn_x_end_coord = x
+
+        y = prev_y * 10
+        self.drawn_y_coord = y
+
+        #insert=((x+1)*mm, (y+1)*mm),
+        #size=((d-2)*mm, 8*mm),
+
+        svg = elements.Group(id=self.name.replace(' ', '_'))
+        # 3.543307 is for conversion from mm to pt units !
+        svg.add(elements.shape('milestone', x, y,
+                fill=color,
+                stroke=color,
+                stroke_width=2,
+                opacity=0.85,
+                ))
+
+        if critical_tasks is not None and self in critical_tasks:
+            svg.add(elements.shape('critical-milestone', x, y,
+                    fill='none',
+                    stroke="#FF0000",
+                    stroke_width=4,
+                    opacity=0.85,
+                    ))
+
+
+        if not title_align_on_left:
+            tx = x+2
+        else:
+            tx = 5
+            
+        svg.add(elements.Text(self.fullname, insert=((tx)*mm, (y + 5)*mm), fill=self._context().font_attributes['fill'], stroke=self._context().font_attributes['stroke'], stroke_width=self._context().font_attributes['stroke_width'], font_family=self._context().font_attributes['font_family'], font_size=15))
+
+
+        return (svg, 2)
+
+
+    def _svg_dependency_lines(self, prj):
+        """
+        Returns the lines drawing dependencies of the milestone, see
+        Task._svg_dependency_lines
+
+        Keyword arguments:
+        prj -- Project object to check against
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Milestone::svg_dependencies ({0})'.format({'name':self.name, 'prj':prj}))
+        lines = []
+        if self.depends_of is None:
+            return lines
+        for t in self.depends_of:
+            if t.drawn_x_end_coord is None or t.drawn_y_coord is None or self.drawn_x_begin_coord is None or not prj.is_in_project(t):
+                continue
+            if isinstance(t, Milestone):
+                # horizontal line
+                lines.append(((t.drawn_x_end_coord + 9, t.drawn_y_coord + 5), (self.drawn_x_begin_coord + 5, t.drawn_y_coord + 5), False))
+            elif isinstance(t, Task):
+                # horizontal line
+                lines.append(((t.drawn_x_end_coord - 2, t.drawn_y_coord + 5), (self.drawn_x_begin_coord + 5, t.drawn_y_coord + 5), False))
+            else:
+                continue
+            # vertical line
+            lines.append(((self.drawn_x_begin_coord + 5, t.drawn_y_coord + 5), (self.drawn_x_begin_coord + 5, self.drawn_y_coord), True))
+        return lines
+
+
+
+
+    def get_resources(self):
+        """
+        Returns Resources used in the milestone
+        """
+        return []
+
+
+
+    def check_conflicts_between_task_and_resources_vacations(self):
+        """
+        Displays a warning for each conflict between milestones and vacation of
+        resources affected to the milestone
+
+        And returns a dictionnary for resource vacation conflicts
+        """
+        return []
+
+
+    def csv(self, csv=None):
+        """
+        Create CSV output from milestones
+
+        Keyword arguments:
+        csv -- None, dymmy object
+        """
+        if self.resources is not None:
+            resources = ', '.join([x.fullname for x in self.resources])
+        else:
+            resources = ''
+            
+        csv_text = '"{0}";"{1}";{2};{3};{4};"{5}";\r\n'.format(
+            self.state.replace('"', '\\"'),
+            self.fullname.replace('"', '\\"'),
+            self.start_date(),
+            self.end_date(),
+            self.duration,
+            resources.replace('"', '\\"')
+            )
+        return csv_text
+    
+
+
+
+##</Milestone>##############################################################
+
+############################################################################
+
+
+class _TaskView(Task):
+    """
+    Task reading and writing a row of a TaskTable, see TaskTable.task
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        """
+        Keyword arguments:
+        table -- TaskTable object
+        row -- int, row of the task in the table
+        """
+        self._table = table
+        self._row = row
+        self._projects = ()
+        self._drawing = None
+        self.duration_distribution = None
+        return
+
+
+    def __copy__(self):
+        # plain Task or Milestone with the values of the row, for Scenario
+        if self._table.milestone[self._row]:
+            c = Milestone.__new__(Milestone)
+        else:
+            c = Task.__new__(Task)
+        c.name = self.name
+        c.fullname = self.fullname
+        c._start = self.start
+        c._stop = self.stop
+        c._duration = self.duration
+        c._depends_of = self.depends_of
+        c._resources = self.resources
+        c._percent_done = self.percent_done
+        c.color = self.color
+        c.display = self.display
+        c.state = self.state
+        c.duration_distribution = self.duration_distribution
+        c.cache_start_date = self.cache_start_date
+        c.cache_end_date = self.cache_end_date
+        c._successors = ()
+        c._projects = self._projects
+        c._diagnostics = ()
+        c._drawing = None
+        return c
+
+
+    @property
+    def name(self):
+        return self._table.names[self._row]
+
+    @property
+    def fullname(self):
+        fullname = self._table.fullnames[self._row]
+        if fullname is None:
+            return self._table.names[self._row]
+        return fullname
+
+    @property
+    def start(self):
+        return self._table._date(self._table.start[self._row])
+
+    @start.setter
+    def start(self, start):
+        self._table._set(self._row, start=start)
+
+    @property
+    def stop(self):
+        return self._table._date(self._table.stop[self._row])
+
+    @stop.setter
+    def stop(self, stop):
+        self._table._set(self._row, stop=stop)
+
+    @property
+    def duration(self):
+        return self._table._duration(self._row)
+
+    @duration.setter
+    def duration(self, duration):
+        self._table._set(self._row, duration=duration)
+
+    @property
+    def depends_of(self):
+        table = self._table
+        depends = table.depends_index[table.depends_ptr[self._row]:table.depends_ptr[self._row + 1]]
+        if len(depends) == 0:
+            return None
+        return [table.task(d) for d in depends]
+
+    @property
+    def _successors(self):
+        return [self._table.task(s) for s in self._table._successors_of(self._row)]
+
+    @property
+    def _diagnostics(self):
+        return self._table._diagnostics_of(self._row)
+
+    @_diagnostics.setter
+    def _diagnostics(self, diagnostics):
+        # diagnostics are derived from the table
+        pass
+
+    @property
+    def resources(self):
+        table = self._table
+        resources = table.resources_index[table.resources_ptr[self._row]:table.resources_ptr[self._row + 1]]
+        if len(resources) == 0:
+            return None
+        return [table.resources[r] for r in resources]
+
+    @property
+    def percent_done(self):
+        return self._table._number(self._table.percent_done[self._row])
+
+    @percent_done.setter
+    def percent_done(self, percent_done):
+        self._table.percent_done[self._row] = percent_done
+        _invalidate_projects(self._table._projects)
+
+    @property
+    def color(self):
+        return self._table.colors[self._table.color[self._row]]
+
+    @color.setter
+    def color(self, color):
+        self._table.color[self._row] = self._table._color_id(color)
+
+    @property
+    def display(self):
+        return True
+
+    @property
+    def state(self):
+        if self._table.milestone[self._row]:
+            return 'Milestone'
+        return ''
+
+    # dates are cached in the table, set to None to compute them again
+
+    @property
+    def cache_start_date(self):
+        if self._row < self._table._valid:
+            return self._table._date(self._table.start_day[self._row])
+        return None
+
+    @cache_start_date.setter
+    def cache_start_date(self, start_date):
+        if start_date is None:
+            self._table._invalidate(self._row)
+
+    @property
+    def cache_end_date(self):
+        if self._row < self._table._valid:
+            return self._table._date(self._table.end_day[self._row])
+        return None
+
+    @cache_end_date.setter
+    def cache_end_date(self, end_date):
+        if end_date is None:
+            self._table._invalidate(self._row)
+
+
+    def _context(self):
+        """
+        Returns the Context of the table
+        """
+        return self._table._context()
+
+
+    def _invalidate_dates(self):
+        """
+        Drop cached dates of the row and of the rows after it
+        """
+        self._table._invalidate(self._row)
+        return
+
+
+    def _is_scheduled(self):
+        """
+        Returns True if dates of the row are computed
+        """
+        return self._row < self._table._valid
+
+
+    def start_date(self):
+        """
+        Returns the first day of the task, computed by the table
+        """
+        return self._table.start_date(self._row)
+
+
+    def end_date(self):
+        """
+        Returns the last day of the task, computed by the table
+        """
+        return self._table.end_date(self._row)
+
+
+
+class _MilestoneView(_TaskView, Milestone):
+    """
+    Milestone reading and writing a row of a TaskTable, see TaskTable.task
+    """
+    __slots__ = ()
+
+
+
+class TaskTable(object):
+    """
+    Columnar store of tasks and milestones, for projects too large to keep a
+    Task object for each task. Each column is an array.array with one item by
+    row, so that the table can be read through the buffer protocol
+    (memoryview) or as numpy arrays (see to_numpy) without copy:
+
+    names, fullnames -- lists of strings, fullname is None if same as name
+    start, stop -- date ordinals given, 0 if none
+    duration -- durations given, nan if none
+    percent_done -- percents of achievment
+    color -- index of the color in colors
+    milestone -- 1 for milestones
+    depends_ptr, depends_index -- rows each row depends of, in compressed
+                                  sparse row format: dependencies of row i
+                                  are depends_index[depends_ptr[i]:depends_ptr[i + 1]]
+    resources_ptr, resources_index -- index of resources of each row in
+                                      resources, in the same format
+    start_day, end_day -- date ordinals computed by schedule
+
+    A row can only depend of rows added before it, so that rows are always
+    in scheduling order. Dates follow Task.start_date() and Task.end_date()
+    for the cases Project.schedule handles with SCHEDULE_WITH_NUMPY, other
+    ones raise ValueError.
+
+    A table is added to a Project as one of its children (see
+    Project.add_task_table), dates, number of elements and drawing height
+    being read from the arrays. Task objects are only made on demand by
+    task(), for rows that are drawn or looked up. They read and write the table.
+    Other Task objects can not depend of them (ValueError), dependencies
+    stay inside the table. Resources know the tables they are assigned in,
+    see Resource.search_for_task_overloads.
+    """
+    # columns of array.array
+    COLUMNS = ('start', 'stop', 'duration', 'percent_done', 'color', 'milestone',
+               'depends_ptr', 'depends_index', 'resources_ptr', 'resources_index',
+               'start_day', 'end_day')
+
+    def __init__(self, context=None):
+        """
+        Keyword arguments:
+        context -- Context used to compute dates, default None for the default one
+        """
+        self.context = context
+        self.names = []
+        self.fullnames = []
+        self.start = array.array('i')
+        self.stop = array.array('i')
+        self.duration = array.array('d')
+        self.percent_done = array.array('d')
+        self.color = array.array('i')
+        self.milestone = array.array('b')
+        self.depends_ptr = array.array('i', [0])
+        self.depends_index = array.array('i')
+        self.resources_ptr = array.array('i', [0])
+        self.resources_index = array.array('i')
+        self.start_day = array.array('i')
+        self.end_day = array.array('i')
+        # flyweights of colors and resources of rows
+        self.colors = []
+        self.resources = []
+        self._color_ids = {}
+        self._resource_ids = {}
+
+        # first row of each name, built on demand by index()
+        self._rows_by_name = None
+        # Task objects made by task()
+        self._views = {}
+        # rows depending of each row and rows of each resource, built on demand
+        self._successors = None
+        self._resource_rows = None
+        # projects the table or some of its rows were added to
+        self._projects = ()
+        # dates of rows before _valid are computed with _calendar
+        self._valid = 0
+        self._calendar = None
+        return
+
+
+    def __len__(self):
+        return len(self.names)
+
+
+    def _context(self):
+        """
+        Returns the Context of the table
+        """
+        if self.context is not None:
+            return self.context
+        return _DEFAULT_CONTEXT
+
+
+    def _date(self, ordinal):
+        """
+        Returns datetime.date of an ordinal, None for 0
+        """
+        if ordinal == 0:
+            return None
+        return datetime.date.fromordinal(ordinal)
+
+
+    def _number(self, value):
+        """
+        Returns value as an int if it is one, None for nan
+        """
+        if math.isnan(value):
+            return None
+        if value == int(value):
+            return int(value)
+        return value
+
+
+    def _duration(self, row):
+        """
+        Returns duration of a row as given, None if none
+        """
+        return self._number(self.duration[row])
+
+
+    def _color_id(self, color):
+        """
+        Returns index of color in colors, adding it if needed
+        """
+        if color not in self._color_ids:
+            self._color_ids[color] = len(self.colors)
+            self.colors.append(_intern(color))
+        return self._color_ids[color]
+
+
+    def _check(self, start, stop, duration, nb_depends, milestone):
+        """
+        Raises ValueError if dates of a row can not be computed by the table
+        """
+        if start is None:
+            if duration is None or (stop is None and nb_depends == 0):
+                raise ValueError('Task needs a start date, a stop date or dependencies')
+        elif not milestone and (stop is None) == (duration is None):
+            raise ValueError('Task with a start date needs either a stop date or a duration')
+        return
+
+
+    def _add(self, name, start, stop, duration, depends_of, resources, percent_done, color, fullname, milestone):
+        """
+        Appends a row, see add_task and add_milestone
+        """
+        row = len(self.names)
+        depends_of = depends_of or []
+        for d in depends_of:
+            if not 0 <= d < row:
+                raise ValueError('Task "{0}" can only depend of rows added before it, not {1}'.format(name, d))
+        self._check(start, stop, duration, len(depends_of), milestone)
+
+        self.names.append(_intern(name))
+        if fullname is None or fullname == name:
+            self.fullnames.append(None)
+        else:
+            self.fullnames.append(fullname)
+        self.start.append(0 if start is None else start.toordinal())
+        self.stop.append(0 if stop is None else stop.toordinal())
+        self.duration.append(float('nan') if duration is None else duration)
+        self.percent_done.append(percent_done)
+        self.color.append(self._color_id(color))
+        self.milestone.append(1 if milestone else 0)
+        self.depends_index.extend(depends_of)
+        self.depends_ptr.append(len(self.depends_index))
+        for r in resources or []:
+            if r not in self._resource_ids:
+                self._resource_ids[r] = len(self.resources)
+                self.resources.append(r)
+                r._add_task_table(self)
+            self.resources_index.append(self._resource_ids[r])
+        self.resources_ptr.append(len(self.resources_index))
+        self.start_day.append(0)
+        self.end_day.append(0)
+
+        if self._rows_by_name is not None:
+            self._rows_by_name.setdefault(name, row)
+        self._successors = None
+        self._resource_rows = None
+        _invalidate_projects(self._projects, nb_elements=True)
+        return row
+
+
+    def add_task(self, name, start=None, stop=None, duration=None, depends_of=None, resources=None, percent_done=0, color=None, fullname=None):
+        """
+        Adds a task to the table and returns its row. Two of start, stop or
+        duration may be given, or duration and dependencies.
+
+        Keyword arguments:
+        name -- name of the task (id)
+        start -- datetime.date, first day of the task, default None
+        stop -- datetime.date, last day of the task, default None
+        duration -- int, duration of the task, default None
+        depends_of -- list of int, rows of the tasks it depends of, default None
+        resources -- list of Resources assigned to the task, default None
+        percent_done -- int, percent of achievment, default 0
+        color -- string, html color, default None
+        fullname -- long name given to the task, default None
+        """
+        return self._add(name, start, stop, duration, depends_of, resources, percent_done, color, fullname, False)
+
+
+    def add_milestone(self, name, start=None, depends_of=None, color=None, fullname=None):
+        """
+        Adds a milestone to the table and returns its row
+
+        Keyword arguments:
+        name -- name of the milestone (id)
+        start -- datetime.date, day of the milestone, default None
+        depends_of -- list of int, rows of the tasks it depends of, default None
+        color -- string, html color, default None
+        fullname -- long name given to the milestone, default None
+        """
+        if color is None:
+            color = '#FF3030'
+        return self._add(name, start, start, 0, depends_of, None, 0, color, fullname, True)
+
+
+    def index(self, name):
+        """
+        Returns row of the first task named name
+
+        Keyword arguments:
+        name -- name of the task
+        """
+        if self._rows_by_name is None:
+            self._rows_by_name = {}
+            for i, n in enumerate(self.names):
+                self._rows_by_name.setdefault(n, i)
+        if name not in self._rows_by_name:
+            raise ValueError('No task named "{0}" in table'.format(name))
+        return self._rows_by_name[name]
+
+
+    def task(self, row):
+        """
+        Returns a Task (or Milestone) object for a row, reading and writing
+        the table. The same object is returned on each call.
+
+        Keyword arguments:
+        row -- int, row of the task
+        """
+        if row not in self._views:
+            if not 0 <= row < len(self.names):
+                raise IndexError('No row {0} in table'.format(row))
+            if self.milestone[row]:
+                self._views[row] = _MilestoneView(self, row)
+            else:
+                self._views[row] = _TaskView(self, row)
+        return self._views[row]
+
+
+    def tasks(self):
+        """
+        Returns list of Task objects of all rows, see task()
+        """
+        return [self.task(i) for i in range(len(self.names))]
+
+
+    def _successors_of(self, row):
+        """
+        Returns rows depending of row
+        """
+        if self._successors is None:
+            successors = [[] for i in range(len(self.names))]
+            ptr = self.depends_ptr
+            index = self.depends_index
+            for i in range(len(self.names)):
+                for k in range(ptr[i], ptr[i + 1]):
+                    successors[index[k]].append(i)
+            self._successors = successors
+        return self._successors[row]
+
+
+    def _set(self, row, **values):
+        """
+        Changes start, stop or duration of a row and drops dates computed
+        for it and the rows after it
+        """
+        start = values.get('start', self._date(self.start[row]))
+        stop = values.get('stop', self._date(self.stop[row]))
+        duration = values.get('duration', self._duration(row))
+        self._check(start, stop, duration,
+                    self.depends_ptr[row + 1] - self.depends_ptr[row], self.milestone[row])
+        self.start[row] = 0 if start is None else start.toordinal()
+        self.stop[row] = 0 if stop is None else stop.toordinal()
+        self.duration[row] = float('nan') if duration is None else duration
+        self._invalidate(row)
+        return
+
+
+    def _invalidate(self, row):
+        """
+        Drops dates computed for row and the rows after it
+        """
+        if row < self._valid:
+            self._valid = row
+        _invalidate_projects(self._projects)
+        return
+
+
+    def schedule(self, last=None):
+        """
+        Computes start_day and end_day of rows up to last, in one pass over
+        the rows. Only rows whose dates are not computed yet are done, and
+        everything is computed again if the calendar changed.
+
+        Keyword arguments:
+        last -- int, last row to compute, default None for all of them
+        """
+        if last is None:
+            last = len(self.names) - 1
+        wd = self._context()._working_days()
+        if wd is not self._calendar:
+            self._calendar = wd
+            self._valid = 0
+        if last < self._valid:
+            return
+
+        date = datetime.date.fromordinal
+        start = self.start
+        stop = self.stop
+        duration = self.duration
+        milestone = self.milestone
+        ptr = self.depends_ptr
+        index = self.depends_index
+        start_day = self.start_day
+        end_day = self.end_day
+        for i in range(self._valid, last + 1):
+            depends = index[ptr[i]:ptr[i + 1]]
+            positive = duration[i] > 0
+            nb_days = _nb_days_from_duration(duration[i] if positive else None)
+            if start[i] != 0:
+                # start given, moved after dependencies
+                s = wd.next_worked_day(date(start[i])).toordinal()
+                for d in depends:
+                    e = end_day[d] if milestone[d] else end_day[d] + 1
+                    if e > s:
+                        s = e
+                s = wd.next_worked_day(date(s)).toordinal()
+            elif stop[i] == 0:
+                # after dependencies
+                s = end_day[depends[0]]
+                for d in depends:
+                    e = end_day[d] - 1 if milestone[d] else end_day[d]
+                    if e > s:
+                        s = e
+                s = wd.next_worked_day(date(s + 1)).toordinal()
+            else:
+                # before stop, unless dependencies end later
+                if positive:
+                    s = wd.nth_worked_day_backward(date(stop[i]), nb_days).toordinal()
+                else:
+                    s = stop[i] + 1
+                if len(depends) > 0:
+                    e = max([end_day[d] for d in depends])
+                    if e > s:
+                        s = e + 1
+                    s = wd.next_worked_day(date(s)).toordinal()
+            start_day[i] = s
+
+            if milestone[i]:
+                end_day[i] = s
+            else:
+                e = wd.nth_worked_day(date(s), nb_days).toordinal()
+                if stop[i] != 0:
+                    real_end = wd.previous_worked_day(date(stop[i])).toordinal()
+                    if real_end > s:
+                        e = real_end
+                end_day[i] = e
+        self._valid = last + 1
+        return
+
+
+    def start_date(self, row=None):
+        """
+        Returns first day of a row, or of the table, computed if needed
+
+        Keyword arguments:
+        row -- int, row of the task, default None for the first day of all rows
+        """
+        if row is None:
+            if len(self.names) == 0:
+                return datetime.date(9999, 1, 1)
+            self.schedule()
+            return datetime.date.fromordinal(min(self.start_day))
+        self.schedule(row)
+        return datetime.date.fromordinal(self.start_day[row])
+
+
+    def end_date(self, row=None):
+        """
+        Returns last day of a row, or of the table, computed if needed
+
+        Keyword arguments:
+        row -- int, row of the task, default None for the last day of all rows
+        """
+        if row is None:
+            if len(self.names) == 0:
+                return datetime.date(1970, 1, 1)
+            self.schedule()
+            return datetime.date.fromordinal(max(self.end_day))
+        self.schedule(row)
+        return datetime.date.fromordinal(self.end_day[row])
+
+
+    def nb_elements(self):
+        """
+        Returns the number of tasks of the table
+        """
+        return len(self.names)
+
+
+    def _progress(self):
+        """
+        Returns (days done, days) of tasks of the table, see Project._progress
+        """
+        self.schedule()
+        done = 0
+        days = 0
+        for i in range(len(self.names)):
+            if self.milestone[i]:
+                continue
+            tdays = self.end_day[i] - self.start_day[i] + 1
+            done += tdays * self.percent_done[i] / 100.0
+            days += tdays
+        return (done, days)
+
+
+    def _drawn_rows(self, start, end):
+        """
+        Returns list of (row, number of lines) of rows drawn between start
+        and end, as Task._svg_height and Milestone._svg_height count them
+
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        """
+        self.schedule()
+        first = start.toordinal()
+        last = end.toordinal()
+        rows = []
+        for i in range(len(self.names)):
+            if self.milestone[i]:
+                if self.start_day[i] >= first and self.end_day[i] <= last:
+                    rows.append((i, 2))
+            elif self.start_day[i] <= last and self.end_day[i] >= first:
+                rows.append((i, 1))
+        return rows
+
+
+    def _svg_height(self, start, end, level=None):
+        """
+        Returns the number of lines drawn for the rows of the table, without
+        drawing them
+
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        level -- int, indentation level of the project, not used here
+        """
+        return sum([height for (i, height) in self._drawn_rows(start, end)])
+
+
+    def _svg_tasks(self, elements, prev_y=0, start=None, end=None, color=None, level=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None):
+        """
+        Yields (element, number of lines) of each row drawn between start and
+        end, drawn by its Task object which is only made for those rows. See
+        Task.svg for arguments.
+        """
+        cy = prev_y
+        for i, height in self._drawn_rows(start, end):
+            trepr, theight = self.task(i)._svg(elements, cy, start=start, end=end, color=color, level=level, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks)
+            if trepr is not None:
+                yield (trepr, theight)
+                cy += theight
+        return
+
+
+    def _svg_tasks_dependencies(self, elements, prj):
+        """
+        Yields element of dependencies of each row drawn, see
+        Task._svg_dependencies
+        """
+        for i in sorted(self._views):
+            t = self._views[i]
+            if t._drawing is None:
+                continue
+            trepr = t._svg_dependencies(elements, prj)
+            if trepr is not None:
+                yield trepr
+        return
+
+
+    def _reset_coord(self):
+        """
+        Drops computed dates of the rows and coordinates of their last drawing
+        """
+        self._valid = 0
+        self._reset_drawing()
+        return
+
+
+    def _reset_drawing(self):
+        """
+        Drops coordinates of the last drawing of the rows, keeping their
+        dates
+        """
+        for t in self._views.values():
+            t._drawing = None
+        return
+
+
+    def _diagnostics_of(self, row):
+        """
+        Returns list of ScheduleDiagnostic of a row, as Task.start_date() and
+        Task.end_date() would record them
+        """
+        self.schedule(row)
+        wd = self._calendar
+        date = datetime.date.fromordinal
+        latest = None
+        real_end = None
+        if self.stop[row] != 0:
+            if self.duration[row] > 0:
+                latest = wd.nth_worked_day_backward(date(self.stop[row]), _nb_days_from_duration(self.duration[row]))
+            else:
+                latest = date(self.stop[row] + 1)
+            real_end = wd.previous_worked_day(date(self.stop[row]))
+        task = self.task(row)
+        return [ScheduleDiagnostic(task, reason, old_date, new_date)
+                for (reason, old_date, new_date) in _dates_diagnostics(task, date(self.start_day[row]), date(self.end_day[row]), latest, real_end)]
+
+
+    def diagnostics(self, reason=None):
+        """
+        Returns list of ScheduleDiagnostic of all rows, see
+        Project.diagnostics. They are not logged.
+
+        Keyword arguments:
+        reason -- DIAGNOSTIC_* constant to keep only one kind, default None
+        """
+        diagnostics = []
+        for i in range(len(self.names)):
+            for d in self._diagnostics_of(i):
+                if reason is None or d.reason == reason:
+                    diagnostics.append(d)
+        return diagnostics
+
+
+    def _rows_of_resource(self, resource):
+        """
+        Returns rows the resource is assigned to
+        """
+        if resource not in self._resource_ids:
+            return []
+        if self._resource_rows is None:
+            rows = [[] for r in self.resources]
+            ptr = self.resources_ptr
+            index = self.resources_index
+            for i in range(len(self.names)):
+                for k in range(ptr[i], ptr[i + 1]):
+                    if len(rows[index[k]]) == 0 or rows[index[k]][-1] != i:
+                        rows[index[k]].append(i)
+            self._resource_rows = rows
+        return list(self._resource_rows[self._resource_ids[resource]])
+
+
+    def _task_entries(self, resource):
+        """
+        Returns list of (first day, last day, fullname) of rows the resource
+        is assigned to
+        """
+        self.schedule()
+        date = datetime.date.fromordinal
+        entries = []
+        for i in self._rows_of_resource(resource):
+            fullname = self.fullnames[i]
+            if fullname is None:
+                fullname = self.names[i]
+            entries.append((date(self.start_day[i]), date(self.end_day[i]), fullname))
+        return entries
+
+
+    def search_for_task_overloads(self, resource, dfrom=None, dto=None, all_tasks=False):
+        """
+        Returns a list of (first day, last day, list of task fullnames) for
+        each run of days (datetime.date) where the resource has more tasks of
+        the table than it can do (one, or the number of resources of a
+        GroupOfResources).
+
+        Keyword arguments:
+        resource -- Resource or GroupOfResources object
+        dfrom -- datetime.date, first day to look at, default None
+        dto -- datetime.date, last day to look at, default None
+        all_tasks -- if True return all runs of days with tasks, not just overcharged ones
+        """
+        capacity = 1
+        if isinstance(resource, GroupOfResources):
+            capacity = resource.nb_elements()
+        return _sweep_overloads(self._task_entries(resource), capacity, dfrom, dto, all_tasks, self._context().not_worked_days)
+
+
+    def search_for_task_conflicts(self, resource, all_tasks=False):
+        """
+        Returns a dictionnary of all days (datetime.date) containing for each
+        overcharged day of the resource the list of tasks of the table for
+        this day.
+
+        Keyword arguments:
+        resource -- Resource or GroupOfResources object
+        all_tasks -- if True return all tasks for all days, not just overcharged days
+        """
+        return _days_of_runs(self.search_for_task_overloads(resource, all_tasks=all_tasks), self._context().not_worked_days)
+
+
+    def csv(self, csv=None):
+        """
+        Create CSV output of the table, in the format of Project.csv
+
+        Keyword arguments:
+        csv -- string, filename to save to OR file object OR None
+        """
+        self.schedule()
+        if csv is not None:
+            csv_text = bytes.decode(codecs.BOM_UTF8, 'utf-8')
+            csv_text += '"State";"Task Name";"Start date";"End date";"Duration";"Resources";\r\n'
+        else:
+            csv_text = ''
+
+        date = datetime.date.fromordinal
+        lines = []
+        for i in range(len(self.names)):
+            fullname = self.fullnames[i]
+            if fullname is None:
+                fullname = self.names[i]
+            resources = ', '.join([self.resources[r].fullname for r in self.resources_index[self.resources_ptr[i]:self.resources_ptr[i + 1]]])
+            lines.append('"{0}";"{1}";{2};{3};{4};"{5}";\r\n'.format(
+                'Milestone' if self.milestone[i] else '',
+                fullname.replace('"', '\\"'),
+                date(self.start_day[i]),
+                date(self.end_day[i]),
+                self._duration(i),
+                resources.replace('"', '\\"')
+                ))
+        csv_text += ''.join(lines)
+
+        if csv is not None:
+            test = False
+            import io
+            if sys.version_info[0] == 2:
+                test = type(csv) == types.FileType or type(csv) == types.InstanceType
+            elif sys.version_info[0] == 3:
+                test = type(csv) == io.TextIOWrapper
+
+            if test:
+                csv.write(csv_text)
+            else:
+                fileobj = io.open(csv, mode='w', encoding='utf-8')
+                fileobj.write(csv_text)
+                fileobj.close()
+
+        return csv_text
+
+
+    def to_numpy(self):
+        """
+        Returns dictionnary of numpy arrays of the columns (see COLUMNS),
+        sharing memory with the table: nothing is copied and changes are seen
+        on both sides. Dates are computed before. numpy is needed.
+
+        Rows can not be added to the table while those arrays exist, as
+        array.array can not grow while its memory is used elsewhere.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('numpy is needed for TaskTable.to_numpy, see http://www.numpy.org/')
+
+        self.schedule()
+        arrays = {}
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            arrays[name] = numpy.frombuffer(column, dtype=column.typecode)
+        return arrays
+
+
+############################################################################
+
+
+class Project(object):
+    """
+    Class for handling projects
+    """
+    def __init__(self, name="", color=None, context=None):
+        """
+        Initialize project with a given name and color for all tasks
+
+        Keyword arguments:
+        name -- string, name of the project
+        color -- color for all tasks of the project
+        context -- Context (calendar and font attributes) of the project,
+                   default None for the one of the project it is added to or
+                   the default one
+        """
+        self.tasks = []
+        self.name = name
+        self.context = context
+        if color is None:
+            self.color = '#FFFF90'
+        else:
+            self.color = color
+
+        self.cache_nb_elements = None
+        self.cache_start_date = None
+        self.cache_end_date = None
+        # (days done, days) of tasks, see _progress
+        self.cache_progress = None
+        # calendar used for cached start and end dates
+        self._cache_calendar = None
+        # calendar used for last schedule()
+        self._schedule_calendar = None
+
+        # indexes of tasks of the project and of its subprojects, kept up to
+        # date by add_task
+        self._parents = []
+        self._tasks_set = set()
+        self._tasks_by_name = {}
+        self._tasks_of_resource = {}
+        # TaskTables added whole, their rows are not indexed
+        self._tables = []
+        # flat lists of tasks and tables (see _units) and of resources given
+        # by get_resources(), and position of each task or table in the first
+        # one, None when they have to be built again
+        self._tasks_list = []
+        self._tasks_position = {}
+        self._resources_list = []
+        return
+
+    def add_task(self, task):
+        """
+        Add a Task to the Project. Task can also be a subproject
+
+        Keyword arguments:
+        task -- Task or Project object
+        """
+        context = task._context()
+        self.tasks.append(task)
+        _invalidate_projects([self], nb_elements=True)
+
+        if type(task) is type(self):
+            task._parents.append(self)
+            new_tasks = task._units()
+        else:
+            # Task, or TaskTable added by add_task_table
+            task._projects = task._projects + (self,)
+            new_tasks = [task]
+
+        if task._context() is not context:
+            # dates were computed with another calendar, tables use their own
+            for t in new_tasks:
+                if not isinstance(t, TaskTable):
+                    t._invalidate_dates()
+
+        # update indexes of the project and of projects containing it
+        todo = [self]
+        seen = set(todo)
+        while len(todo) > 0:
+            p = todo.pop()
+            for t in new_tasks:
+                if t in p._tasks_set:
+                    continue
+                p._tasks_set.add(t)
+                if isinstance(t, TaskTable):
+                    p._tables.append(t)
+                else:
+                    p._tasks_by_name.setdefault(t.name, t)
+                    for r in (t.get_resources() or []):
+                        if r not in p._tasks_of_resource:
+                            p._tasks_of_resource[r] = []
+                            if p._resources_list is not None and p is self:
+                                p._resources_list.append(r)
+                        p._tasks_of_resource[r].append(t)
+                if p._tasks_list is not None and p is self:
+                    # task is the last one of the project
+                    p._tasks_position[t] = len(p._tasks_list)
+                    p._tasks_list.append(t)
+            if p is not self:
+                # tasks of a subproject are not the last ones of p
+                p._tasks_list = None
+                p._tasks_position = None
+                p._resources_list = None
+            for x in p._parents:
+                if x not in seen:
+                    seen.add(x)
+                    todo.append(x)
+        return
+
+    def add_task_table(self, table, rows=None):
+        """
+        Add a TaskTable to the Project. Its dates are computed by the table,
+        with its own Context, and other tasks of the project can not depend
+        of its rows.
+
+        The whole table is added as one child of the project, rows added to
+        it later included : Task objects reading and writing the table (see
+        TaskTable.task) are only made for rows drawn or looked up. Given rows
+        are added as Task objects.
+
+        Keyword arguments:
+        table -- TaskTable object
+        rows -- list of int, rows to add, default None for all of them
+        """
+        if rows is None:
+            self.add_task(table)
+            return
+        if self not in table._projects:
+            table._projects = table._projects + (self,)
+        for i in rows:
+            self.add_task(table.task(i))
+        return
+
+    def _context(self):
+        """
+        Returns the Context of the project: its own one, the one of the
+        project it was added to or the default one
+        """
+        if self.context is not None:
+            return self.context
+        for p in self._parents:
+            return p._context()
+        return _DEFAULT_CONTEXT
+
+
+    def _svg_calendar(self, maxx, maxy, start_date, today=None, scale=DRAW_WITH_DAILY_SCALE, elements=_SvgwriteElements, stream=None, header=True):
+        """
+        Draw calendar in svg, begining at start_date for maxx days, containing
+        maxy lines. If today is given, draw a blue line at date. The grid and
+        the not worked days of the week are pattern fills, so that only
+        other vacations are drawn day by day
+
+        Keyword arguments:
+        maxx -- number of days, weeks, months or quarters (depending on scale) to draw
+        maxy -- number of lines to draw
+        start_date -- datetime.date of the first day to draw
+        today -- datetime.date of day as today reference
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        elements -- _SvgwriteElements, _StreamElements or _CompactElements
+        stream -- _SvgStream to write the calendar to, instead of returning it
+        header -- boolean, draw names of days, weeks, months and years
+        """
+        cal = {0:'Mo', 1:'Tu', 2:'We', 3:'Th', 4:'Fr', 5:'Sa', 6:'Su'}
+    
+        maxx += 1
+
+        if stream is None:
+            dwg = elements.Group()
+            vlines = dwg.add(elements.Group(id='vlines', stroke='lightgray'))
+        else:
+            dwg = vlines = stream
+            stream.open_group()
+            stream.open_group(elements.Group(id='vlines', stroke='lightgray'))
+
+        # grid of 1cm cells, each one drawing half of its borders
+        grid = elements.Pattern(insert=(0, 2*cm), size=(1*cm, 1*cm), id='gantt-grid', patternUnits='userSpaceOnUse')
+        grid.add(elements.Rect(insert=(0, 0), size=(1*cm, 1*cm), fill='none'))
+        vlines.add(grid)
+
+        if scale == DRAW_WITH_DAILY_SCALE:
+            # not worked days of the week come back every 7 days
+            working_days = self._context()._working_days()
+            weekend = [x for x in range(7) if (start_date.weekday() + x) % 7 in working_days.not_worked_days]
+            if len(weekend) > 0:
+                pattern = elements.Pattern(insert=(0, 2*cm), size=(7*cm, 1*cm), id='gantt-weekend', patternUnits='userSpaceOnUse')
+                for x in weekend:
+                    pattern.add(elements.Rect(insert=(x*cm, 0), size=(1*cm, 1*cm), fill='gray', stroke='none', opacity=0.7))
+                vlines.add(pattern)
+                vlines.add(elements.Rect(insert=(0, 2*cm), size=(maxx*cm, maxy*cm), fill=pattern.get_funciri(), stroke='none'))
+
+            # other vacations, by runs of consecutive days
+            vacations = []
+            for x in range(maxx):
+                jour = start_date + datetime.timedelta(days=x)
+                if jour.weekday() not in working_days.not_worked_days and not working_days.is_worked(jour):
+                    if len(vacations) > 0 and vacations[-1][1] == x:
+                        vacations[-1][1] = x + 1
+                    else:
+                        vacations.append([x, x + 1])
+            for dfrom, dto in vacations:
+                vlines.add(elements.Rect(
+                    insert=(dfrom*cm, 2*cm),
+                    size=((dto-dfrom)*cm, maxy*cm),
+                    fill='gray',
+                    stroke='none',
+                    opacity=0.7,
+                    ))
+
+        vlines.add(elements.Rect(insert=(0, 2*cm), size=(maxx*cm, maxy*cm), fill=grid.get_funciri()))
+
+        for x in range(maxx):
+            if scale == DRAW_WITH_DAILY_SCALE:
+                jour = start_date + datetime.timedelta(days=x)
+            elif scale == DRAW_WITH_WEEKLY_SCALE:
+                jour = start_date +  dateutil.relativedelta.relativedelta(weeks=+x)
+            elif scale == DRAW_WITH_MONTHLY_SCALE:
+                jour = start_date +  dateutil.relativedelta.relativedelta(months=+x)
+            elif scale == DRAW_WITH_QUATERLY_SCALE:
+                # how many quarter do we need to draw ?
+                __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
+                sys.exit(1)
+                
+            if not today is None and today == jour:
+                vlines.add(elements.Rect(
+                    insert=((x+0.4)*cm, 2*cm),
+                    size=(0.2*cm, (maxy)*cm),
+                    fill='#76e9ff',
+                    stroke='lightgray',
+                    stroke_width=0,
+                    opacity=0.8
+                    ))
+
+            if not header:
+                continue
+
+            if scale == DRAW_WITH_DAILY_SCALE:
+                # Current day
+                vlines.add(elements.Text('{1} {0:02}'.format(jour.day, cal[jour.weekday()][0]),
+                                              insert=((x*10+1)*mm, 19*mm),
+                                              fill='black', stroke='black', stroke_width=0,
+                                              font_family=self._context().font_attributes['font_family'], font_size=15-3))
+                # Year
+                if jour.day == 1 and jour.month == 1:
+                    vlines.add(elements.Text('{0}'.format(jour.year),
+                                                  insert=((x*10+1)*mm, 5*mm),
+                                                  fill='#400000', stroke='#400000', stroke_width=0,
+                                                  font_family=self._context().font_attributes['font_family'], font_size=15+5,
+                                                  font_weight="bold"))
+                # Month name
+                if jour.day == 1:
+                    vlines.add(elements.Text('{0}'.format(jour.strftime("%B")),
+                                                  insert=((x*10+1)*mm, 10*mm),
+                                                  fill='#800000', stroke='#800000', stroke_width=0,
+                                                  font_family=self._context().font_attributes['font_family'], font_size=15+3,
+                                                  font_weight="bold"))
+                # Week number
+                if jour.weekday() == 0:
+                    vlines.add(elements.Text('{0:02}'.format(jour.isocalendar()[1]),
+                                                  insert=((x*10+1)*mm, 15*mm),
+                                                  fill='black', stroke='black', stroke_width=0,
+                                                  font_family=self._context().font_attributes['font_family'],
+                                                  font_size=15+1,
+                                                  font_weight="bold"))
+
+            elif scale == DRAW_WITH_WEEKLY_SCALE:
+                # Year
+                if jour.isocalendar()[1] == 1 and jour.month == 1:
+                    vlines.add(elements.Text('{0}'.format(jour.year),
+                                                  insert=((x*10+1)*mm, 5*mm),
+                                                  fill='#400000', stroke='#400000', stroke_width=0,
+                                                  font_family=self._context().font_attributes['font_family'], font_size=15+5, font_weight="bold"))
+                # Month name
+                if jour.day <= 7:
+                    vlines.add(elements.Text('{0}'.format(jour.strftime("%B")),
+                                                  insert=((x*10+1)*mm, 10*mm),
+                                                  fill='#800000', stroke='#800000', stroke_width=0,
+                                                  font_family=self._context().font_attributes['font_family'], font_size=15+3, font_weight="bold"))
+                vlines.add(elements.Text('{0:02}'.format(jour.isocalendar()[1]),
+                                              insert=((x*10+1)*mm, 15*mm),
+                                              fill='black', stroke='black', stroke_width=0,
+                                              font_family=self._context().font_attributes['font_family'], font_size=15+1, font_weight="bold"))
+
+            elif scale == DRAW_WITH_MONTHLY_SCALE:
+                # Month number
+                vlines.add(elements.Text('{0}'.format(jour.strftime("%m")),
+                                              insert=((x*10+1)*mm, 19*mm),
+                                              fill='black', stroke='black', stroke_width=0,
+                                              font_family=self._context().font_attributes['font_family'], font_size=15-3))
+                # Year
+                if jour.month == 1:
+                    vlines.add(elements.Text('{0}'.format(jour.year),
+                                                  insert=((x*10+1)*mm, 5*mm),
+                                                  fill='#400000', stroke='#400000', stroke_width=0,
+                                                  font_family=self._context().font_attributes['font_family'], font_size=15+5, font_weight="bold"))
+
+
+            elif scale == DRAW_WITH_QUATERLY_SCALE:
+                # how many quarter do we need to draw ?
+                __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
+                sys.exit(1)
+
+        if stream is not None:
+            stream.close_group()
+        dwg.add(elements.Line(start=((0)*cm, (2)*cm), end=((maxx)*cm, (2)*cm), stroke='black'))
+        dwg.add(elements.Line(start=((0)*cm, (maxy+2)*cm), end=((maxx)*cm, (maxy+2)*cm), stroke='black'))
+
+        if stream is not None:
+            stream.close_group()
+        return dwg
+
+
+    def _svg_width(self, start, end, scale=DRAW_WITH_DAILY_SCALE):
+        """
+        Returns the number of days, weeks or months, depending on scale,
+        between start and end, the width of the drawing less one
+
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        """
+        if scale == DRAW_WITH_DAILY_SCALE:
+            # how many dayss do we need to draw ?
+            maxx = (end - start).days
+        elif scale == DRAW_WITH_WEEKLY_SCALE:
+            # how many weeks do we need to draw ?
+            maxx = 0
+            guess = start
+            while guess.weekday() != 0:
+                guess = guess + dateutil.relativedelta.relativedelta(days=-1)
+
+            last_date = end
+            while last_date.weekday() != 6:
+                last_date = last_date + dateutil.relativedelta.relativedelta(days=+1)
+            
+            while guess <= last_date:
+                maxx += 1
+                guess = guess + dateutil.relativedelta.relativedelta(weeks=+1)
+        elif scale == DRAW_WITH_MONTHLY_SCALE:
+            # how many months do we need to draw ?
+            if dateutil.relativedelta.relativedelta(end, start).days == 0:
+                maxx = dateutil.relativedelta.relativedelta(end, start).months + dateutil.relativedelta.relativedelta(end, start).years*12
+            else:
+                maxx = dateutil.relativedelta.relativedelta(end, start).months + dateutil.relativedelta.relativedelta(end, start).years*12 + 1
+        elif scale == DRAW_WITH_QUATERLY_SCALE:
+            # how many quarter do we need to draw ?
+            __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
+            sys.exit(1)
+
+        return maxx
+
+
+    def make_svg_for_tasks(self, filename, today=None, start=None, end=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, highlight_critical_path=False, renderer=RENDER_WITH_SVGWRITE, compact=False, max_elements=None):
+        """
+        Draw gantt of tasks and output it to filename. If start or end are
+        given, use them as reference, otherwise use project first and last day
+
+        Keyword arguments:
+        filename -- string, filename to save to OR file object
+        today -- datetime.date of day marked as a reference
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        title_align_on_left -- boolean, align task title on left
+        highlight_critical_path -- boolean, outline tasks of the critical path
+        renderer -- RENDER_WITH_SVGWRITE builds the whole drawing with svgwrite
+                    before saving it, RENDER_WITH_STREAM writes each task to
+                    filename as soon as it is drawn, in constant memory
+        compact -- boolean, write a smaller svg using css classes, shared
+                   definitions of repeated shapes and rounded coordinates
+        max_elements -- int, maximum number of columns and lines of tasks to
+                        draw, over it a coarser scale is used and subprojects
+                        are drawn as summary bars, default None for no limit
+        """
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return
+
+
+        self._reset_drawing()
+        order = self._schedule()
+        self._make_svg_for_tasks(order, filename, today, start, end, scale, title_align_on_left, highlight_critical_path, renderer, compact, max_elements)
+        return
+
+    def _make_svg_for_tasks(self, order, filename, today=None, start=None, end=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, highlight_critical_path=False, renderer=RENDER_WITH_SVGWRITE, compact=False, max_elements=None):
+        """
+        Draw gantt of tasks of an already scheduled project, see
+        make_svg_for_tasks
+
+        Keyword arguments:
+        order -- list of tasks in scheduling order, as returned by _schedule()
+        """
+        critical_tasks = None
+        if highlight_critical_path:
+            critical_tasks = set(self.analyse_slack(self._with_tables(order)).critical_tasks())
+
+        if start is None:
+            start_date = self.start_date()    
+        else:
+            start_date = start
+
+        if end is None:
+            end_date = self.end_date() 
+        else:
+            end_date = end
+
+
+        if start_date > end_date:
+            __LOG__.critical('start date {0} > end_date {1}'.format(start_date, end_date))
+            sys.exit(1)
+
+        max_level = None
+        if max_elements is not None:
+            lod_scale, max_level = self._svg_level_of_detail(start_date, end_date, scale, max_elements)
+            if lod_scale != scale or max_level is not None:
+                __LOG__.warning('** Over {0} elements, will draw at scale {1} with subprojects below level {2} as summary bars'.format(max_elements, lod_scale, max_level))
+            scale = lod_scale
+
+        pheight = self._svg_height(start_date, end_date, 0, max_level)
+        maxx = self._svg_width(start_date, end_date, scale)
+
+        if renderer == RENDER_WITH_STREAM:
+            elements = _StreamElements
+        else:
+            elements = _SvgwriteElements
+        defs = []
+        viewbox = None
+        if compact:
+            elements = _CompactElements(elements)
+            defs = elements.defs
+
+        if compact:
+            viewbox = elements.viewbox((maxx+1)*cm, (pheight+3)*cm)
+
+        # same order of drawing for both renderers, as css classes of
+        # compact svg are numbered on first use
+        background = elements.Rect(
+                    insert=(0*cm, 0*cm),
+                    size=((maxx+1)*cm, (pheight+3)*cm),
+                    fill='white',
+                    stroke_width=0,
+                    opacity=1
+                    )
+
+        if renderer == RENDER_WITH_STREAM:
+            stream = _SvgStream(filename, width=(maxx+1)*cm, height=(pheight+3)*cm, defs=defs, viewbox=viewbox)
+            stream.add(background)
+            self._svg_calendar(maxx, pheight, start_date, today, scale, elements=elements, stream=stream)
+            stream.open_group()
+            self._svg_stream(stream, elements, prev_y=2, start=start_date, end=end_date, color = self.color, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks, max_level=max_level)
+            self._svg_dependencies_stream(stream, elements, self)
+            stream.close_group()
+            if compact:
+                stream.add(elements.style())
+            stream.close()
+            return
+
+        dwg = _my_svgwrite_drawing_wrapper(filename, debug=True)
+        if viewbox is not None:
+            dwg['viewBox'] = viewbox
+        for element in defs:
+            dwg.defs.add(element)
+        dwg.add(background)
+        dwg.add(self._svg_calendar(maxx, pheight, start_date, today, scale, elements=elements))
+
+        ldwg = dwg.add(elements.Group())
+        psvg, void = self._svg(elements, prev_y=2, start=start_date, end=end_date, color = self.color, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks, max_level=max_level)
+        if psvg is not None:
+            ldwg.add(psvg)
+
+        dep = self._svg_dependencies(elements, self)
+        if dep is not None:
+            ldwg.add(dep)
+
+        if compact:
+            dwg.add(elements.style())
+        dwg.save(width=(maxx+1)*cm, height=(pheight+3)*cm)
+        return
+
+    def make_outputs(self, outputs, processes=None):
+        """
+        Schedules the project once and renders each Output of outputs from
+        this schedule, spread over a pool of processes. Each process works on
+        its own copy of the scheduled project and only resets the
+        coordinates of drawings between outputs.
+
+        Returns the list of results of outputs, in the same order : None for
+        OUTPUT_TASKS, dictionnary of conflicts for OUTPUT_RESOURCES (see
+        make_svg_for_resources) and csv text for OUTPUT_CSV
+
+        Keyword arguments:
+        outputs -- list of Output objects
+        processes -- int, number of processes, default None for one per
+                     processor, 1 to render outputs in this process
+        """
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Project::make_outputs ({0})'.format({'name':self.name, 'outputs':[x.filename for x in outputs]}))
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return [None for x in outputs]
+
+        order = self._schedule()
+
+        if processes == 1 or len(outputs) < 2:
+            return [self._make_output(order, x) for x in outputs]
+
+        pool = multiprocessing.Pool(processes, _init_outputs_worker, (_default_context_state(), _snapshot((self, order, outputs))))
+        try:
+            results = pool.map(_make_output_in_worker, range(len(outputs)))
+        finally:
+            pool.close()
+            pool.join()
+        return results
+
+
+    def _make_output(self, order, output):
+        """
+        Renders output from the schedule of the project, see make_outputs
+
+        Keyword arguments:
+        order -- list of tasks in scheduling order, as returned by _schedule()
+        output -- Output object
+        """
+        self._reset_drawing()
+        if output.kind == OUTPUT_TASKS:
+            return self._make_svg_for_tasks(order, output.filename, start=output.start, end=output.end, scale=output.scale, **output.options)
+        elif output.kind == OUTPUT_RESOURCES:
+            return self._make_svg_for_resources(output.filename, start=output.start, end=output.end, scale=output.scale, **output.options)
+        return self.csv(output.filename)
+
+
+    def make_svg_tiles(self, dirname, today=None, start=None, end=None, scales=TILE_SCALES, size=32, title_align_on_left=False, highlight_critical_path=False):
+        """
+        Draw gantt of tasks as tiles of size columns and lines, for zoomable
+        web viewers. The tile x, y of zoom level z, drawn at scale scales[z],
+        is output to dirname/z/x/y.svg. If start or end are given, use them
+        as reference, otherwise use project first and last day
+
+        And returns a dictionnary of zoom level: (number of tiles along x,
+        number of tiles along y)
+
+        Keyword arguments:
+        dirname -- string, directory to save tiles to
+        today -- datetime.date of day marked as a reference
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        scales -- list of drawing scales of zoom levels (d: days, w: weeks, m: months)
+        size -- int, number of columns and lines of a tile
+        title_align_on_left -- boolean, align task title on left
+        highlight_critical_path -- boolean, outline tasks of the critical path
+        """
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return {}
+
+        self._reset_drawing()
+        order = self._schedule()
+
+        critical_tasks = None
+        if highlight_critical_path:
+            critical_tasks = set(self.analyse_slack(self._with_tables(order)).critical_tasks())
+
+        if start is None:
+            start = self.start_date()
+        if end is None:
+            end = self.end_date()
+
+        if start > end:
+            __LOG__.critical('start date {0} > end_date {1}'.format(start, end))
+            sys.exit(1)
+
+        tiles = {}
+        for z, scale in enumerate(scales):
+            index = _TileIndex(self, start, end, scale, size, title_align_on_left, critical_tasks)
+            tiles[z] = index.nb_tiles()
+            for tx in range(tiles[z][0]):
+                directory = os.path.join(dirname, str(z), str(tx))
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+                for ty in range(tiles[z][1]):
+                    index.svg(os.path.join(directory, '{0}.svg'.format(ty)), tx, ty, today)
+        return tiles
+
+    def make_svg_for_resources(self, filename, today=None, start=None, end=None, resources=None, one_line_for_tasks=False, filter='', scale=DRAW_WITH_DAILY_SCALE, renderer=RENDER_WITH_SVGWRITE, compact=False):
+        """
+        Draw resources affectation and output it to filename. If start or end are
+        given, use them as reference, otherwise use project first and last day
+
+        And returns to a dictionnary of dictionnaries for vacation and task
+        conflicts for resources
+
+        Keyword arguments:
+        filename -- string, filename to save to OR file object
+        today -- datetime.date of day marked as a reference
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        resources -- list of Resource to check, default all
+        one_line_for_tasks -- use only one line to display all tasks ?
+        filter -- display only those tags
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        renderer -- RENDER_WITH_SVGWRITE builds the whole drawing with svgwrite
+                    before saving it, RENDER_WITH_STREAM writes each task to
+                    filename as soon as it is drawn, in constant memory
+        compact -- boolean, write a smaller svg using css classes, shared
+                   definitions of repeated shapes and rounded coordinates
+        """
+
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return
+
+        self._reset_drawing()
+        self._schedule()
+        return self._make_svg_for_resources(filename, today, start, end, resources, one_line_for_tasks, filter, scale, renderer, compact)
+
+    def _make_svg_for_resources(self, filename, today=None, start=None, end=None, resources=None, one_line_for_tasks=False, filter='', scale=DRAW_WITH_DAILY_SCALE, renderer=RENDER_WITH_SVGWRITE, compact=False):
+        """
+        Draw resources affectation of an already scheduled project, see
+        make_svg_for_resources
+        """
+        if scale != DRAW_WITH_DAILY_SCALE:
+            __LOG__.warning('** Will draw ressource graph at day scale, not {0} as requested'.format(scale))
+            scale = DRAW_WITH_DAILY_SCALE
+
+        if start is None:
+            start_date = self.start_date()    
+        else:
+            start_date = start
+
+        if end is None:
+            end_date = self.end_date() 
+        else:
+            end_date = end
+
+
+        if start_date > end_date:
+            __LOG__.critical('start date {0} > end_date {1}'.format(start_date, end_date))
+            sys.exit(1)
+
+
+        if resources is None:
+            resources = self.get_resources()
+
+        maxx = (end_date - start_date).days 
+        maxy = len(resources) * 2
+
+        if maxy == 0:
+            # No resources
+            return {}
+
+
+        # detect conflicts between resources and holidays
+        conflicts_vacations = []
+        for t in self._units():
+            if isinstance(t, TaskTable):
+                # only rows with resources can be in conflict
+                for i in range(len(t)):
+                    if t.resources_ptr[i] < t.resources_ptr[i + 1]:
+                        conflicts_vacations.append(t.task(i).check_conflicts_between_task_and_resources_vacations())
+                continue
+            conflicts_vacations.append(t.check_conflicts_between_task_and_resources_vacations())
+
+        conflicts_vacations = _flatten(conflicts_vacations)
+
+
+        if renderer == RENDER_WITH_STREAM:
+            elements = _StreamElements
+        else:
+            elements = _SvgwriteElements
+        defs = []
+        viewbox = None
+        if compact:
+            elements = _CompactElements(elements)
+            defs = elements.defs
+
+        # count lines, the height of the drawing comes first in the stream
+        nline = 2
+        for r in resources:
+            if filter != '' and r.name not in filter:
+                continue
+            nb_tasks = len([t for t in self.get_tasks_of_resource(r) if t._svg_height(start_date, end_date)])
+            if nb_tasks > 0 and one_line_for_tasks:
+                nline += 2
+            elif nb_tasks > 0:
+                nline += 1 + nb_tasks
+        if compact:
+            viewbox = elements.viewbox((maxx+1)*cm, (nline+1)*cm)
+
+        background = elements.Rect(
+                    insert=(0*cm, 0*cm),
+                    size=((maxx+1)*cm, (nline+1)*cm),
+                    fill='white',
+                    stroke_width=0,
+                    opacity=1
+                    )
+        if renderer == RENDER_WITH_STREAM:
+            ldwg = _SvgStream(filename, width=(maxx+1)*cm, height=(nline+1)*cm, defs=defs, viewbox=viewbox)
+            ldwg.add(background)
+            self._svg_calendar(maxx, nline-2, start_date, today, scale, elements=elements, stream=ldwg)
+            ldwg.open_group()
+        else:
+            dwg = _my_svgwrite_drawing_wrapper(filename, debug=True)
+            if viewbox is not None:
+                dwg['viewBox'] = viewbox
+            for element in defs:
+                dwg.defs.add(element)
+            dwg.add(background)
+            dwg.add(self._svg_calendar(maxx, nline-2, start_date, today, scale, elements=elements))
+            ldwg = dwg.add(elements.Group())
+
+        if not one_line_for_tasks:
+            ldwg.add(
+                elements.Line(
+                    start=((0)*cm, (2)*cm), 
+                    end=((maxx+1)*cm, (2)*cm), 
+                    stroke='black',
+                    ))
+
+    
+        nline = 2
+        conflicts_tasks = []
+        conflict_display_line = 1
+        for r in resources:
+            # do stuff for each resource
+            if filter != '' and r.name not in filter:
+                continue
 
-            return self.cache_start_date
+            ress = elements.Group()
+            ress.add(elements.Text('{0}'.format(r.fullname), insert=(3*mm, (nline*10+7)*mm), fill=self._context().font_attributes['fill'], stroke=self._context().font_attributes['stroke'], stroke_width=self._context().font_attributes['stroke_width'], font_family=self._context().font_attributes['font_family'], font_size=15+3))
+            #ldwg.add(ress)
 
-        elif self.duration is not None and self.depends_of is not None and self.stop is None :  # duration and dependencies fixed
-            prev_task_end = self.depends_of[0].end_date()
-            for t in self.depends_of:
-                if isinstance(t, Milestone):
-                    if t.end_date() > prev_task_end:
-                        prev_task_end = t.end_date() - datetime.timedelta(days=1)
-                elif isinstance(t, Task):
-                    if t.end_date() > prev_task_end:
-                        prev_task_end = t.end_date()
-                # if t.end_date() > prev_task_end:
-                #     __LOG__.debug('*** latest one {0} which end on {1}'.format(t.name, t.end_date()))
-                #     prev_task_end = t.end_date()
 
-            start = prev_task_end + datetime.timedelta(days=1)
-            
-            while start.weekday() in _not_worked_days() or start in VACATIONS:
-                start = start + datetime.timedelta(days=1)
+            overcharged_days = r.search_for_task_conflicts()
 
-            # should be first day of start...
-            self.cache_start_date = start
 
-        elif self.start is None and self.stop is not None: # stop and duration fixed
-            # start date not setted, calculate from end_date + depends
-            current_day = self.stop
-            real_duration = 0
-            duration = self.duration 
-            while duration > 0:
-                if not (current_day.weekday() in _not_worked_days() or current_day in VACATIONS):
-                    real_duration = real_duration + 1
-                    duration -= 1
-                else:
-                    real_duration = real_duration + 1
+            conflict_display_line = nline
+            nline += 1
+
+            vac = elements.Group()
+            conflicts = elements.Group()
+            cday = start_date
+            while cday <= end_date:
+                # Vacations
+                if self._context()._working_days().is_worked(cday) and not r.is_available(cday):
+                     vac.add(elements.shape('day-mark', (cday - start_date).days * 10 + 1, (conflict_display_line)*10+1,
+                            fill="#008000",
+                            stroke="#008000",
+                            stroke_width=1,
+                            opacity=0.65,
+                            ))
 
-                current_day = self.stop - datetime.timedelta(days=real_duration)
-            current_day = self.stop - datetime.timedelta(days=real_duration - 1)
+                # Overcharge
+                if self._context()._working_days().is_worked(cday) and cday in overcharged_days:
+                    conflicts.add(elements.shape('day-mark', (cday - start_date).days * 10 + 1 + 4, (conflict_display_line)*10+1,
+                        fill="#AA0000",
+                        stroke="#AA0000",
+                        stroke_width=1,
+                        opacity=0.65,
+                        ))
+                
+                cday += datetime.timedelta(days=1)
 
-            # check depends
-            if self.depends_of is not None:
-                prev_task_end = self.depends_of[0].end_date()
-                for t in self.depends_of:
-                    if isinstance(t, Milestone):
-                        if t.end_date() > prev_task_end:
-                            prev_task_end = t.end_date()
-                    elif isinstance(t, Task):
-                        if t.end_date() > prev_task_end:
-                            prev_task_end = t.end_date()
-                    # if t.end_date() > prev_task_end:
-                    #     __LOG__.debug('*** latest one {0} which end on {1}'.format(t.name, t.end_date()))
-                    #     prev_task_end = t.end_date()
 
-                if prev_task_end > current_day:
-                    start = prev_task_end + datetime.timedelta(days=1)
-                    #return prev_task_end
-                else:
-                    start = current_day
+            nb_tasks = 0
+            for t in self.get_tasks_of_resource(r):
+                psvg, void = t._svg(elements, prev_y = nline, start=start_date, end=end_date, color=self.color, scale=scale)
+                if psvg is not None:
+                    ldwg.add(psvg)
+                    nb_tasks +=1
+                    if not one_line_for_tasks:
+                        nline += 1
 
-                
-                while start.weekday() in _not_worked_days() or start in VACATIONS:
-                    start = start + datetime.timedelta(days=1)
+            if nb_tasks == 0:
+                nline -= 1
+            elif nb_tasks > 0:
+                print(r.fullname, nb_tasks)
+                ldwg.add(ress)
+                ldwg.add(vac)
+                ldwg.add(conflicts)
 
-                depend_start_date = start
 
-                if depend_start_date > current_day:
-                    __LOG__.error('** Due to dependencies, Task "{0}", could not be finished on time (should start as last on {1} but will start on {2})'.format(self.fullname, current_day, depend_start_date))
-                    self.cache_start_date = depend_start_date           
-                else:
-                    # should be first day of start...
-                    self.cache_start_date = depend_start_date
-            else:
-                # should be first day of start...
-                self.cache_start_date = current_day            
+                if not one_line_for_tasks:
+                    ldwg.add(
+                        elements.Line(
+                            start=((0)*cm, (nline)*cm), 
+                            end=((maxx+1)*cm, (nline)*cm), 
+                            stroke='black',
+                            ))
+                
+                # nline += 1
+                if one_line_for_tasks:
+                    nline += 1
+                    ldwg.add(
+                        elements.Line(
+                        start=((0)*cm, (nline)*cm), 
+                        end=((maxx+1)*cm, (nline)*cm), 
+                        stroke='black',
+                        ))
 
 
-        if self.cache_start_date != self.start:
-            __LOG__.warning('** starting date for task "{0}" is changed from {1} to {2}'.format(self.fullname, self.start, self.cache_start_date))
-        return self.cache_start_date
+        if renderer == RENDER_WITH_STREAM:
+            ldwg.close_group()
+            if compact:
+                ldwg.add(elements.style())
+            ldwg.close()
+        else:
+            if compact:
+                dwg.add(elements.style())
+            dwg.save(width=(maxx+1)*cm, height=(nline+1)*cm)
+        return {
+            'conflicts_vacations': conflicts_vacations, 
+            'conflicts_tasks':conflicts_tasks
+            }
 
 
-    def end_date(self):
+    def start_date(self):
         """
-        Returns the last day of the task, either the one which was given at task
-        creation or the one calculated after checking dependencies
+        Returns first day of the project
         """
-        # Should take care of resources vacations ?
-        if self.cache_end_date is not None:
-            return self.cache_end_date
-
-        __LOG__.debug('** Task::end_date ({0})'.format(self.name))
-
-        if self.duration is None or self.start is None and self.stop is not None:
-            real_end = self.stop
-            # Take care of vacations
-            while real_end.weekday() in _not_worked_days() or real_end in VACATIONS:
-                real_end -= datetime.timedelta(days=1)
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return datetime.date(9999, 1, 1)
 
-            if real_end <= self.start_date():
-                current_day = self.start_date()
-                real_duration = 0
-                duration = self.duration   
-                while duration > 1 or (current_day.weekday() in _not_worked_days() or current_day in VACATIONS):
-                    if not (current_day.weekday() in _not_worked_days() or current_day in VACATIONS):
-                        real_duration = real_duration + 1
-                        duration -= 1
-                    else:
-                        real_duration = real_duration + 1
-        
-                    current_day = self.start_date() + datetime.timedelta(days=real_duration)
-        
-                self.cache_end_date = self.start_date() + datetime.timedelta(days=real_duration)
-                __LOG__.warning('** task "{0}" will not be finished on time : end_date is changed from {1} to {2}'.format(self.fullname, self.stop, self.cache_end_date))
-                return self.cache_end_date
-                    
+        if self._cache_calendar is not self._context()._working_days():
+            self.cache_start_date = None
+            self.cache_end_date = None
+            self._cache_calendar = self._context()._working_days()
+        if self.cache_start_date is not None:
+            return self.cache_start_date
 
-            self.cache_end_date = real_end
-            if real_end != self.stop:
-                __LOG__.warning('** task "{0}" will not be finished on time : end_date is changed from {1} to {2}'.format(self.fullname, self.stop, self.cache_end_date))
+        first = self.tasks[0].start_date()
+        for t in self.tasks:
+            if t.start_date() < first:
+                first = t.start_date()
+        self.cache_start_date = first
+        return first
 
 
-                
-            return self.cache_end_date
+    def end_date(self):
+        """
+        Returns last day of the project
+        """
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return datetime.date(1970, 1, 1)
 
-        if self.stop is None:
-            current_day = self.start_date()
-            real_duration = 0
-            duration = self.duration   
-            while duration > 1 or (current_day.weekday() in _not_worked_days() or current_day in VACATIONS):
-                if not (current_day.weekday() in _not_worked_days() or current_day in VACATIONS):
-                    real_duration = real_duration + 1
-                    duration -= 1
-                else:
-                    real_duration = real_duration + 1
-    
-                current_day = self.start_date() + datetime.timedelta(days=real_duration)
-    
-            self.cache_end_date = self.start_date() + datetime.timedelta(days=real_duration)
+        if self._cache_calendar is not self._context()._working_days():
+            self.cache_start_date = None
+            self.cache_end_date = None
+            self._cache_calendar = self._context()._working_days()
+        if self.cache_end_date is not None:
             return self.cache_end_date
 
-        raise(ValueError)
-        return None
+        last = self.tasks[0].end_date()
+        for t in self.tasks:
+            if t.end_date() > last:
+                last = t.end_date()
+        self.cache_end_date = last
+        return last
 
-    def svg(self, prev_y=0, start=None, end=None, color=None, level=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False):
+    def svg(self, prev_y=0, start=None, end=None, color=None, level=0, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None):
         """
-        Return SVG for drawing this task.
+        Return (SVG code, number of lines drawn) for the project. Draws all
+        tasks and add project name with a purple bar on the left side.
 
         Keyword arguments:
         prev_y -- int, line to start to draw
         start -- datetime.date of first day to draw
         end -- datetime.date of last day to draw
         color -- string of color for drawing the project
-        level -- int, indentation level of the project, not used here
+        level -- int, indentation level of the project
         scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
         title_align_on_left -- boolean, align task title on left
+        critical_tasks -- set of Tasks to highlight as critical
         """
-        __LOG__.debug('** Task::svg ({0})'.format({'name':self.name, 'prev_y':prev_y, 'start':start, 'end':end, 'color':color, 'level':level}))
-
-        if not self.display:
-            __LOG__.debug('** Task::svg ({0}) display off'.format({'name':self.name}))
-            return(None, 0)
+        return self._svg(_SvgwriteElements, prev_y, start, end, color, level, scale, title_align_on_left, critical_tasks)
 
-        add_modified_begin_mark = False
-        add_modified_end_mark = False
 
+    def _svg(self, elements, prev_y=0, start=None, end=None, color=None, level=0, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None, max_level=None):
+        """
+        Return (element, number of lines drawn) for the project, built with
+        elements (_SvgwriteElements, _StreamElements or _CompactElements).
+        Subprojects deeper than max_level are drawn as one summary bar, see
+        _svg_summary. See svg for other arguments.
+        """
         if start is None:
             start = self.start_date()
-
-        if self.start is not None and self.start_date() != self.start:
-            add_modified_begin_mark = True
-
         if end is None:
             end = self.end_date()
+        if color is None or self.color is not None:
+            color = self.color
 
-        if self.stop is not None and self.end_date() != self.stop:
-            add_modified_end_mark = True
+        if max_level is not None and level > max_level:
+            return self._svg_summary(elements, prev_y, start, end, color, scale, title_align_on_left)
 
-        # override project color if defined
-        if self.color is not None:
-            color = self.color
+        height = self._svg_height(start, end, level, max_level)
+        # Do not display empty tasks
+        if height == 0:
+            return (None, 0)
 
-        add_begin_mark = False
-        add_end_mark = False
+        fprj = elements.Group()
+        if self._svg_has_title(start, end, level):
+            for element in self._svg_title(elements, prev_y, prev_y + height, level):
+                fprj.add(element)
 
-        y = prev_y * 10
+        prj = fprj.add(elements.Group())
+        cy = prev_y + 1*(self.name != "")
+        for t in self.tasks:
+            if isinstance(t, TaskTable):
+                for trepr, theight in t._svg_tasks(elements, cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks):
+                    prj.add(trepr)
+                    cy += theight
+                continue
+            if isinstance(t, Project):
+                trepr, theight = t._svg(elements, cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks, max_level=max_level)
+            else:
+                trepr, theight = t._svg(elements, cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks)
+            if trepr is not None:
+                prj.add(trepr)
+                cy += theight
 
+        return (fprj, height)
 
-        if scale == DRAW_WITH_DAILY_SCALE:
-            def _time_diff(e, s):
-                return (e - s).days
-            def _time_diff_d(e, s):
-                return _time_diff(e, s) + 1
 
-        elif scale == DRAW_WITH_WEEKLY_SCALE:
-            def _time_diff(end_date, start_date):
-                td = 0
-                guess = start_date
-                while guess.weekday() != 0:
-                    guess = guess + dateutil.relativedelta.relativedelta(days=-1)
+    def _svg_has_title(self, start, end, level):
+        """
+        Returns True if svg draws the name and the purple bar of the project
 
-                while end_date.weekday() != 6:
-                    end_date = end_date + dateutil.relativedelta.relativedelta(days=+1)
-                    
-                while guess + dateutil.relativedelta.relativedelta(days=+6) < end_date:
-                    td += 1
-                    guess = guess + dateutil.relativedelta.relativedelta(weeks=+1)
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        level -- int, indentation level of the project
+        """
+        if self.name == "":
+            return False
+        # if ((self.start_date() >= start and self.end_date() <= end) 
+        #     or (self.start_date() >= start and (self.end_date() <= end or self.start_date() <= end))) or level == 1: 
+        return ((self.start_date() >= start and self.end_date() <= end) 
+                or ((self.end_date() >=start and self.start_date() <= end))) or level == 1
 
-                return td 
-            def _time_diff_d(e, s):
-                return _time_diff(e, s) + 1
 
-        elif scale == DRAW_WITH_MONTHLY_SCALE:
-            def _time_diff(end_date, start_date):
-                return dateutil.relativedelta.relativedelta(end_date, start_date).months + dateutil.relativedelta.relativedelta(end_date, start_date).years*12
-            def _time_diff_d(e, s):
-                return _time_diff(e, s) + 1
+    def _svg_title(self, elements, prev_y, cy, level):
+        """
+        Returns name and purple bar elements of the project
 
+        Keyword arguments:
+        elements -- _SvgwriteElements, _StreamElements or _CompactElements
+        prev_y -- int, line of the name of the project
+        cy -- int, line following the last task of the project
+        level -- int, indentation level of the project
+        """
+        return [
+            elements.Text('{0}'.format(self.name), insert=((6*level+3)*mm, ((prev_y)*10+7)*mm), fill=self._context().font_attributes['fill'], stroke=self._context().font_attributes['stroke'], stroke_width=self._context().font_attributes['stroke_width'], font_family=self._context().font_attributes['font_family'], font_size=15+3),
+            elements.Rect(
+                insert=((6*level+0.8)*mm, (prev_y+0.5)*cm),
+                size=(0.2*cm, ((cy-prev_y-1)+0.4)*cm),
+                fill='purple',
+                stroke='lightgray',
+                stroke_width=0,
+                opacity=0.5
+                ),
+            ]
+
+
+    def _svg_height(self, start, end, level=0, max_level=None):
+        """
+        Returns the number of lines svg draws for the project, without
+        drawing it
 
-        elif scale == DRAW_WITH_QUATERLY_SCALE:
-            __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
-            sys.exit(1)
+        Keyword arguments:
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        level -- int, indentation level of the project
+        max_level -- int, level of the deepest subprojects not drawn as a
+                     summary bar, default None for all
+        """
+        if max_level is not None and level > max_level:
+            if len(self.tasks) == 0 or self.start_date() > end or self.end_date() < start:
+                return 0
+            return 1
 
+        height = 1*(self.name != "")
+        for t in self.tasks:
+            if isinstance(t, Project):
+                height += t._svg_height(start, end, level+1, max_level)
+            else:
+                height += t._svg_height(start, end, level+1)
 
+        prj_bar = self._svg_has_title(start, end, level)
+        if self.name != "" and not prj_bar:
+            height -= 1
 
-        # cas 1 -s--S==E--e-
-        if self.start_date() >= start and self.end_date() <= end:
-            x = _time_diff(self.start_date(), start) * 10
-            d = _time_diff_d(self.end_date(), self.start_date()) * 10
-            self.drawn_x_begin_coord = x
-            self.drawn_x_end_coord = x+d
-        # cas 5 -s--e--S==E-
-        elif self.start_date() > end:
+        if height == 0 or (height == 1 and prj_bar):
+            return 0
+        return height
+
+
+    def _svg_stream(self, stream, elements, prev_y=0, start=None, end=None, color=None, level=0, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False, critical_tasks=None, max_level=None):
+        """
+        Streaming counterpart of svg : writes the project to stream while its
+        tasks are drawn, and returns the number of lines drawn. The height of
+        the project is computed first, as the purple bar comes before tasks.
+
+        Keyword arguments:
+        stream -- _SvgStream to write to
+        elements -- _StreamElements or _CompactElements
+        See svg for other arguments.
+        """
+        if start is None:
+            start = self.start_date()
+        if end is None:
+            end = self.end_date()
+        if color is None or self.color is not None:
+            color = self.color
+
+        if max_level is not None and level > max_level:
+            trepr, theight = self._svg_summary(elements, prev_y, start, end, color, scale, title_align_on_left)
+            if trepr is not None:
+                stream.add(trepr)
+            return theight
+
+        height = self._svg_height(start, end, level, max_level)
+        if height == 0:
+            return 0
+
+        stream.open_group()
+        if self._svg_has_title(start, end, level):
+            for element in self._svg_title(elements, prev_y, prev_y + height, level):
+                stream.add(element)
+
+        stream.open_group()
+        cy = prev_y + 1*(self.name != "")
+        for t in self.tasks:
+            if isinstance(t, Project):
+                cy += t._svg_stream(stream, elements, cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks, max_level=max_level)
+            elif isinstance(t, TaskTable):
+                for trepr, theight in t._svg_tasks(elements, cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks):
+                    stream.add(trepr)
+                    cy += theight
+            else:
+                trepr, theight = t._svg(elements, cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left, critical_tasks=critical_tasks)
+                if trepr is not None:
+                    stream.add(trepr)
+                    cy += theight
+        stream.close_group()
+        stream.close_group()
+        return height
+
+
+    def _svg_summary(self, elements, prev_y, start, end, color, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False):
+        """
+        Return (element, number of lines drawn) for the project drawn as one
+        summary bar from its first to its last day, shaded by the percent
+        done of its tasks
+
+        Keyword arguments:
+        elements -- _SvgwriteElements, _StreamElements or _CompactElements
+        prev_y -- int, line to draw
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        color -- string of color for drawing the project
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        title_align_on_left -- boolean, align title on left
+        """
+        if len(self.tasks) == 0:
             return (None, 0)
-        # cas 6 -S==E-s--e-
-        elif self.end_date() < start:
+        extent = _svg_bar_extent(self.start_date(), self.end_date(), start, end, scale)
+        if extent is None:
             return (None, 0)
-        # cas 2 -S==s==E--e-
-        elif self.start_date() < start and self.end_date() <= end:
-            x = 0
-            d = _time_diff_d(self.end_date(), start) * 10
-            self.drawn_x_begin_coord = x
-            self.drawn_x_end_coord = x+d
-            add_begin_mark = True
-        # cas 3 -s--S==e==E-
-        elif self.start_date() >= start and  self.end_date() > end:
-            x = _time_diff(self.start_date(), start) * 10 
-            d = _time_diff_d(end, self.start_date()) * 10
-            self.drawn_x_begin_coord = x
-            self.drawn_x_end_coord = x+d
-            add_end_mark = True
-        # cas 4 -S==s==e==E-
-        elif self.start_date() < start and self.end_date() > end:
-            x = 0
-            d = _time_diff_d(end, start) * 10 
-            self.drawn_x_begin_coord = x
-            self.drawn_x_end_coord = x+d
-            add_end_mark = True
-            add_begin_mark = True
-        else:
-            return (None, 0)    
-
-
-        self.drawn_y_coord = y
-        
+        x, d = extent[0], extent[1]
+        y = prev_y * 10
 
-        svg = svgwrite.container.Group(id=self.name.replace(' ', '_'))
-        svg.add(svgwrite.shapes.Rect(
+        svg = elements.Group(id=self.name.replace(' ', '_'))
+        svg.add(elements.Rect(
                 insert=((x+1)*mm, (y+1)*mm),
                 size=((d-2)*mm, 8*mm),
                 fill=color,
-                stroke=color,
+                stroke='purple',
                 stroke_width=2,
                 opacity=0.85,
                 ))
-        svg.add(svgwrite.shapes.Rect(
-                insert=((x+1)*mm, (y+6)*mm),
-                size=(((d-2))*mm, 3*mm),
-                fill="#909090",
-                stroke=color,
-                stroke_width=1,
-                opacity=0.2,
-                ))
-
-        if add_modified_begin_mark:
-            svg.add(svgwrite.shapes.Rect(
-                    insert=((x+1)*mm, (y+1)*mm),
-                    size=(5*mm, 4*mm),
-                    fill="#0000FF",
-                    stroke=color,
-                    stroke_width=1,
-                    opacity=0.35,
-                    ))
-
-        if add_modified_end_mark:
-            svg.add(svgwrite.shapes.Rect(
-                    insert=((x+d-7+1)*mm, (y+1)*mm),
-                    size=(5*mm, 4*mm),
-                    fill="#0000FF",
-                    stroke=color,
-                    stroke_width=1,
-                    opacity=0.35,
-                    ))
-        
-
-        if add_begin_mark:
-            svg.add(svgwrite.shapes.Rect(
-                    insert=((x+1)*mm, (y+1)*mm),
-                    size=(5*mm, 8*mm),
-                    fill="#000000",
-                    stroke=color,
-                    stroke_width=1,
-                    opacity=0.2,
-                    ))
-        if add_end_mark:
-            svg.add(svgwrite.shapes.Rect(
-                    insert=((x+d-7+1)*mm, (y+1)*mm),
-                    size=(5*mm, 8*mm),
-                    fill="#000000",
-                    stroke=color,
-                    stroke_width=1,
-                    opacity=0.2,
-                    ))
 
-        if self.percent_done is not None and self.percent_done > 0:
-            # Bar shade
-            svg.add(svgwrite.shapes.Rect(
+        done, days = self._progress()
+        if done > 0:
+            svg.add(elements.Rect(
                     insert=((x+1)*mm, (y+6)*mm),
-                    size=(((d-2)*self.percent_done/100)*mm, 3*mm),
+                    size=(((d-2)*done/days)*mm, 3*mm),
                     fill="#F08000",
                     stroke=color,
                     stroke_width=1,
@@ -1109,1159 +6464,1832 @@ class Task(object):
             tx = x+2
         else:
             tx = 5
-            
-        svg.add(svgwrite.text.Text(self.fullname, insert=((tx)*mm, (y + 5)*mm), fill=_font_attributes()['fill'], stroke=_font_attributes()['stroke'], stroke_width=_font_attributes()['stroke_width'], font_family=_font_attributes()['font_family'], font_size=15))
-
-        if self.resources is not None:
-            t = " / ".join(["{0}".format(r.name) for r in self.resources])
-            svg.add(svgwrite.text.Text("{0}".format(t), insert=((x+2)*mm, (y + 8.5)*mm), fill='purple', stroke=_font_attributes()['stroke'], stroke_width=_font_attributes()['stroke_width'], font_family=_font_attributes()['font_family'], font_size=15-5))
-
+        svg.add(elements.Text('{0} ({1} tasks)'.format(self.name, self.nb_elements()), insert=((tx)*mm, (y + 5)*mm), fill=self._context().font_attributes['fill'], stroke=self._context().font_attributes['stroke'], stroke_width=self._context().font_attributes['stroke_width'], font_family=self._context().font_attributes['font_family'], font_size=15, font_weight='bold'))
 
         return (svg, 1)
 
 
-    def svg_dependencies(self, prj):
+    def _progress(self):
         """
-        Draws svg dependencies between task and project according to coordinates
-        cached when drawing tasks
-
-        Keyword arguments:
-        prj -- Project object to check against
+        Returns (days done, days) of tasks of the project and its
+        subprojects, days of a task counted from its first to its last day.
+        Milestones are not counted.
         """
-        __LOG__.debug('** Task::svg_dependencies ({0})'.format({'name':self.name, 'prj':prj}))
-        if self.depends_of is None:
-            return None
-        else:
-            svg = svgwrite.container.Group()
-            for t in self.depends_of:
-                if isinstance(t, Milestone):
-                    if not (t.drawn_x_end_coord is None or t.drawn_y_coord is None or self.drawn_x_begin_coord is None) and prj.is_in_project(t):
-                        if t.drawn_x_end_coord < self.drawn_x_begin_coord:
-                            # horizontal line
-                            svg.add(svgwrite.shapes.Line(
-                                    start=((t.drawn_x_end_coord + 9)*mm, (t.drawn_y_coord + 5)*mm), 
-                                    end=((self.drawn_x_begin_coord)*mm, (t.drawn_y_coord + 5)*mm), 
-                                    stroke='black',
-                                    stroke_dasharray='5,3',
-                                    ))
-
-                            marker = svgwrite.container.Marker(insert=(5,5), size=(10,10))
-                            marker.add(svgwrite.shapes.Circle((5, 5), r=5, fill='#000000', opacity=0.5, stroke_width=0))
-                            svg.add(marker)
-                            # vertical line
-                            eline = svgwrite.shapes.Line(
-                                start=((self.drawn_x_begin_coord)*mm, (t.drawn_y_coord + 5)*mm), 
-                                end=((self.drawn_x_begin_coord)*mm, (self.drawn_y_coord + 5)*mm), 
-                                stroke='black',
-                                stroke_dasharray='5,3',
-                                )
-                            eline['marker-end'] = marker.get_funciri()
-                            svg.add(eline)
-
-                        else:
-                            # horizontal line
-                            svg.add(svgwrite.shapes.Line(
-                                    start=((t.drawn_x_end_coord + 9)*mm, (t.drawn_y_coord + 5)*mm), 
-                                    end=((self.drawn_x_begin_coord + 10)*mm, (t.drawn_y_coord + 5)*mm), 
-                                    stroke='black',
-                                    stroke_dasharray='5,3',
-                                    ))
-                            # vertical
-                            svg.add(svgwrite.shapes.Line(
-                                start=((self.drawn_x_begin_coord + 10)*mm, (t.drawn_y_coord + 5)*mm), 
-                                end=((self.drawn_x_begin_coord + 10)*mm, (t.drawn_y_coord + 15)*mm), 
-                                stroke='black',
-                                stroke_dasharray='5,3',
-                                ))
-                            # horizontal line
-                            svg.add(svgwrite.shapes.Line(
-                                    start=((self.drawn_x_begin_coord)*mm, (t.drawn_y_coord + 15)*mm), 
-                                    end=((self.drawn_x_begin_coord + 10)*mm, (t.drawn_y_coord + 15)*mm), 
-                                    stroke='black',
-                                    stroke_dasharray='5,3',
-                                    ))
-    
-                            marker = svgwrite.container.Marker(insert=(5,5), size=(10,10))
-                            marker.add(svgwrite.shapes.Circle((5, 5), r=5, fill='#000000', opacity=0.5, stroke_width=0))
-                            svg.add(marker)
-                            # vertical line
-                            eline = svgwrite.shapes.Line(
-                                start=((self.drawn_x_begin_coord)*mm, (t.drawn_y_coord + 15)*mm), 
-                                end=((self.drawn_x_begin_coord)*mm, (self.drawn_y_coord + 5)*mm), 
-                                stroke='black',
-                                stroke_dasharray='5,3',
-                                )
-                            eline['marker-end'] = marker.get_funciri()
-                            svg.add(eline)
-    
-                elif isinstance(t, Task):
-                    if not (t.drawn_x_end_coord is None or t.drawn_y_coord is None or self.drawn_x_begin_coord is None) and prj.is_in_project(t):
-                        # horizontal line
-                        svg.add(svgwrite.shapes.Line(
-                                start=((t.drawn_x_end_coord - 2)*mm, (t.drawn_y_coord + 5)*mm), 
-                                end=((self.drawn_x_begin_coord)*mm, (t.drawn_y_coord + 5)*mm), 
-                                stroke='black',
-                                stroke_dasharray='5,3',
-                                ))
-    
-                        marker = svgwrite.container.Marker(insert=(5,5), size=(10,10))
-                        marker.add(svgwrite.shapes.Circle((5, 5), r=5, fill='#000000', opacity=0.5, stroke_width=0))
-                        svg.add(marker)
-                        # vertical line
-                        eline = svgwrite.shapes.Line(
-                            start=((self.drawn_x_begin_coord)*mm, (t.drawn_y_coord + 5)*mm), 
-                            end=((self.drawn_x_begin_coord)*mm, (self.drawn_y_coord + 5)*mm), 
-                            stroke='black',
-                            stroke_dasharray='5,3',
-                            )
-                        eline['marker-end'] = marker.get_funciri()
-                        svg.add(eline)
-                    
-        return svg
+        if self.cache_progress is not None:
+            return self.cache_progress
 
+        done = 0
+        days = 0
+        for t in self.tasks:
+            if isinstance(t, (Project, TaskTable)):
+                tdone, tdays = t._progress()
+            elif isinstance(t, Milestone):
+                continue
+            else:
+                tdays = (t.end_date() - t.start_date()).days + 1
+                tdone = tdays * (t.percent_done or 0) / 100.0
+            done += tdone
+            days += tdays
 
-    def nb_elements(self):
-        """
-        Returns the number of task, 1 here
-        """
-        __LOG__.debug('** Task::nb_elements ({0})'.format({'name':self.name}))
-        return 1
+        self.cache_progress = (done, days)
+        return self.cache_progress
 
 
-    def _reset_coord(self):
+    def _svg_depth(self):
         """
-        Reset cached elements of task
+        Returns the level of the deepest subproject, 0 without subproject
         """
-        __LOG__.debug('** Task::reset_coord ({0})'.format({'name':self.name}))
-        self.drawn_x_begin_coord = None
-        self.drawn_x_end_coord = None
-        self.drawn_y_coord = None
-        self.cache_start_date = None
-        self.cache_end_date = None
-        return
+        depth = 0
+        for t in self.tasks:
+            if isinstance(t, Project):
+                depth = max(depth, 1 + t._svg_depth())
+        return depth
 
 
-    def is_in_project(self, task):
+    def _svg_level_of_detail(self, start, end, scale, max_elements):
         """
-        Return True if the given Task is itself... (lazy coding ;)
-        
+        Returns (scale, max_level) for drawing at most max_elements columns
+        and lines : scale, or a coarser one, is the first one with at most
+        half of max_elements columns, and subprojects deeper than max_level
+        are drawn as summary bars, max_level being None if all of them fit.
+
         Keyword arguments:
-        task -- Task object 
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        scale -- requested drawing scale (d: days, w: weeks, m: months)
+        max_elements -- int, maximum number of columns and lines
         """
-        __LOG__.debug('** Task::is_in_project ({0})'.format({'name':self.name, 'task':task}))
-        if task is self:
-            return True
-
-        return False
+        scales = [DRAW_WITH_DAILY_SCALE, DRAW_WITH_WEEKLY_SCALE, DRAW_WITH_MONTHLY_SCALE]
+        if scale in scales:
+            for coarser in scales[scales.index(scale)+1:]:
+                if self._svg_width(start, end, scale) + 1 <= max_elements // 2:
+                    break
+                scale = coarser
+
+        lines = max_elements - (self._svg_width(start, end, scale) + 1)
+        depth = self._svg_depth()
+        # -1 draws the project itself as a summary bar
+        max_level = -1
+        while max_level < depth and self._svg_height(start, end, 0, max_level+1) <= lines:
+            max_level += 1
+        if max_level == depth:
+            max_level = None
+        return (scale, max_level)
 
 
-    def get_resources(self):
-        """
-        Returns Resources used in the task
+    def svg_dependencies(self, prj):
         """
-        return self.resources
+        Draws svg dependencies between tasks according to coordinates cached
+        when drawing tasks
 
+        Keyword arguments:
+        prj -- Project object to check against
+        """
+        return self._svg_dependencies(_SvgwriteElements, prj)
 
 
-    def check_conflicts_between_task_and_resources_vacations(self):
+    def _svg_dependencies(self, elements, prj):
         """
-        Displays a warning for each conflict between tasks and vacation of
-        resources affected to the task
-
-        And returns a dictionnary for resource vacation conflicts
+        Return element of dependencies between tasks, built with elements
+        (_SvgwriteElements, _StreamElements or _CompactElements). See
+        svg_dependencies.
         """
-        conflicts = []
-        if self.get_resources() is None:
-            return conflicts
-        for r in self.get_resources():
-            cday = self.start_date()
-            while cday <= self.end_date():
-                if cday.weekday() not in _not_worked_days() and not r.is_available(cday):
-                    conflicts.append({'resource':r.name,'date':cday, 'task':self.name})
-                    __LOG__.warning('** Caution resource "{0}" is affected on task "{2}" during vacations on day {1}'.format(r.name, cday, self.fullname))
-                cday += datetime.timedelta(days=1)
-        return conflicts
+        svg = elements.Group()
+        for t in self.tasks:
+            if isinstance(t, TaskTable):
+                for trepr in t._svg_tasks_dependencies(elements, prj):
+                    svg.add(trepr)
+                continue
+            trepr = t._svg_dependencies(elements, prj)
+            if trepr is not None:
+                svg.add(trepr)
+        return svg
 
 
-    def csv(self, csv=None):
+    def _svg_dependencies_stream(self, stream, elements, prj):
         """
-        Create CSV output from tasks
+        Streaming counterpart of svg_dependencies : writes dependencies to
+        stream task after task
 
         Keyword arguments:
-        csv -- None, dymmy object
+        stream -- _SvgStream to write to
+        elements -- _StreamElements or _CompactElements
+        prj -- Project object to check against
         """
-        if self.resources is not None:
-            resources = ', '.join([x.fullname for x in self.resources])
-        else:
-            resources = ''
-            
-        csv_text = '"{0}";"{1}";{2};{3};{4};"{5}";\r\n'.format(
-            self.state.replace('"', '\\"'),
-            self.fullname.replace('"', '\\"'),
-            self.start_date(),
-            self.end_date(),
-            self.duration,
-            resources.replace('"', '\\"')
-            )
-        return csv_text
-
-
-############################################################################
+        stream.open_group()
+        for t in self.tasks:
+            if isinstance(t, Project):
+                t._svg_dependencies_stream(stream, elements, prj)
+            elif isinstance(t, TaskTable):
+                for trepr in t._svg_tasks_dependencies(elements, prj):
+                    stream.add(trepr)
+            else:
+                trepr = t._svg_dependencies(elements, prj)
+                if trepr is not None:
+                    stream.add(trepr)
+        stream.close_group()
+        return
 
 
-class Milestone(Task):
-    """
-    Class for manipulating Milestones
-    """
-    def __init__(self, name, start=None, depends_of=None, color=None, fullname=None, display=True):
+    def nb_elements(self):
         """
-        Initialize milestone object. Two of start, stop or duration may be given.
-        This milestone can rely on other milestone and will be completed with resources.
-        If percent done is given, a progress bar will be included on the milestone.
-        If color is specified, it will be used for the milestone.
-
-        Keyword arguments:
-        name -- name of the milestone (id)
-        fullname -- long name given to the resource
-        start -- datetime.date, first day of the milestone, default None
-        depends_of -- list of Milestone which are parents of this one, default None
-        color -- string, html color, default None
-        display -- boolean, display this milestone, default True
+        Returns the number of tasks included in the project or subproject
         """
-        __LOG__.debug('** Milestone::__init__ {0}'.format({'name':name, 'start':start, 'depends_of':depends_of}))
-        self.name = name
-        if fullname is not None:
-            self.fullname = fullname
-        else:
-            self.fullname = name
-
-        self.start = start
-        self.stop = start
-        self.duration = 0
-        if color is not None:
-            self.color = color
-        else:
-            self.color = '#FF3030'
-            
-        self.display = display
-        self.state = 'Milestone'
+        if self.cache_nb_elements is not None:
+            return self.cache_nb_elements
+        
+        nb = 0
+        for t in self.tasks:
+            nb += t.nb_elements()
 
-        if type(depends_of) is type([]):
-            self.depends_of = depends_of
-        elif depends_of is not None:
-            self.depends_of = [depends_of]
-        else:
-            self.depends_of = None
+        self.cache_nb_elements = nb
+        return nb 
 
-        self.drawn_x_begin_coord = None
-        self.drawn_x_end_coord = None
-        self.drawn_y_coord = None
+    def _reset_coord(self):
+        """
+        Reset cached elements of all tasks and project
+        """
+        self.cache_nb_elements = None
         self.cache_start_date = None
         self.cache_end_date = None
-
+        self.cache_progress = None
+        for t in self.tasks:
+            t._reset_coord()
         return
 
-
-    def end_date(self):
+    def _reset_drawing(self):
         """
-        Returns the last day of the milestone, either the one which was given at milestone
-        creation or the one calculated after checking dependencies
+        Reset coordinates of the last drawing of all tasks, keeping their
+        schedule
         """
-        __LOG__.debug('** Milestone::end_date ({0})'.format(self.name))
-        #return self.start_date() - datetime.timedelta(days=1)
-        return self.start_date()
-
+        for t in self.tasks:
+            t._reset_drawing()
+        return
 
-    def svg(self, prev_y=0, start=None, end=None, color=None, level=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False):
+    def is_in_project(self, task):
         """
-        Return SVG for drawing this milestone.
-
+        Return True if the given Task is in the project, False if not
+        
         Keyword arguments:
-        prev_y -- int, line to start to draw
-        start -- datetime.date of first day to draw
-        end -- datetime.date of last day to draw
-        color -- string of color for drawing the project
-        level -- int, indentation level of the project, not used here
-        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
-        title_align_on_left -- boolean, align milestone title on left
+        task -- Task object 
         """
-        __LOG__.debug('** Milestone::svg ({0})'.format({'name':self.name, 'prev_y':prev_y, 'start':start, 'end':end, 'color':color, 'level':level}))
-
-        if not self.display:
-            __LOG__.debug('** Milestone::svg ({0}) display off'.format({'name':self.name}))
-            return(None, 0)
-
-        #add_modified_begin_mark = False
-        #add_modified_end_mark = False
-
-        if start is None:
-            start = self.start_date()
-
-        #if self.start_date() != self.start and self.start is not None:
-        #    add_modified_begin_mark = True
-
-        if end is None:
-            end = self.end_date()
-
-        #if self.end_date() != self.stop and self.stop is not None:
-        #    add_modified_end_mark = True
-
-        # override project color if defined
-        if self.color is not None:
-            color = self.color
-
-        #add_begin_mark = False
-        #add_end_mark = False
-
-        y = prev_y * 10
-
+        if isinstance(task, _TaskView) and task._table in self._tasks_set:
+            return True
+        return task in self._tasks_set
 
-        if scale == DRAW_WITH_DAILY_SCALE:
-            def _time_diff(e, s):
-                return (e - s).days
-            def _time_diff_d(e, s):
-                return _time_diff(e, s) + 1
 
-        elif scale == DRAW_WITH_WEEKLY_SCALE:
-            def _time_diff(end_date, start_date):
-                td = 0
-                guess = start_date
-                # find first day of the week
-                while guess.weekday() != 0:
-                    guess = guess + dateutil.relativedelta.relativedelta(days=-1)
-                # find last day of the week                
-                while end_date.weekday() != 6:
-                    end_date = end_date + dateutil.relativedelta.relativedelta(days=+1)
-                    
-                while guess <= end_date:
-                    td += 1
-                    guess = guess + dateutil.relativedelta.relativedelta(weeks=+1)
+    def get_task(self, name):
+        """
+        Returns the Task of the project or of its subprojects with the given
+        name (the first one added if several have it), None if there is none
 
-                return td - 1
-            def _time_diff_d(e, s):
-                return _time_diff(e, s) + 1
+        Keyword arguments:
+        name -- string, name of the task
+        """
+        task = self._tasks_by_name.get(name)
+        if task is None:
+            for table in self._tables:
+                try:
+                    return table.task(table.index(name))
+                except ValueError:
+                    pass
+        return task
 
-        elif scale == DRAW_WITH_MONTHLY_SCALE:
-            def _time_diff(end_date, start_date):
-                return dateutil.relativedelta.relativedelta(end_date, start_date).months + dateutil.relativedelta.relativedelta(end_date, start_date).years*12
-            def _time_diff_d(e, s):
-                return _time_diff(e, s) + 1
 
+    def get_resources(self):
+        """
+        Returns Resources used in the project
+        """
+        # rows can be added to tables without telling the project
+        if self._resources_list is None or len(self._tables) > 0:
+            rlist = []
+            seen = set()
+            for t in self._units():
+                if isinstance(t, TaskTable):
+                    resources = t.resources
+                else:
+                    resources = t.get_resources() or []
+                for r in resources:
+                    if r not in seen:
+                        seen.add(r)
+                        rlist.append(r)
+            self._resources_list = rlist
+        return list(self._resources_list)
 
-        elif scale == DRAW_WITH_QUATERLY_SCALE:
-            __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
-            sys.exit(1)
 
+    def get_tasks_of_resource(self, resource):
+        """
+        Returns list of Tasks of the project and of its subprojects assigned
+        to a resource, in order of get_tasks()
 
+        Keyword arguments:
+        resource -- Resource or GroupOfResources object
+        """
+        self._units()
+        tasks = sorted(self._tasks_of_resource.get(resource, []), key=self._tasks_position.get)
+        if len(self._tables) == 0:
+            return tasks
+
+        # rows of tables assigned to the resource, at the place of the table
+        entries = [(self._tasks_position[t], 0, t) for t in tasks]
+        for table in self._tables:
+            position = self._tasks_position[table]
+            entries.extend([(position, i, table.task(i)) for i in table._rows_of_resource(resource)])
+        entries.sort(key=lambda e: (e[0], e[1]))
+        tasks = []
+        seen = set()
+        for (position, i, t) in entries:
+            if t not in seen:
+                seen.add(t)
+                tasks.append(t)
+        return tasks
+
+
+
+    def _get_dependencies_graph(self, with_tables=True):
+        """
+        Returns (tasks, predecessors, successors) where :
+        tasks -- list of Tasks of the project and all the tasks they depend of
+        predecessors -- dictionnary of list of Tasks each Task depends of
+        successors -- dictionnary of list of Tasks depending of each Task
 
-        # cas 1 -s--X--e-
-        if self.start_date() >= start and self.end_date() <= end:
-            x = _time_diff(self.start_date(), start) * 10
-            self.drawn_x_begin_coord = x
-            self.drawn_x_end_coord = x
+        Keyword arguments:
+        with_tables -- boolean, also rows of TaskTables added whole, as Task
+                       objects
+        """
+        tasks = []
+        predecessors = {}
+        successors = {}
+        if with_tables:
+            stack = list(reversed(self.get_tasks()))
         else:
-            return (None, 0)    
+            stack = list(reversed([t for t in self._units() if not isinstance(t, TaskTable)]))
+        while len(stack) > 0:
+            t = stack.pop()
+            if t in predecessors:
+                continue
+            tasks.append(t)
+            predecessors[t] = []
+            successors.setdefault(t, [])
+            if t.depends_of is None:
+                continue
+            for d in t.depends_of:
+                # only Tasks and Milestones are taken into account by start_date()
+                if not isinstance(d, Task) or d in predecessors[t]:
+                    continue
+                predecessors[t].append(d)
+                successors.setdefault(d, []).append(t)
+                if d not in predecessors:
+                    stack.append(d)
 
+        return (tasks, predecessors, successors)
 
-        self.drawn_y_coord = y
-        
 
-        #insert=((x+1)*mm, (y+1)*mm),
-        #size=((d-2)*mm, 8*mm),
+    def schedule(self, engine=SCHEDULE_WITH_PYTHON):
+        """
+        Computes start and end dates of every task of the project and of every
+        task they depend of, in one pass over the dependencies graph (without
+        recursion). Cached dates are filled and the list of Tasks is returned
+        in scheduling order.
 
-        svg = svgwrite.container.Group(id=self.name.replace(' ', '_'))
-        # 3.543307 is for conversion from mm to pt units !
-        svg.add(svgwrite.shapes.Polygon(
-                points=[
-                    ((x+5)*mm, (y+2)*mm),
-                    ((x+8)*mm, (y+5)*mm),
-                    ((x+5)*mm, (y+8)*mm),
-                    ((x+2)*mm, (y+5)*mm)
-                ],
-                fill=color,
-                stroke=color,
-                stroke_width=2,
-                opacity=0.85,
-                ))
+        Only tasks without cached dates are computed, ie tasks whose start,
+        stop, duration or dependencies changed and the tasks depending of
+        them. Everything is computed again if the calendar (not worked days or
+        vacations) changed since last call.
 
+        With SCHEDULE_WITH_NUMPY engine, tasks are computed together, level by
+        level of the dependencies graph, which is faster for large projects.
+        numpy is then needed.
 
+        Rows of TaskTables added whole are computed over the arrays of the
+        tables and come last, as they do not depend of other tasks.
 
-        if not title_align_on_left:
-            tx = x+2
-        else:
-            tx = 5
-            
-        svg.add(svgwrite.text.Text(self.fullname, insert=((tx)*mm, (y + 5)*mm), fill=_font_attributes()['fill'], stroke=_font_attributes()['stroke'], stroke_width=_font_attributes()['stroke_width'], font_family=_font_attributes()['font_family'], font_size=15))
+        Raises ValueError if there are circular dependencies.
 
+        Keyword arguments:
+        engine -- SCHEDULE_WITH_PYTHON or SCHEDULE_WITH_NUMPY
+        """
+        return self._with_tables(self._schedule(engine))
 
-        return (svg, 2)
 
+    def _with_tables(self, order):
+        """
+        Returns order followed by Task objects of rows of TaskTables added
+        whole, see schedule
 
-    def svg_dependencies(self, prj):
+        Keyword arguments:
+        order -- list of Tasks as returned by _schedule()
         """
-        Draws svg dependencies between milestone and project according to coordinates
-        cached when drawing milestones
+        if len(self._tables) == 0:
+            return order
+        order = list(order)
+        seen = set(order)
+        for table in self._tables:
+            for t in table.tasks():
+                if t not in seen:
+                    seen.add(t)
+                    order.append(t)
+        return order
+
+
+    def _schedule(self, engine=SCHEDULE_WITH_PYTHON):
+        """
+        Computes dates like schedule, but returns only Tasks which are not
+        rows of TaskTables added whole, without making Task objects for them.
 
         Keyword arguments:
-        prj -- Project object to check against
+        engine -- SCHEDULE_WITH_PYTHON or SCHEDULE_WITH_NUMPY
         """
-        __LOG__.debug('** Milestone::svg_dependencies ({0})'.format({'name':self.name, 'prj':prj}))
-        if self.depends_of is None:
-            return None
-        else:
-            svg = svgwrite.container.Group()
-            for t in self.depends_of:
-                if isinstance(t, Milestone):
-                    if not (t.drawn_x_end_coord is None or t.drawn_y_coord is None or self.drawn_x_begin_coord is None) and prj.is_in_project(t):
-                        # horizontal line
-                        svg.add(svgwrite.shapes.Line(
-                                start=((t.drawn_x_end_coord + 9)*mm, (t.drawn_y_coord + 5)*mm), 
-                                end=((self.drawn_x_begin_coord + 5)*mm, (t.drawn_y_coord + 5)*mm), 
-                                stroke='black',
-                                stroke_dasharray='5,3',
-                                ))
-                        
-                        marker = svgwrite.container.Marker(insert=(5,5), size=(10,10))
-                        marker.add(svgwrite.shapes.Circle((5, 5), r=5, fill='#000000', opacity=0.5, stroke_width=0))
-                        svg.add(marker)
-                        # vertical line
-                        eline = svgwrite.shapes.Line(
-                            start=((self.drawn_x_begin_coord + 5)*mm, (t.drawn_y_coord + 5)*mm), 
-                            end=((self.drawn_x_begin_coord+5)*mm, (self.drawn_y_coord)*mm), 
-                            stroke='black',
-                            stroke_dasharray='5,3',
-                            )
-                        eline['marker-end'] = marker.get_funciri()
-                        svg.add(eline)
-
-                elif isinstance(t, Task):                
-                    if not (t.drawn_x_end_coord is None or t.drawn_y_coord is None or self.drawn_x_begin_coord is None) and prj.is_in_project(t):
-                        # horizontal line
-                        svg.add(svgwrite.shapes.Line(
-                                start=((t.drawn_x_end_coord - 2)*mm, (t.drawn_y_coord + 5)*mm), 
-                                end=((self.drawn_x_begin_coord + 5)*mm, (t.drawn_y_coord + 5)*mm), 
-                                stroke='black',
-                                stroke_dasharray='5,3',
-                                ))
-    
-                        marker = svgwrite.container.Marker(insert=(5,5), size=(10,10))
-                        marker.add(svgwrite.shapes.Circle((5, 5), r=5, fill='#000000', opacity=0.5, stroke_width=0))
-                        svg.add(marker)
-                        # vertical line
-                        eline = svgwrite.shapes.Line(
-                            start=((self.drawn_x_begin_coord+5)*mm, (t.drawn_y_coord+5)*mm), 
-                            end=((self.drawn_x_begin_coord+5)*mm, (self.drawn_y_coord + 0)*mm), 
-                            stroke='black',
-                            stroke_dasharray='5,3',
-                            )
-                        eline['marker-end'] = marker.get_funciri()
-                        svg.add(eline)
-    
-        return svg
+        if __LOG__.isEnabledFor(logging.DEBUG):
+            __LOG__.debug('** Project::schedule ({0})'.format({'name':self.name}))
+        tasks, predecessors, successors = self._get_dependencies_graph(with_tables=False)
+
+        # Kahn topological sort
+        nb_predecessors = {}
+        ready = collections.deque()
+        for t in tasks:
+            nb_predecessors[t] = len(predecessors[t])
+            if nb_predecessors[t] == 0:
+                ready.append(t)
+
+        order = []
+        while len(ready) > 0:
+            t = ready.popleft()
+            order.append(t)
+            for s in successors[t]:
+                nb_predecessors[s] -= 1
+                if nb_predecessors[s] == 0:
+                    ready.append(s)
+
+        if len(order) < len(tasks):
+            raise ValueError('Circular dependencies between tasks: {0}'.format(
+                ' -> '.join([t.fullname for t in _find_cycle(tasks, predecessors, nb_predecessors)])))
+
+        # calendar changed, drop everything
+        if self._schedule_calendar is not self._context()._working_days():
+            for t in order:
+                t.cache_start_date = None
+                t.cache_end_date = None
+                t._diagnostics = ()
+            self._schedule_calendar = self._context()._working_days()
+
+        # rows of TaskTables are computed over their arrays
+        for table in self._tables:
+            table.schedule()
+        for t in order:
+            if isinstance(t, _TaskView) and not t._is_scheduled():
+                t._table.schedule()
+
+        if engine == SCHEDULE_WITH_NUMPY:
+            _schedule_with_numpy(order, predecessors, self._context())
+            return order
+        elif engine != SCHEDULE_WITH_PYTHON:
+            raise ValueError('Unknown scheduling engine: {0}'.format(engine))
+
+        # predecessors are already computed and cached when a task is reached
+        for t in order:
+            if not t._is_scheduled():
+                t.start_date()
+                t.end_date()
+
+        return order
+
+
+    def diagnostics(self, reason=None):
+        """
+        Returns list of ScheduleDiagnostic of every task of the project and of
+        every task they depend of, in scheduling order : each date moved by
+        vacations or dependencies, each task not finished on time. Dates are
+        computed with Project.schedule if needed.
 
+        Diagnostics are recorded whatever the logging level is, without
+        formatting any message.
 
+        Keyword arguments:
+        reason -- DIAGNOSTIC_* constant to keep only one kind, default None
+        """
+        diagnostics = []
+        for t in self.schedule():
+            for d in t._diagnostics:
+                if reason is None or d.reason == reason:
+                    diagnostics.append(d)
+        return diagnostics
 
 
-    def get_resources(self):
+    def analyse_slack(self, order=None):
         """
-        Returns Resources used in the milestone
+        Computes early and late dates, total and free float of every task of
+        the project (and of the tasks they depend of) with a forward and a
+        backward pass over the dependencies graph. Floats are counted in
+        worked days, from scheduled dates to the end of the project. Stop
+        dates are taken as deadlines: the deadline slack of a task is negative
+        if it, or a task following it, will not be finished on time.
+
+        Returns a SlackAnalysis.
+
+        Keyword arguments:
+        order -- list of Tasks as returned by schedule(), default None to
+                 schedule the project
         """
-        return []
+        __LOG__.debug('** Project::analyse_slack ({0})'.format({'name':self.name}))
+        if order is None:
+            order = self.schedule()
+
+        analysis = SlackAnalysis(self)
+        if len(order) == 0:
+            return analysis
+
+        wd = self._context()._working_days()
+        origin = min([t.start_date() for t in order])
+
+        def _index(day):
+            # number of worked days from origin before day
+            return wd.nb_worked_days(origin, day - datetime.timedelta(days=1))
+
+        def _day(index):
+            return wd.nth_worked_day(origin, index + 1)
+
+        # forward pass is the schedule itself
+        es = {}
+        ef = {}
+        for t in order:
+            es[t] = _index(t.start_date())
+            if isinstance(t, Milestone):
+                ef[t] = es[t]
+            else:
+                ef[t] = _index(t.end_date())
+
+        in_order = set(order)
+        finish = max(ef.values())
+
+        # a task placed from its stop date starts its duration before it,
+        # unless a dependency ends after that day : its dependencies can
+        # end until placed[t] without moving it
+        placed = {}
+        for t in order:
+            if t.start is None and t.stop is not None and t.duration is not None \
+                    and t.depends_of is not None:
+                if t.duration > 0:
+                    day = wd.nth_worked_day_backward(t.stop, _nb_days_from_duration(t.duration))
+                else:
+                    day = t.stop + datetime.timedelta(days=1)
+                if day >= origin:
+                    placed[t] = _index(wd.previous_worked_day(day))
+
+        # backward pass, following tasks start the day after a task or a
+        # milestone given by _dependency_lag, or on placed[x]. Stop dates
+        # are followed in the same pass: deadline[t] is the last day t can
+        # end on without making t or a following task end after its stop date
+        ls = {}
+        lf = {}
+        ff = {}
+        deadline = {}
+        for t in reversed(order):
+            late = finish
+            free = finish
+            last = None
+            if t.stop is not None:
+                last = _index(wd.previous_worked_day(t.stop))
+            for x in t._successors:
+                if x not in in_order:
+                    continue
+                lag = _dependency_lag(x, t)
+                floor = placed.get(x)
+                if floor is None:
+                    late = min(late, ls[x] - lag)
+                    free = min(free, es[x] - lag)
+                else:
+                    late = min(late, max(ls[x] - lag, floor))
+                    free = min(free, max(es[x] - lag, floor))
+                if x in deadline:
+                    x_last = deadline[x] - (ef[x] - es[x]) - lag
+                    if floor is not None and ef[x] <= deadline[x]:
+                        x_last = max(x_last, floor)
+                    if last is None or x_last < last:
+                        last = x_last
+            lf[t] = late
+            ls[t] = late - (ef[t] - es[t])
+            ff[t] = free - ef[t]
+            if last is not None:
+                deadline[t] = last
+
+        for t in order:
+            analysis._add(TaskSlack(
+                task=t,
+                early_start=t.start_date(),
+                early_finish=t.end_date(),
+                late_start=_day(ls[t]),
+                late_finish=_day(lf[t]),
+                total_float=ls[t] - es[t],
+                free_float=ff[t],
+                deadline_slack=(deadline[t] - ef[t]) if t in deadline else None,
+                ))
 
+        return analysis
 
 
-    def check_conflicts_between_task_and_resources_vacations(self):
+    def _subprojects(self):
         """
-        Displays a warning for each conflict between milestones and vacation of
-        resources affected to the milestone
-
-        And returns a dictionnary for resource vacation conflicts
+        Returns list of the project and all its subprojects, recursively
         """
-        return []
+        projects = [self]
+        for t in self.tasks:
+            if type(t) is type(self):
+                projects.extend(t._subprojects())
+        return projects
 
 
-    def csv(self, csv=None):
+    def _simulation_graph(self, order, index):
         """
-        Create CSV output from milestones
+        Returns the dependencies graph of scheduled tasks as a dictionnary of
+        arrays for _simulate_batch, dates counted in worked days from the
+        first day of the project :
+        days -- number of worked days of each task when it has no distribution
+        law, low, mode, high -- distribution of durations (law 0 for none)
+        milestone -- True for milestones, which end the day they start
+        fixed -- first day the task can start on, whatever its dependencies
+        backward -- True if the task starts its duration before deadline
+        deadline -- last day of the task, unless it starts after it
+        pred_ptr, pred_index, pred_lag -- predecessors of each task, in
+            compressed rows: task i starts at least pred_lag[k] days after the
+            end of pred_index[k], for pred_ptr[i] <= k < pred_ptr[i + 1]
+        succ_ptr, succ_index, succ_lag -- successors, the same way
+        groups -- list of indexes of tasks of the project and each subproject
 
         Keyword arguments:
-        csv -- None, dymmy object
+        order -- list of Tasks in topological order, as given by schedule(),
+                 all of them scheduled
+        index -- function giving the index of a worked day
         """
-        if self.resources is not None:
-            resources = ', '.join([x.fullname for x in self.resources])
-        else:
-            resources = ''
-            
-        csv_text = '"{0}";"{1}";{2};{3};{4};"{5}";\r\n'.format(
-            self.state.replace('"', '\\"'),
-            self.fullname.replace('"', '\\"'),
-            self.start_date(),
-            self.end_date(),
-            self.duration,
-            resources.replace('"', '\\"')
-            )
-        return csv_text
-    
+        import numpy
+
+        nb = len(order)
+        lowest = numpy.iinfo('int64').min // 4
+        position = {}
+        for i, t in enumerate(order):
+            position[t] = i
+
+        graph = {
+            'days': numpy.ones(nb, dtype='int64'),
+            'law': numpy.zeros(nb, dtype='int64'),
+            'low': numpy.zeros(nb),
+            'mode': numpy.zeros(nb),
+            'high': numpy.zeros(nb),
+            'milestone': numpy.zeros(nb, dtype=bool),
+            'fixed': numpy.full(nb, lowest, dtype='int64'),
+            'backward': numpy.zeros(nb, dtype=bool),
+            'deadline': numpy.full(nb, lowest, dtype='int64'),
+            }
+        laws = {DISTRIBUTION_TRIANGULAR: 1, DISTRIBUTION_PERT: 2}
+        wd = self._context()._working_days()
+        predecessors = []
+        successors = [[] for t in order]
+        for i, t in enumerate(order):
+            graph['days'][i] = _nb_days_from_duration(t.duration)
+            if t.duration_distribution is not None and not isinstance(t, Milestone):
+                law, low, mode, high = t.duration_distribution
+                graph['law'][i] = laws[law]
+                graph['low'][i] = low
+                graph['mode'][i] = mode
+                graph['high'][i] = high
+
+            if t.start is not None:
+                graph['fixed'][i] = index(wd.next_worked_day(t.start))
+                if t.stop is not None and t.duration is None and graph['law'][i] == 0:
+                    graph['deadline'][i] = index(wd.previous_worked_day(t.stop))
+            elif t.stop is not None:
+                graph['deadline'][i] = index(wd.previous_worked_day(t.stop))
+                if graph['law'][i] != 0 or (t.duration is not None and t.duration > 0):
+                    graph['backward'][i] = True
+                else:
+                    graph['fixed'][i] = graph['deadline'][i] + 1
+            graph['milestone'][i] = isinstance(t, Milestone)
+
+            deps = []
+            for d in (t.depends_of or []):
+                if d not in position or position[d] in [x[0] for x in deps]:
+                    continue
+                lag = _dependency_lag(t, d)
+                deps.append((position[d], lag))
+                successors[position[d]].append((i, lag))
+            predecessors.append(deps)
+
+        for (name, edges) in (('pred', predecessors), ('succ', successors)):
+            graph[name + '_ptr'] = numpy.cumsum([0] + [len(e) for e in edges])
+            graph[name + '_index'] = numpy.array([x[0] for e in edges for x in e], dtype='int64')
+            graph[name + '_lag'] = numpy.array([x[1] for e in edges for x in e], dtype='int64')
+
+        graph['groups'] = []
+        for p in self._subprojects():
+            graph['groups'].append(numpy.array([position[t] for t in p.get_tasks()], dtype='int64'))
+        return graph
+
+
+    def simulate(self, nb_samples=1000, processes=None, seed=None, batch_size=1000):
+        """
+        Monte Carlo simulation of the schedule: durations of tasks with a
+        distribution (see Task.set_duration_distribution) are drawn for each
+        sample and dates of all tasks computed again, as schedule() would do.
 
+        Samples are simulated by batches on arrays of the dependencies graph,
+        batches are spread over a pool of processes. numpy is needed.
 
+        Returns a SimulationResults.
 
-##</Milestone>##############################################################
+        Keyword arguments:
+        nb_samples -- int, number of schedules to simulate
+        processes -- int, number of processes, default None for one per
+                     processor, 1 to simulate in this process
+        seed -- int, seed of random generators to get reproducible results,
+                default None
+        batch_size -- int, number of samples simulated together
+        """
+        __LOG__.debug('** Project::simulate ({0})'.format({'name':self.name, 'nb_samples':nb_samples}))
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('numpy is needed for Project.simulate, see http://www.numpy.org/')
+
+        if nb_samples < 1 or batch_size < 1:
+            raise ValueError('nb_samples and batch_size should be positive ({0}, {1})'.format(nb_samples, batch_size))
+
+        order = self.schedule()
+        wd = self._context()._working_days()
+        projects = [p for p in self._subprojects() if len(p.get_tasks()) > 0]
+        if len(order) == 0 or len(projects) == 0:
+            raise ValueError('Project "{0}" has no task to simulate'.format(self.name))
+        for t in order:
+            if t.start_date() is None:
+                raise ValueError('Task "{0}" can not be scheduled'.format(t.fullname))
+        origin = min([t.start_date() for t in order])
+
+        def _index(day):
+            # number of worked days from origin before day, negative before origin
+            if day < origin:
+                return -wd.nb_worked_days(day, origin - datetime.timedelta(days=1))
+            return wd.nb_worked_days(origin, day - datetime.timedelta(days=1))
+
+        graph = self._simulation_graph(order, _index)
+        graph['groups'] = [g for g in graph['groups'] if len(g) > 0]
+
+        batches = []
+        for k, first in enumerate(range(0, nb_samples, batch_size)):
+            batches.append((min(batch_size, nb_samples - first), None if seed is None else seed + k))
+
+        if processes == 1 or len(batches) == 1:
+            results = [_simulate_batch(graph, n, s) for (n, s) in batches]
+        else:
+            pool = multiprocessing.Pool(processes, _init_simulation_worker, (graph,))
+            try:
+                results = pool.map(_simulate_batch_in_worker, batches)
+            finally:
+                pool.close()
+                pool.join()
+
+        finishes = numpy.concatenate([r[0] for r in results], axis=1)
+        nb_critical = sum([r[1] for r in results])
+        return SimulationResults(
+            project=self,
+            nb_samples=nb_samples,
+            tasks=order,
+            finishes=dict(zip(projects, finishes)),
+            nb_critical=nb_critical,
+            calendar=wd,
+            origin=origin)
+
+
+    def compare_scenarios(self, scenarios, processes=None):
+        """
+        Runs what-if scenarios of the project (see Scenario), spread over a
+        pool of processes, and compares their end dates with the one of the
+        project.
 
-############################################################################
+        Returns a ScenarioComparison.
 
+        Keyword arguments:
+        scenarios -- list of Scenario objects of this project
+        processes -- int, number of processes, default None for one per
+                     processor, 1 to run scenarios in this process
+        """
+        __LOG__.debug('** Project::compare_scenarios ({0})'.format({'name':self.name, 'scenarios':[x.name for x in scenarios]}))
+        order = self.schedule()
+        for x in scenarios:
+            if x.project is not self:
+                raise ValueError('Scenario "{0}" is not a scenario of project "{1}"'.format(x.name, self.name))
+
+        if processes == 1 or len(scenarios) < 2:
+            for x in scenarios:
+                x._dates = x._run(order)
+        else:
+            position = {}
+            for i, t in enumerate(order):
+                position[t] = i
+            resource_position = {}
+            for j, r in enumerate(_resources_of(order)):
+                resource_position[r] = j
+            portables = [x._portable(position, resource_position) for x in scenarios]
+
+            pool = multiprocessing.Pool(processes, _init_scenario_worker, (_default_context_state(), _snapshot(self)))
+            try:
+                results = pool.map(_run_scenario_in_worker, portables)
+            finally:
+                pool.close()
+                pool.join()
+
+            for x, dates in zip(scenarios, results):
+                x._dates = {}
+                for (i, start, end) in dates:
+                    x._dates[order[i]] = (start, end)
+
+        return ScenarioComparison(self, scenarios)
+
+
+    def level_resources(self):
+        """
+        Computes dates of tasks of the project delayed until no resource has
+        more than one task a day and no group of resources more tasks a day
+        than resources, taking care of dependencies and of resources
+        vacations. Tasks of the project are left unchanged, leveling is done
+        on copies of them.
+
+        Tasks are placed one by one, those with less slack first, then in
+        scheduling order, each one as soon as its dependencies and already
+        placed tasks allow it. A delayed task keeps its number of worked
+        days, tasks depending of it follow.
+
+        Returns a list of (Task, start date, end date) for each task whose
+        dates changed, in scheduling order. Raises ValueError if a task can
+        not be placed because its resources are on vacation for more than a
+        year after other tasks.
+        """
+        __LOG__.debug('** Project::level_resources ({0})'.format({'name':self.name}))
+        order = self.schedule()
+        analysis = self.analyse_slack(order)
+        tasks, predecessors, successors = self._get_dependencies_graph()
+        in_project = set(self.get_tasks())
+        wd = self._context()._working_days()
+        one_day = datetime.timedelta(days=1)
+
+        position = {}
+        for i, t in enumerate(order):
+            position[t] = i
+
+        # copies of delayed tasks and of tasks depending of them
+        copies = {}
+        # number of tasks a day of each resource and group of resources
+        load = {}
+        # days with more than n tasks of each resource or group, as
+        # _Intervals by n, and worked days it is on vacation between first
+        # and last days looked at. Days are followed by not worked days, a
+        # task starting on a worked day can not be on them without being on
+        # the day before
+        overloaded = {}
+        vacations = {}
+        looked_at = {}
+        # last day of placed tasks
+        last_loaded = None
+
+        def _days(start, end):
+            # days as counted by search_for_task_conflicts
+            cday = start
+            while cday <= end:
+                if cday.weekday() not in self._context().not_worked_days:
+                    yield cday
+                cday += one_day
+
+        def _needs(task):
+            # {resource or group: [tasks added a day, capacity, check vacations]}
+            needs = {}
+            for r in task.get_resources():
+                if isinstance(r, GroupOfResources):
+                    if r.nb_elements() == 0:
+                        continue
+                    needs.setdefault(r, [0, r.nb_elements(), True])[0] += 1
+                else:
+                    needs.setdefault(r, [0, 1, True])[0] += 1
+                    for g in r.member_of_groups:
+                        if g.nb_elements() > 0:
+                            needs.setdefault(g, [0, g.nb_elements(), False])[0] += 1
+            return needs
+
+        def _busy(intervals, day):
+            intervals.add(day, wd.next_worked_day(day + one_day) - one_day)
+            return
 
-class Project(object):
-    """
-    Class for handling projects
-    """
-    def __init__(self, name="", color=None):
+        def _overloaded(r, n):
+            if n not in overloaded.setdefault(r, {}):
+                intervals = _Intervals()
+                for (d, nb) in load.get(r, {}).items():
+                    if nb > n:
+                        _busy(intervals, d)
+                overloaded[r][n] = intervals
+            return overloaded[r][n]
+
+        def _vacations(r, start, end):
+            # looks for vacations day by day, once for each day
+            intervals = vacations.setdefault(r, _Intervals())
+            if r in looked_at:
+                first, last = looked_at[r]
+                todo = [(start, first - one_day), (last + one_day, end)]
+                looked_at[r] = (min(start, first), max(end, last))
+            else:
+                todo = [(start, end)]
+                looked_at[r] = (start, end)
+            for (dfrom, dto) in todo:
+                for d in _days(dfrom, dto):
+                    if wd.is_worked(d) and not r.is_available(d):
+                        _busy(intervals, d)
+            return intervals
+
+        def _first_busy(intervals, start, end):
+            # (first, last) days of the first busy interval during start, end
+            i = bisect.bisect_left(intervals.ends, start)
+            if i < len(intervals.starts) and intervals.starts[i] <= end:
+                return (max(intervals.starts[i], start), intervals.ends[i])
+            return None
+
+        def _first_start(task, needs, start, length, horizon):
+            # first day from start where resources have length days free,
+            # jumping over the days tasks of each resource fill
+            while True:
+                end = wd.nth_worked_day(start, length)
+                conflict = None
+                for r in needs:
+                    nb, capacity, check_vacations = needs[r]
+                    busy = [_first_busy(_overloaded(r, max(capacity, nb) - nb), start, end)]
+                    if check_vacations:
+                        busy.append(_first_busy(_vacations(r, start, end), start, end))
+                    for b in busy:
+                        if b is not None and (conflict is None or b < conflict):
+                            conflict = b
+                if conflict is None:
+                    return start
+                if wd.previous_worked_day(conflict[1]) > horizon:
+                    raise ValueError('Task "{0}" can not be placed before {1}, its resources are not available for {2} days'.format(task.fullname, horizon, length))
+                start = wd.next_worked_day(conflict[1] + one_day)
+
+        ready = []
+        nb_predecessors = {}
+        for t in order:
+            nb_predecessors[t] = len(predecessors[t])
+            if nb_predecessors[t] == 0:
+                heapq.heappush(ready, (analysis[t].total_float, position[t], t))
+
+        while len(ready) > 0:
+            slack, i, t = heapq.heappop(ready)
+            c = t
+            if [d for d in (t.depends_of or []) if d in copies]:
+                c = copies[t] = _copy_task(t, copies)
+            if t in in_project and not isinstance(t, Milestone) and t.get_resources():
+                needs = _needs(t)
+                start = c.start_date()
+                end = c.end_date()
+                length = wd.nb_worked_days(start, end)
+                # after the last day of placed tasks, only vacations can
+                # conflict
+                horizon = start
+                if last_loaded is not None and last_loaded > horizon:
+                    horizon = last_loaded
+                horizon += datetime.timedelta(days=366 + 7 * length)
+                leveled = _first_start(t, needs, start, length, horizon)
+                if leveled != start:
+                    __LOG__.info('** Task "{0}" is delayed to {1} for leveling resources'.format(t.fullname, leveled))
+                    if c is t:
+                        c = copies[t] = _copy_task(t, copies)
+                    _move_task(c, leveled, wd)
+                    start = c.start_date()
+                    end = c.end_date()
+
+                for r in needs:
+                    nb = needs[r][0]
+                    days = load.setdefault(r, {})
+                    for d in _days(start, end):
+                        before = days.get(d, 0)
+                        days[d] = before + nb
+                        for n in overloaded.get(r, {}):
+                            if before <= n < before + nb:
+                                _busy(overloaded[r][n], d)
+                if last_loaded is None or end > last_loaded:
+                    last_loaded = end
+
+            for x in successors[t]:
+                nb_predecessors[x] -= 1
+                if nb_predecessors[x] == 0:
+                    heapq.heappush(ready, (analysis[x].total_float, position[x], x))
+
+        shifted = []
+        for t in order:
+            if t in copies:
+                c = copies[t]
+                if (c.start_date(), c.end_date()) != (t.start_date(), t.end_date()):
+                    shifted.append((t, c.start_date(), c.end_date()))
+        return shifted
+
+
+    def availability_matrix(self, start=None, end=None, resources=None):
         """
-        Initialize project with a given name and color for all tasks
+        Returns an AvailabilityMatrix with the state of each resource for each
+        day from start to end, filled in one pass over tasks and vacations of
+        each resource.
+
+        A day is AVAILABILITY_NOT_WORKED if nobody works that day,
+        AVAILABILITY_VACATION if the resource (or its group) is on vacation,
+        AVAILABILITY_BUSY if the resource has a task and AVAILABILITY_FREE
+        otherwise. A GroupOfResources is free if more of its resources are
+        free than tasks are given to the group itself, busy if not and if one
+        of its resources works, on vacation otherwise.
 
         Keyword arguments:
-        name -- string, name of the project
-        color -- color for all tasks of the project
+        start -- datetime.date, first day, default first day of the project
+        end -- datetime.date, last day, default last day of the project
+        resources -- list of Resources and GroupOfResources, default resources of the project
         """
-        self.tasks = []
-        self.name = name
-        if color is None:
-            self.color = '#FFFF90'
-        else:
-            self.color = color
+        __LOG__.debug('** Project::availability_matrix ({0})'.format({'name':self.name, 'start':start, 'end':end}))
+        if start is None:
+            start = self.start_date()
+        if end is None:
+            end = self.end_date()
+        if resources is None:
+            resources = self.get_resources()
+        nb_days = max((end - start).days + 1, 0)
 
-        self.cache_nb_elements = None
-        return
+        wd = self._context()._working_days()
+        not_worked = [i for i in range(nb_days) if not wd.is_worked(start + datetime.timedelta(days=i))]
 
-    def add_task(self, task):
+        def _fill(row, dfrom, dto, state):
+            i = max((dfrom - start).days, 0)
+            j = min((dto - start).days + 1, nb_days)
+            if i < j:
+                row[i:j] = array.array('b', [state]) * (j - i)
+            return
+
+        rows = {}
+        def _resource_row(r):
+            if r not in rows:
+                row = array.array('b', [AVAILABILITY_FREE]) * nb_days
+                for t in r.tasks:
+                    _fill(row, t.start_date(), t.end_date(), AVAILABILITY_BUSY)
+                for (dfrom, dto) in r._vacations_between(start, end):
+                    _fill(row, dfrom, dto, AVAILABILITY_VACATION)
+                for g in r.member_of_groups:
+                    for (dfrom, dto) in g._vacations_between(start, end):
+                        _fill(row, dfrom, dto, AVAILABILITY_VACATION)
+                for i in not_worked:
+                    row[i] = AVAILABILITY_NOT_WORKED
+                rows[r] = row
+            return rows[r]
+
+        def _group_row(g):
+            members = [_resource_row(r) for r in g.resources]
+            # number of tasks of the group itself each day
+            starting = [0] * (nb_days + 1)
+            for t in g.tasks:
+                i = max((t.start_date() - start).days, 0)
+                j = min((t.end_date() - start).days + 1, nb_days)
+                if i < j:
+                    starting[i] += 1
+                    starting[j] -= 1
+            row = array.array('b', [AVAILABILITY_FREE]) * nb_days
+            nb_tasks = 0
+            for i in range(nb_days):
+                nb_tasks += starting[i]
+                states = [m[i] for m in members]
+                if states.count(AVAILABILITY_FREE) > nb_tasks:
+                    row[i] = AVAILABILITY_FREE
+                elif nb_tasks > 0 or AVAILABILITY_BUSY in states:
+                    row[i] = AVAILABILITY_BUSY
+                else:
+                    row[i] = AVAILABILITY_VACATION
+            for (dfrom, dto) in g._vacations_between(start, end):
+                _fill(row, dfrom, dto, AVAILABILITY_VACATION)
+            for i in not_worked:
+                row[i] = AVAILABILITY_NOT_WORKED
+            return row
+
+        states = array.array('b')
+        for r in resources:
+            if isinstance(r, GroupOfResources):
+                states.extend(_group_row(r))
+            else:
+                states.extend(_resource_row(r))
+        return AvailabilityMatrix(resources, start, nb_days, states)
+
+
+    def get_tasks(self):
         """
-        Add a Task to the Project. Task can also be a subproject
+        Returns flat list of Tasks used in the Project and subproject
+        """
+        units = self._units()
+        if len(self._tables) == 0:
+            return list(units)
 
-        Keyword arguments:
-        task -- Task or Project object
+        # Task objects of rows of tables, in place of the tables
+        flist = []
+        seen = set()
+        for t in units:
+            if isinstance(t, TaskTable):
+                st = t.tasks()
+            else:
+                st = [t]
+            for r in st:
+                if r not in seen:
+                    seen.add(r)
+                    flist.append(r)
+        return flist
+
+
+    def _units(self):
         """
-        self.tasks.append(task)
-        self.cache_nb_elements = None
-        return
+        Returns flat list of Tasks and TaskTables added whole to the Project
+        and subprojects. The list is cached, do not change it.
+        """
+        if self._tasks_list is None:
+            flist = []
+            seen = set()
+            for t in self.tasks:
+                # if it is a sub project, recurse
+                if type(t) is type(self):
+                    st = t._units()
+                else: # get task or table
+                    st = [t]
+                for r in st:
+                    if r not in seen:
+                        seen.add(r)
+                        flist.append(r)
+            self._tasks_list = flist
+            self._tasks_position = {}
+            for i, t in enumerate(flist):
+                self._tasks_position[t] = i
+        return self._tasks_list
 
-    def _svg_calendar(self, maxx, maxy, start_date, today=None, scale=DRAW_WITH_DAILY_SCALE):
+
+    def csv(self, csv=None):
         """
-        Draw calendar in svg, begining at start_date for maxx days, containing
-        maxy lines. If today is given, draw a blue line at date
+        Create CSV output from projects
 
         Keyword arguments:
-        maxx -- number of days, weeks, months or quarters (depending on scale) to draw
-        maxy -- number of lines to draw
-        start_date -- datetime.date of the first day to draw
-        today -- datetime.date of day as today reference
-        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        csv -- string, filename to save to OR file object OR None
         """
-        dwg = svgwrite.container.Group()
+        if len(self.tasks) == 0:
+            __LOG__.warning('** Empty project : {0}'.format(self.name))
+            return
 
-        cal = {0:'Mo', 1:'Tu', 2:'We', 3:'Th', 4:'Fr', 5:'Sa', 6:'Su'}
-    
-        maxx += 1
+        if csv is not None:
+            csv_text = bytes.decode(codecs.BOM_UTF8, 'utf-8')
+            csv_text += '"State";"Task Name";"Start date";"End date";"Duration";"Resources";\r\n'
+        else:
+            csv_text = ''
 
-        vlines = dwg.add(svgwrite.container.Group(id='vlines', stroke='lightgray'))
-        for x in range(maxx):
-            vlines.add(svgwrite.shapes.Line(start=(x*cm, 2*cm), end=(x*cm, (maxy+2)*cm)))
-            if scale == DRAW_WITH_DAILY_SCALE:
-                jour = start_date + datetime.timedelta(days=x)
-            elif scale == DRAW_WITH_WEEKLY_SCALE:
-                jour = start_date +  dateutil.relativedelta.relativedelta(weeks=+x)
-            elif scale == DRAW_WITH_MONTHLY_SCALE:
-                jour = start_date +  dateutil.relativedelta.relativedelta(months=+x)
-            elif scale == DRAW_WITH_QUATERLY_SCALE:
-                # how many quarter do we need to draw ?
-                __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
-                sys.exit(1)
-                
-            if not today is None and today == jour:
-                vlines.add(svgwrite.shapes.Rect(
-                    insert=((x+0.4)*cm, 2*cm),
-                    size=(0.2*cm, (maxy)*cm),
-                    fill='#76e9ff',
-                    stroke='lightgray',
-                    stroke_width=0,
-                    opacity=0.8
-                    ))
+        for t in self.tasks:
+            c = t.csv()
+            if c is not None:
+                if sys.version_info[0] == 2:
+                    try:
+                        c = unicode(c, "utf-8")
+                    except TypeError:
+                        pass
+                    csv_text += c
+                elif sys.version_info[0] == 3:
+                    csv_text += c
+                else:
+                    csv_text += c
+
+
+        if csv is not None:
+            test = False
+            import io
+            if sys.version_info[0] == 2:
+                test = type(csv) == types.FileType or type(csv) == types.InstanceType
+            elif sys.version_info[0] == 3:
+                test = type(csv) == io.TextIOWrapper
+
+            if test:
+                csv.write(csv_text)
+            else:
+                fileobj = io.open(csv, mode='w', encoding='utf-8')
+                fileobj.write(csv_text)
+                fileobj.close()
 
-            if scale == DRAW_WITH_DAILY_SCALE:
-                # draw vacations
-                if (start_date + datetime.timedelta(days=x)).weekday() in _not_worked_days() or (start_date + datetime.timedelta(days=x)) in VACATIONS:
-                    vlines.add(svgwrite.shapes.Rect(
-                        insert=(x*cm, 2*cm),
-                        size=(1*cm, maxy*cm),
-                        fill='gray',
-                        stroke='lightgray',
-                        stroke_width=1,
-                        opacity=0.7,
-                        ))
 
-                # Current day
-                vlines.add(svgwrite.text.Text('{1} {0:02}'.format(jour.day, cal[jour.weekday()][0]),
-                                              insert=((x*10+1)*mm, 19*mm),
-                                              fill='black', stroke='black', stroke_width=0,
-                                              font_family=_font_attributes()['font_family'], font_size=15-3))
-                # Year
-                if jour.day == 1 and jour.month == 1:
-                    vlines.add(svgwrite.text.Text('{0}'.format(jour.year),
-                                                  insert=((x*10+1)*mm, 5*mm),
-                                                  fill='#400000', stroke='#400000', stroke_width=0,
-                                                  font_family=_font_attributes()['font_family'], font_size=15+5,
-                                                  font_weight="bold"))
-                # Month name
-                if jour.day == 1:
-                    vlines.add(svgwrite.text.Text('{0}'.format(jour.strftime("%B")),
-                                                  insert=((x*10+1)*mm, 10*mm),
-                                                  fill='#800000', stroke='#800000', stroke_width=0,
-                                                  font_family=_font_attributes()['font_family'], font_size=15+3,
-                                                  font_weight="bold"))
-                # Week number
-                if jour.weekday() == 0:
-                    vlines.add(svgwrite.text.Text('{0:02}'.format(jour.isocalendar()[1]),
-                                                  insert=((x*10+1)*mm, 15*mm),
-                                                  fill='black', stroke='black', stroke_width=0,
-                                                  font_family=_font_attributes()['font_family'],
-                                                  font_size=15+1,
-                                                  font_weight="bold"))
+        return csv_text
 
-            elif scale == DRAW_WITH_WEEKLY_SCALE:
-                # Year
-                if jour.isocalendar()[1] == 1 and jour.month == 1:
-                    vlines.add(svgwrite.text.Text('{0}'.format(jour.year),
-                                                  insert=((x*10+1)*mm, 5*mm),
-                                                  fill='#400000', stroke='#400000', stroke_width=0,
-                                                  font_family=_font_attributes()['font_family'], font_size=15+5, font_weight="bold"))
-                # Month name
-                if jour.day <= 7:
-                    vlines.add(svgwrite.text.Text('{0}'.format(jour.strftime("%B")),
-                                                  insert=((x*10+1)*mm, 10*mm),
-                                                  fill='#800000', stroke='#800000', stroke_width=0,
-                                                  font_family=_font_attributes()['font_family'], font_size=15+3, font_weight="bold"))
-                vlines.add(svgwrite.text.Text('{0:02}'.format(jour.isocalendar()[1]),
-                                              insert=((x*10+1)*mm, 15*mm),
-                                              fill='black', stroke='black', stroke_width=0,
-                                              font_family=_font_attributes()['font_family'], font_size=15+1, font_weight="bold"))
+############################################################################
 
-            elif scale == DRAW_WITH_MONTHLY_SCALE:
-                # Month number
-                vlines.add(svgwrite.text.Text('{0}'.format(jour.strftime("%m")),
-                                              insert=((x*10+1)*mm, 19*mm),
-                                              fill='black', stroke='black', stroke_width=0,
-                                              font_family=_font_attributes()['font_family'], font_size=15-3))
-                # Year
-                if jour.month == 1:
-                    vlines.add(svgwrite.text.Text('{0}'.format(jour.year),
-                                                  insert=((x*10+1)*mm, 5*mm),
-                                                  fill='#400000', stroke='#400000', stroke_width=0,
-                                                  font_family=_font_attributes()['font_family'], font_size=15+5, font_weight="bold"))
 
+class ScheduleDiagnostic(object):
+    """
+    A date of a task moved while scheduling, see Project.diagnostics
+    """
+    __slots__ = ('task', 'reason', 'old_date', 'new_date')
 
-            elif scale == DRAW_WITH_QUATERLY_SCALE:
-                # how many quarter do we need to draw ?
-                __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
-                sys.exit(1)
+    def __init__(self, task, reason, old_date, new_date):
+        """
+        Keyword arguments:
+        task -- Task or Milestone object
+        reason -- DIAGNOSTIC_* constant
+        old_date -- datetime.date, date given or expected, may be None
+        new_date -- datetime.date, date computed
+        """
+        self.task = task
+        self.reason = reason
+        self.old_date = old_date
+        self.new_date = new_date
+        return
 
 
+    def level(self):
+        """
+        Returns logging level of the diagnostic
+        """
+        return _DIAGNOSTIC_MESSAGES[self.reason][0]
 
 
-        vlines.add(svgwrite.shapes.Line(start=(maxx*cm, 2*cm), end=(maxx*cm, (maxy+2)*cm)))
+    def message(self):
+        """
+        Returns message of the diagnostic, as logged
+        """
+        return _DIAGNOSTIC_MESSAGES[self.reason][1].format(self.task.fullname, self.old_date, self.new_date)
 
 
-        hlines = dwg.add(svgwrite.container.Group(id='hlines', stroke='lightgray'))
+    def __repr__(self):
+        return '<ScheduleDiagnostic {0} {1} {2} -> {3}>'.format(self.task.name, self.reason, self.old_date, self.new_date)
 
-        dwg.add(svgwrite.shapes.Line(start=((0)*cm, (2)*cm), end=((maxx)*cm, (2)*cm), stroke='black'))
-        dwg.add(svgwrite.shapes.Line(start=((0)*cm, (maxy+2)*cm), end=((maxx)*cm, (maxy+2)*cm), stroke='black'))
 
-        for y in range(2, maxy+3):
-            hlines.add(svgwrite.shapes.Line(start=(0*cm, y*cm), end=(maxx*cm, y*cm)))
 
-        return dwg
+class TaskSlack(object):
+    """
+    Early and late dates and floats of a task, see Project.analyse_slack
+    """
+    def __init__(self, task, early_start, early_finish, late_start, late_finish, total_float, free_float, deadline_slack=None):
+        """
+        Keyword arguments:
+        task -- Task or Milestone object
+        early_start -- datetime.date, scheduled first day
+        early_finish -- datetime.date, scheduled last day
+        late_start -- datetime.date, latest first day without delaying the project
+        late_finish -- datetime.date, latest last day without delaying the project
+        total_float -- int, worked days the task can slip without delaying the project
+        free_float -- int, worked days the task can slip without delaying any other task
+        deadline_slack -- int, worked days the task can slip before it or a following task ends after its stop date, None if no stop date
+        """
+        self.task = task
+        self.early_start = early_start
+        self.early_finish = early_finish
+        self.late_start = late_start
+        self.late_finish = late_finish
+        self.total_float = total_float
+        self.free_float = free_float
+        self.deadline_slack = deadline_slack
+        return
 
 
-    def make_svg_for_tasks(self, filename, today=None, start=None, end=None, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False):
+    def is_critical(self):
         """
-        Draw gantt of tasks and output it to filename. If start or end are
-        given, use them as reference, otherwise use project first and last day
+        Returns True if the task can not slip without delaying the project
+        """
+        return self.total_float <= 0
+
+
+    def __repr__(self):
+        return '<TaskSlack {0} total_float={1} free_float={2}>'.format(self.task.name, self.total_float, self.free_float)
+
 
+
+class SlackAnalysis(object):
+    """
+    Result of Project.analyse_slack, gives TaskSlack of each task
+    """
+    def __init__(self, project):
+        """
         Keyword arguments:
-        filename -- string, filename to save to OR file object
-        today -- datetime.date of day marked as a reference
-        start -- datetime.date of first day to draw
-        end -- datetime.date of last day to draw
-        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
-        title_align_on_left -- boolean, align task title on left
+        project -- Project object analysed
         """
-        if len(self.tasks) == 0:
-            __LOG__.warning('** Empty project : {0}'.format(self.name))
-            return
+        self.project = project
+        self.slacks = []
+        self._by_task = {}
+        return
 
 
-        self._reset_coord()
+    def _add(self, slack):
+        """
+        Add TaskSlack of a task, in scheduling order
+        """
+        self.slacks.append(slack)
+        self._by_task[slack.task] = slack
+        return
 
-        if start is None:
-            start_date = self.start_date()    
-        else:
-            start_date = start
 
-        if end is None:
-            end_date = self.end_date() 
-        else:
-            end_date = end
+    def get(self, task):
+        """
+        Returns TaskSlack of task, None if the task was not analysed
 
+        Keyword arguments:
+        task -- Task or Milestone object
+        """
+        return self._by_task.get(task)
 
-        if start_date > end_date:
-            __LOG__.critical('start date {0} > end_date {1}'.format(start_date, end_date))
-            sys.exit(1)
 
-        ldwg = svgwrite.container.Group()
-        psvg, pheight = self.svg(prev_y=2, start=start_date, end=end_date, color = self.color, scale=scale, title_align_on_left=title_align_on_left)
-        if psvg is not None:
-            ldwg.add(psvg)
-            
-        dep = self.svg_dependencies(self)
-        if dep is not None:
-            ldwg.add(dep)
+    def critical_tasks(self):
+        """
+        Returns list of Tasks which can not slip without delaying the project,
+        in scheduling order
+        """
+        return [x.task for x in self.slacks if x.is_critical()]
 
-        if scale == DRAW_WITH_DAILY_SCALE:
-            # how many dayss do we need to draw ?
-            maxx = (end_date - start_date).days
-        elif scale == DRAW_WITH_WEEKLY_SCALE:
-            # how many weeks do we need to draw ?
-            maxx = 0
-            guess = start_date
 
-            guess = start_date
-            while guess.weekday() != 0:
-                guess = guess + dateutil.relativedelta.relativedelta(days=-1)
+    def negative_slack(self):
+        """
+        Returns list of TaskSlack of tasks which will not be finished on time
+        (scheduled after their stop date, or delaying a following task which
+        will not)
+        """
+        return [x for x in self.slacks if x.deadline_slack is not None and x.deadline_slack < 0]
 
-            while end_date.weekday() != 6:
-                end_date = end_date + dateutil.relativedelta.relativedelta(days=+1)
-            
-            while guess <= end_date:
-                maxx += 1
-                guess = guess + dateutil.relativedelta.relativedelta(weeks=+1)
-        elif scale == DRAW_WITH_MONTHLY_SCALE:
-            # how many months do we need to draw ?
-            if dateutil.relativedelta.relativedelta(end_date, start_date).days == 0:
-                maxx = dateutil.relativedelta.relativedelta(end_date, start_date).months + dateutil.relativedelta.relativedelta(end_date, start_date).years*12
-            else:
-                maxx = dateutil.relativedelta.relativedelta(end_date, start_date).months + dateutil.relativedelta.relativedelta(end_date, start_date).years*12 + 1
-        elif scale == DRAW_WITH_QUATERLY_SCALE:
-            # how many quarter do we need to draw ?
-            __LOG__.critical('DRAW_WITH_QUATERLY_SCALE not implemented yet')
-            sys.exit(1)
-            
 
+    def __iter__(self):
+        return iter(self.slacks)
 
 
-        dwg = _my_svgwrite_drawing_wrapper(filename, debug=True)
-        dwg.add(svgwrite.shapes.Rect(
-                    insert=(0*cm, 0*cm),
-                    size=((maxx+1)*cm, (pheight+3)*cm),
-                    fill='white',
-                    stroke_width=0,
-                    opacity=1
-                    ))
+    def __len__(self):
+        return len(self.slacks)
 
-        dwg.add(self._svg_calendar(maxx, pheight, start_date, today, scale))
-        dwg.add(ldwg)
-        dwg.save(width=(maxx+1)*cm, height=(pheight+3)*cm)
+
+    def __getitem__(self, task):
+        return self._by_task[task]
+
+
+############################################################################
+
+class SimulationResults(object):
+    """
+    Result of Project.simulate, gives completion dates of the project and its
+    subprojects for a given probability and criticality index of each task
+    """
+    def __init__(self, project, nb_samples, tasks, finishes, nb_critical, calendar, origin):
+        """
+        Keyword arguments:
+        project -- Project object simulated
+        nb_samples -- int, number of simulated schedules
+        tasks -- list of Tasks simulated, in scheduling order
+        finishes -- dictionnary of array of last day of each (sub)project for each sample
+        nb_critical -- array, number of samples where each task is critical
+        calendar -- _WorkingDays used for the simulation
+        origin -- datetime.date, day 0 of the simulation
+        """
+        self.project = project
+        self.nb_samples = nb_samples
+        self.tasks = tasks
+        self._finishes = {}
+        for p in finishes:
+            self._finishes[p] = sorted(finishes[p].tolist())
+        self._criticality = {}
+        for t, n in zip(tasks, nb_critical.tolist()):
+            self._criticality[t] = float(n) / nb_samples
+        self._calendar = calendar
+        self._origin = origin
         return
 
-    def make_svg_for_resources(self, filename, today=None, start=None, end=None, resources=None, one_line_for_tasks=False, filter='', scale=DRAW_WITH_DAILY_SCALE):
+
+    def _day(self, index):
         """
-        Draw resources affectation and output it to filename. If start or end are
-        given, use them as reference, otherwise use project first and last day
+        Returns the worked day of a given index from origin
+        """
+        if index < 0:
+            return self._calendar.nth_worked_day_backward(self._origin - datetime.timedelta(days=1), -index)
+        return self._calendar.nth_worked_day(self._origin, index + 1)
 
-        And returns to a dictionnary of dictionnaries for vacation and task
-        conflicts for resources
+
+    def completion_date(self, percent=50, project=None):
+        """
+        Returns the day by which the project is finished in percent of the
+        samples
 
         Keyword arguments:
-        filename -- string, filename to save to OR file object
-        today -- datetime.date of day marked as a reference
-        start -- datetime.date of first day to draw
-        end -- datetime.date of last day to draw
-        resources -- list of Resource to check, default all
-        one_line_for_tasks -- use only one line to display all tasks ?
-        filter -- display only those tags
-        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        percent -- number, 0 < percent <= 100
+        project -- Project object, the simulated project or one of its
+                   subprojects, default None for the simulated project
         """
+        if not 0 < percent <= 100:
+            raise ValueError('percent should be between 0 and 100 ({0})'.format(percent))
+        finishes = self._finishes[project or self.project]
+        k = max(int(math.ceil(percent * len(finishes) / 100.0)) - 1, 0)
+        return self._day(finishes[k])
 
-        if scale != DRAW_WITH_DAILY_SCALE:
-            __LOG__.warning('** Will draw ressource graph at day scale, not {0} as requested'.format(scale))
-            scale = DRAW_WITH_DAILY_SCALE
 
-        if len(self.tasks) == 0:
-            __LOG__.warning('** Empty project : {0}'.format(self.name))
-            return
+    def completion_dates(self, project=None, percents=(50, 80, 95)):
+        """
+        Returns dictionnary of completion dates of the project by percent
 
-        self._reset_coord()
+        Keyword arguments:
+        project -- Project object, default None for the simulated project
+        percents -- list of percents, default P50, P80 and P95
+        """
+        dates = {}
+        for p in percents:
+            dates[p] = self.completion_date(p, project)
+        return dates
 
 
-        if start is None:
-            start_date = self.start_date()    
-        else:
-            start_date = start
+    def criticality_index(self, task):
+        """
+        Returns the fraction of samples where the task can not slip without
+        delaying the project, None if the task was not simulated
 
-        if end is None:
-            end_date = self.end_date() 
-        else:
-            end_date = end
+        Keyword arguments:
+        task -- Task or Milestone object
+        """
+        return self._criticality.get(task)
 
 
-        if start_date > end_date:
-            __LOG__.critical('start date {0} > end_date {1}'.format(start_date, end_date))
-            sys.exit(1)
+    def criticality_indices(self):
+        """
+        Returns list of (Task, criticality index), in scheduling order
+        """
+        return [(t, self._criticality[t]) for t in self.tasks]
 
 
-        if resources is None:
-            resources = self.get_resources()
+############################################################################
 
-        maxx = (end_date - start_date).days 
-        maxy = len(resources) * 2
+class Scenario(object):
+    """
+    What-if variant of a project. Only changes of tasks and vacations of
+    resources are recorded, the project itself is left unchanged. Running
+    the scenario schedules again copies of the changed tasks and of the tasks
+    depending of them, other tasks keep dates of the project.
+    """
+    def __init__(self, project, name=''):
+        """
+        Keyword arguments:
+        project -- Project object the scenario is a variant of
+        name -- string, name of the scenario
+        """
+        self.project = project
+        self.name = name
+        # (attribute, task, value) in order of change
+        self._changes = []
+        # (resource, first day, last day)
+        self._vacations = []
+        # {task: (start, end)} of tasks whose dates changed, None if not run
+        self._dates = None
+        return
 
-        if maxy == 0:
-            # No resources
-            return {}
 
+    def _change(self, attribute, task, value):
+        """
+        Records a change of a task
+        """
+        if not isinstance(task, Task):
+            raise ValueError('Scenario "{0}": only tasks can be changed ({1})'.format(self.name, task))
+        self._changes.append((attribute, task, value))
+        self._dates = None
+        return
 
-        # detect conflicts between resources and holidays
-        conflicts_vacations = []
-        for t in self.get_tasks():
-            conflicts_vacations.append(t.check_conflicts_between_task_and_resources_vacations())
 
-        conflicts_vacations = _flatten(conflicts_vacations)
+    def set_start(self, task, start):
+        """
+        Gives a new start date to a task
 
+        Keyword arguments:
+        task -- Task or Milestone object
+        start -- datetime.date, first day of the task
+        """
+        self._change('start', task, start)
+        return
 
-        ldwg = svgwrite.container.Group()
 
-        if not one_line_for_tasks:
-            ldwg.add(
-                svgwrite.shapes.Line(
-                    start=((0)*cm, (2)*cm), 
-                    end=((maxx+1)*cm, (2)*cm), 
-                    stroke='black',
-                    ))
+    def set_stop(self, task, stop):
+        """
+        Gives a new stop date to a task
 
-    
-        nline = 2
-        conflicts_tasks = []
-        conflict_display_line = 1
-        for r in resources:
-            # do stuff for each resource
-            if filter != '' and r.name not in filter:
-                continue
+        Keyword arguments:
+        task -- Task object
+        stop -- datetime.date, last day of the task
+        """
+        self._change('stop', task, stop)
+        return
+
+
+    def set_duration(self, task, duration):
+        """
+        Gives a new duration to a task
+
+        Keyword arguments:
+        task -- Task object
+        duration -- int, duration of the task
+        """
+        self._change('duration', task, duration)
+        return
+
+
+    def delay(self, task, days):
+        """
+        Makes a task start some worked days after the date it would start
+        on, keeping its number of worked days
+
+        Keyword arguments:
+        task -- Task or Milestone object
+        days -- int, number of worked days of delay
+        """
+        if days < 0:
+            raise ValueError('Scenario "{0}": delay should not be negative ({1})'.format(self.name, days))
+        self._change('delay', task, days)
+        return
+
+
+    def add_vacations(self, resource, dfrom, dto=None):
+        """
+        Adds vacations to a resource. Tasks of the resource which would be
+        worked during these vacations are delayed after them.
 
-            ress = svgwrite.container.Group()
-            ress.add(svgwrite.text.Text('{0}'.format(r.fullname), insert=(3*mm, (nline*10+7)*mm), fill=_font_attributes()['fill'], stroke=_font_attributes()['stroke'], stroke_width=_font_attributes()['stroke_width'], font_family=_font_attributes()['font_family'], font_size=15+3))
-            #ldwg.add(ress)
+        Keyword arguments:
+        resource -- Resource or GroupOfResources object
+        dfrom -- datetime.date, beginning of vacation
+        dto -- datetime.date, end of vacation, default dfrom
+        """
+        if dto is None:
+            dto = dfrom
+        self._vacations.append((resource, dfrom, dto))
+        self._dates = None
+        return
 
 
-            overcharged_days = r.search_for_task_conflicts()
+    def _portable(self, position, resource_position):
+        """
+        Returns (changes, vacations) with tasks and resources given by
+        position, to run the scenario in another process
 
+        Keyword arguments:
+        position -- dictionnary of position of each task
+        resource_position -- dictionnary of position of each resource
+        """
+        try:
+            changes = [(attribute, position[t], value) for (attribute, t, value) in self._changes]
+        except KeyError as e:
+            raise ValueError('Scenario "{0}": task "{1}" is not in project'.format(self.name, e.args[0].fullname))
+        vacations = [(resource_position[r], dfrom, dto) for (r, dfrom, dto) in self._vacations if r in resource_position]
+        return (changes, vacations)
 
-            conflict_display_line = nline
-            nline += 1
 
-            vac = svgwrite.container.Group()
-            conflicts = svgwrite.container.Group()
-            cday = start_date
-            while cday <= end_date:
-                # Vacations
-                if cday.weekday() not in _not_worked_days() and cday not in VACATIONS and not r.is_available(cday):
-                     vac.add(svgwrite.shapes.Rect(
-                            insert=(((cday - start_date).days * 10 + 1)*mm, ((conflict_display_line)*10+1)*mm),
-                            size=(4*mm, 8*mm),
-                            fill="#008000",
-                            stroke="#008000",
-                            stroke_width=1,
-                            opacity=0.65,
-                            ))
+    def _run(self, order):
+        """
+        Schedules copies of changed tasks and of tasks depending of them.
+        Returns dictionnary of (start, end) of tasks whose dates changed.
 
-                # Overcharge
-                if cday.weekday() not in _not_worked_days() and cday not in VACATIONS and cday in overcharged_days:
-                    conflicts.add(svgwrite.shapes.Rect(
-                        insert=(((cday - start_date).days * 10 + 1 + 4)*mm, ((conflict_display_line)*10+1)*mm),
-                        size=(4*mm, 8*mm),
-                        fill="#AA0000",
-                        stroke="#AA0000",
-                        stroke_width=1,
-                        opacity=0.65,
-                        ))
-                
-                cday += datetime.timedelta(days=1)
+        Keyword arguments:
+        order -- list of Tasks of the project in scheduling order
+        """
+        wd = self.project._context()._working_days()
+        one_day = datetime.timedelta(days=1)
+        in_order = set(order)
+        changes = {}
+        for (attribute, t, value) in self._changes:
+            if t not in in_order:
+                raise ValueError('Scenario "{0}": task "{1}" is not in project'.format(self.name, t.fullname))
+            changes.setdefault(t, []).append((attribute, value))
+        vacations = {}
+        for (r, dfrom, dto) in self._vacations:
+            vacations.setdefault(r, _Intervals()).add(dfrom, dto)
+
+        def _first_vacation(t):
+            # last day of first vacation of resources of t during t, None if none
+            start = t.start_date()
+            end = t.end_date()
+            for r in (getattr(t, 'resources', None) or []):
+                if r not in vacations:
+                    continue
+                v = vacations[r]
+                i = bisect.bisect_left(v.ends, start)
+                while i < len(v.starts) and v.starts[i] <= end:
+                    if wd.nb_worked_days(max(start, v.starts[i]), min(end, v.ends[i])) > 0:
+                        return v.ends[i]
+                    i += 1
+            return None
 
+        # changed tasks, tasks worked during new vacations and tasks
+        # depending of them
+        todo = [t for t in order if t in changes or _first_vacation(t) is not None]
+        affected = set(todo)
+        while len(todo) > 0:
+            t = todo.pop()
+            for x in t._successors:
+                if x in in_order and x not in affected:
+                    affected.add(x)
+                    todo.append(x)
+
+        copies = {}
+        for t in order:
+            if t not in affected:
+                continue
+            c = _copy_task(t, copies)
+            delay = 0
+            for (attribute, value) in changes.get(t, []):
+                if attribute == 'delay':
+                    delay += value
+                else:
+                    setattr(c, '_' + attribute, value)
+                    if attribute == 'start' and isinstance(c, Milestone):
+                        c._stop = value
+            copies[t] = c
+
+            if delay > 0:
+                _move_task(c, wd.nth_worked_day(c.start_date(), delay + 1), wd)
+            last = _first_vacation(c)
+            while last is not None:
+                _move_task(c, wd.next_worked_day(last + one_day), wd)
+                last = _first_vacation(c)
+
+        dates = {}
+        for t in copies:
+            c = copies[t]
+            if (c.start_date(), c.end_date()) != (t.start_date(), t.end_date()):
+                dates[t] = (c.start_date(), c.end_date())
+        return dates
+
+
+    def schedule(self):
+        """
+        Runs the scenario. Returns list of (Task, start, end) of tasks whose
+        dates changed, in scheduling order.
+        """
+        __LOG__.debug('** Scenario::schedule ({0})'.format({'name':self.name}))
+        order = self.project.schedule()
+        self._dates = self._run(order)
+        return [(t, self._dates[t][0], self._dates[t][1]) for t in order if t in self._dates]
 
-            nb_tasks = 0
-            for t in self.get_tasks():
-                if t.get_resources() is not None and r in t.get_resources():
-                    psvg, void = t.svg(prev_y = nline, start=start_date, end=end_date, color=self.color, scale=scale)
-                    if psvg is not None:
-                        ldwg.add(psvg)
-                        nb_tasks +=1
-                        if not one_line_for_tasks:
-                            nline += 1
 
-            if nb_tasks == 0:
-                nline -= 1
-            elif nb_tasks > 0:
-                print(r.fullname, nb_tasks)
-                ldwg.add(ress)
-                ldwg.add(vac)
-                ldwg.add(conflicts)
+    def task_dates(self, task):
+        """
+        Returns (start, end) of a task in the scenario
 
+        Keyword arguments:
+        task -- Task or Milestone object
+        """
+        if self._dates is None:
+            self.schedule()
+        if task in self._dates:
+            return self._dates[task]
+        return (task.start_date(), task.end_date())
 
-                if not one_line_for_tasks:
-                    ldwg.add(
-                        svgwrite.shapes.Line(
-                            start=((0)*cm, (nline)*cm), 
-                            end=((maxx+1)*cm, (nline)*cm), 
-                            stroke='black',
-                            ))
-                
-                # nline += 1
-                if one_line_for_tasks:
-                    nline += 1
-                    ldwg.add(
-                        svgwrite.shapes.Line(
-                        start=((0)*cm, (nline)*cm), 
-                        end=((maxx+1)*cm, (nline)*cm), 
-                        stroke='black',
-                        ))
 
+    def end_date(self, project=None):
+        """
+        Returns the last day of the project in the scenario
 
-        dwg = _my_svgwrite_drawing_wrapper(filename, debug=True)
-        dwg.add(svgwrite.shapes.Rect(
-                    insert=(0*cm, 0*cm),
-                    size=((maxx+1)*cm, (nline+1)*cm),
-                    fill='white',
-                    stroke_width=0,
-                    opacity=1
-                    ))
-        dwg.add(self._svg_calendar(maxx, nline-2, start_date, today, scale))
-        dwg.add(ldwg)
-        dwg.save(width=(maxx+1)*cm, height=(nline+1)*cm)
-        return {
-            'conflicts_vacations': conflicts_vacations, 
-            'conflicts_tasks':conflicts_tasks
-            }
+        Keyword arguments:
+        project -- Project object, the project of the scenario or one of its
+                   subprojects, default None for the project of the scenario
+        """
+        tasks = (project or self.project).get_tasks()
+        if len(tasks) == 0:
+            return None
+        return max([self.task_dates(t)[1] for t in tasks])
 
 
-    def start_date(self):
+
+class ScenarioComparison(object):
+    """
+    Result of Project.compare_scenarios, end dates of scenarios compared to
+    the one of the project
+    """
+    def __init__(self, project, scenarios):
         """
-        Returns first day of the project
+        Keyword arguments:
+        project -- Project object
+        scenarios -- list of Scenario objects, already run
         """
-        if len(self.tasks) == 0:
-            __LOG__.warning('** Empty project : {0}'.format(self.name))
-            return datetime.date(9999, 1, 1)
-        
-        first = self.tasks[0].start_date()
-        for t in self.tasks:
-            if t.start_date() < first:
-                first = t.start_date()
-        return first
+        self.project = project
+        self.scenarios = scenarios
+        self.project_end_date = project.end_date()
+        return
 
 
-    def end_date(self):
+    def delta(self, scenario):
         """
-        Returns last day of the project
+        Returns number of worked days the end of the project moves in the
+        scenario, negative if it ends sooner
+
+        Keyword arguments:
+        scenario -- Scenario object
         """
-        if len(self.tasks) == 0:
-            __LOG__.warning('** Empty project : {0}'.format(self.name))
-            return datetime.date(1970, 1, 1)
+        wd = self.project._context()._working_days()
+        end = scenario.end_date()
+        if end >= self.project_end_date:
+            return wd.nb_worked_days(self.project_end_date + datetime.timedelta(days=1), end)
+        return -wd.nb_worked_days(end + datetime.timedelta(days=1), self.project_end_date)
 
-        last = self.tasks[0].end_date()
-        for t in self.tasks:
-            if t.end_date() > last:
-                last = t.end_date()
-        return last
 
-    def svg(self, prev_y=0, start=None, end=None, color=None, level=0, scale=DRAW_WITH_DAILY_SCALE, title_align_on_left=False):
+    def deltas(self):
         """
-        Return (SVG code, number of lines drawn) for the project. Draws all
-        tasks and add project name with a purple bar on the left side.
+        Returns list of (Scenario, end date, delta in worked days)
+        """
+        return [(x, x.end_date(), self.delta(x)) for x in self.scenarios]
+
+
+    def __iter__(self):
+        return iter(self.deltas())
+
+
+    def __len__(self):
+        return len(self.scenarios)
+
+
+    def csv(self, csv=None):
+        """
+        Create CSV output, one line for the project and one for each scenario
+        with its end date and delta in worked days
 
         Keyword arguments:
-        prev_y -- int, line to start to draw
-        start -- datetime.date of first day to draw
-        end -- datetime.date of last day to draw
-        color -- string of color for drawing the project
-        level -- int, indentation level of the project
-        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
-        title_align_on_left -- boolean, align task title on left
+        csv -- string, filename to save to OR file object OR None
         """
-        if start is None:
-            start = self.start_date()
-        if end is None:
-            end = self.end_date()
-        if color is None or self.color is not None:
-            color = self.color
+        csv_text = '"Scenario";"End";"Delta";\r\n'
+        csv_text += '"{0}";{1};{2};\r\n'.format(self.project.name.replace('"', '\\"'), self.project_end_date, 0)
+        for (x, end, delta) in self.deltas():
+            csv_text += '"{0}";{1};{2};\r\n'.format(x.name.replace('"', '\\"'), end, delta)
 
+        if csv is not None:
+            csv_text = bytes.decode(codecs.BOM_UTF8, 'utf-8') + csv_text
+            test = False
+            import io
+            if sys.version_info[0] == 2:
+                test = type(csv) == types.FileType or type(csv) == types.InstanceType
+            elif sys.version_info[0] == 3:
+                test = type(csv) == io.TextIOWrapper
 
-        cy = prev_y + 1*(self.name != "")
+            if test:
+                csv.write(csv_text)
+            else:
+                fileobj = io.open(csv, mode='w', encoding='utf-8')
+                fileobj.write(csv_text)
+                fileobj.close()
 
-        prj = svgwrite.container.Group()
+        return csv_text
 
-        for t in self.tasks:
-            trepr, theight = t.svg(cy, start=start, end=end, color=color, level=level+1, scale=scale, title_align_on_left=title_align_on_left)
-            if trepr is not None:
-                prj.add(trepr)
-                cy += theight
 
-        fprj = svgwrite.container.Group()
-        prj_bar = False
-        if self.name != "":
-            # if ((self.start_date() >= start and self.end_date() <= end) 
-            #     or (self.start_date() >= start and (self.end_date() <= end or self.start_date() <= end))) or level == 1: 
-            if ((self.start_date() >= start and self.end_date() <= end) 
-                or ((self.end_date() >=start and self.start_date() <= end))) or level == 1: 
-                fprj.add(svgwrite.text.Text('{0}'.format(self.name), insert=((6*level+3)*mm, ((prev_y)*10+7)*mm), fill=_font_attributes()['fill'], stroke=_font_attributes()['stroke'], stroke_width=_font_attributes()['stroke_width'], font_family=_font_attributes()['font_family'], font_size=15+3))
-
-                fprj.add(svgwrite.shapes.Rect(
-                        insert=((6*level+0.8)*mm, (prev_y+0.5)*cm),
-                        size=(0.2*cm, ((cy-prev_y-1)+0.4)*cm),
-                        fill='purple',
-                        stroke='lightgray',
-                        stroke_width=0,
-                        opacity=0.5
-                        ))
-                prj_bar = True
-            else:
-                cy -= 1
+############################################################################
 
-        # Do not display empty tasks
-        if (cy - prev_y) == 0 or ((cy - prev_y) == 1 and prj_bar):
-            return (None, 0)
+class Output(object):
+    """
+    Chart or table to render with Project.make_outputs
+    """
+    __slots__ = ('kind', 'filename', 'scale', 'start', 'end', 'options')
 
-        fprj.add(prj)
+    def __init__(self, kind, filename, scale=DRAW_WITH_DAILY_SCALE, start=None, end=None, **options):
+        """
+        Keyword arguments:
+        kind -- OUTPUT_TASKS, OUTPUT_RESOURCES or OUTPUT_CSV
+        filename -- string, filename to save to
+        scale -- drawing scale (d: days, w: weeks, m: months, q: quaterly)
+        start -- datetime.date of first day to draw
+        end -- datetime.date of last day to draw
+        options -- other keyword arguments of make_svg_for_tasks or
+                   make_svg_for_resources, as today, filter, resources...
+        """
+        if kind not in (OUTPUT_TASKS, OUTPUT_RESOURCES, OUTPUT_CSV):
+            raise ValueError('Unknown kind of output "{0}"'.format(kind))
+        self.kind = kind
+        self.filename = filename
+        self.scale = scale
+        self.start = start
+        self.end = end
+        self.options = options
+        return
 
-        return (fprj, cy-prev_y)
 
+############################################################################
 
-    def svg_dependencies(self, prj):
+class AvailabilityMatrix(object):
+    """
+    State of resources (one row each) for each day (one column each), as
+    returned by Project.availability_matrix. States are kept row after row
+    in an array of bytes, which can be used without copy with
+    numpy.frombuffer(matrix.states, dtype='int8').reshape(len(matrix.resources), matrix.nb_days)
+    """
+    def __init__(self, resources, start, nb_days, states):
         """
-        Draws svg dependencies between tasks according to coordinates cached
-        when drawing tasks
+        Init matrix
 
         Keyword arguments:
-        prj -- Project object to check against
+        resources -- list of Resources and GroupOfResources, one for each row
+        start -- datetime.date, day of the first column
+        nb_days -- int, number of columns
+        states -- array.array of len(resources) * nb_days states
         """
-        svg = svgwrite.container.Group()
-        for t in self.tasks:
-            trepr = t.svg_dependencies(prj)
-            if trepr is not None:
-                svg.add(trepr)
-        return svg
+        self.resources = list(resources)
+        self.start = start
+        self.nb_days = nb_days
+        self.states = states
+        self._rows = {}
+        for (i, r) in enumerate(self.resources):
+            self._rows.setdefault(r, i)
+        return
 
 
-    def nb_elements(self):
+    def days(self):
         """
-        Returns the number of tasks included in the project or subproject
+        Returns list of days (datetime.date) of the columns
         """
-        if self.cache_nb_elements is not None:
-            return self.cache_nb_elements
-        
-        nb = 0
-        for t in self.tasks:
-            nb += t.nb_elements()
+        return [self.start + datetime.timedelta(days=i) for i in range(self.nb_days)]
 
-        self.cache_nb_elements = nb
-        return nb 
 
-    def _reset_coord(self):
+    def _column(self, day):
         """
-        Reset cached elements of all tasks and project
+        Returns the column of day, raises ValueError if it is not in the matrix
         """
-        self.cache_nb_elements = None
-        for t in self.tasks:
-            t._reset_coord()
-        return
+        i = (day - self.start).days
+        if i < 0 or i >= self.nb_days:
+            raise ValueError('Day {0} is not in the matrix'.format(day))
+        return i
 
-    def is_in_project(self, task):
+
+    def get(self, resource, day):
         """
-        Return True if the given Task is in the project, False if not
-        
+        Returns the state of resource on day
+
         Keyword arguments:
-        task -- Task object 
+        resource -- Resource or GroupOfResources
+        day -- datetime.date
         """
-        for t in self.tasks:
-            if t.is_in_project(task):
-                return True
-        return False
+        return self.states[self._rows[resource] * self.nb_days + self._column(day)]
 
 
-    def get_resources(self):
-        """
-        Returns Resources used in the project
+    def row(self, resource):
         """
-        rlist = []
-        for t in self.tasks:
-            r = t.get_resources()
-            if r is not None:
-                rlist.append(r)
+        Returns the list of states of resource, one for each day
 
-        flist = []
-        for r in _flatten(rlist):
-            if r not in flist:
-                flist.append(r)
-        return flist
+        Keyword arguments:
+        resource -- Resource or GroupOfResources
+        """
+        i = self._rows[resource] * self.nb_days
+        return self.states[i:i + self.nb_days].tolist()
 
 
+    def column(self, day):
+        """
+        Returns the list of states of each resource on day
 
-    def get_tasks(self):
+        Keyword arguments:
+        day -- datetime.date
         """
-        Returns flat list of Tasks used in the Project and subproject
+        return self.states[self._column(day)::self.nb_days].tolist()
+
+
+    def free_resources(self, day):
         """
-        tlist = []
-        for t in self.tasks:
-            # if it is a sub project, recurse
-            if type(t) is type(self):
-                st = t.get_tasks()
-                tlist.append(st)
-            else: # get task
-                tlist.append(t)
+        Returns the list of resources free on day
 
-        flist = []
-        for r in _flatten(tlist):
-            if r not in flist:
-                flist.append(r)
-        return flist
+        Keyword arguments:
+        day -- datetime.date
+        """
+        return [r for (r, state) in zip(self.resources, self.column(day)) if state == AVAILABILITY_FREE]
 
 
-    def csv(self, csv=None):
+    def slice(self, resources=None, start=None, end=None):
         """
-        Create CSV output from projects
+        Returns a new AvailabilityMatrix with some resources and days only
 
         Keyword arguments:
-        csv -- string, filename to save to OR file object OR None
+        resources -- list of Resources and GroupOfResources, default all
+        start -- datetime.date, first day, default first day of this matrix
+        end -- datetime.date, last day, default last day of this matrix
         """
-        if len(self.tasks) == 0:
-            __LOG__.warning('** Empty project : {0}'.format(self.name))
-            return
+        if resources is None:
+            resources = self.resources
+        i = 0
+        if start is not None:
+            i = min(max((start - self.start).days, 0), self.nb_days)
+        j = self.nb_days
+        if end is not None:
+            j = min(max((end - self.start).days + 1, i), self.nb_days)
+        states = array.array('b')
+        for r in resources:
+            k = self._rows[r] * self.nb_days
+            states.extend(self.states[k + i:k + j])
+        return AvailabilityMatrix(resources, self.start + datetime.timedelta(days=i), j - i, states)
 
-        if csv is not None:
-            csv_text = bytes.decode(codecs.BOM_UTF8, 'utf-8')
-            csv_text += '"State";"Task Name";"Start date";"End date";"Duration";"Resources";\r\n'
-        else:
-            csv_text = ''
 
-        for t in self.tasks:
-            c = t.csv()
-            if c is not None:
-                if sys.version_info[0] == 2:
-                    try:
-                        c = unicode(c, "utf-8")
-                    except TypeError:
-                        pass
-                    csv_text += c
-                elif sys.version_info[0] == 3:
-                    csv_text += c
-                else:
-                    csv_text += c
+    def csv(self, csv=None):
+        """
+        Create CSV output, one line for each resource, one column for each day
+        with F (free), B (busy), V (vacation) or - (not worked)
 
+        Keyword arguments:
+        csv -- string, filename to save to OR file object OR None
+        """
+        letters = {
+            AVAILABILITY_FREE: 'F',
+            AVAILABILITY_BUSY: 'B',
+            AVAILABILITY_VACATION: 'V',
+            AVAILABILITY_NOT_WORKED: '-',
+            }
+        csv_text = '"Resource";{0};\r\n'.format(';'.join([str(d) for d in self.days()]))
+        for r in self.resources:
+            csv_text += '"{0}";{1};\r\n'.format(
+                r.fullname.replace('"', '\\"'),
+                ';'.join([letters[x] for x in self.row(r)])
+                )
 
         if csv is not None:
+            csv_text = bytes.decode(codecs.BOM_UTF8, 'utf-8') + csv_text
             test = False
             import io
             if sys.version_info[0] == 2:
@@ -2276,9 +8304,9 @@ class Project(object):
                 fileobj.write(csv_text)
                 fileobj.close()
 
-
         return csv_text
 
+
 # MAIN -------------------
 if __name__ == '__main__':
     import doctest
@@ -161,3 +161,1127 @@ def test_Tasks():
     assert_equals(len(p1.get_tasks()), 17)
     return
     
+
+
+def test_working_days():
+    wd = gantt.gantt._working_days()
+    # 2014-12-25 is a global vacation, 2014-12-27/28 is a week end
+    assert_equals(wd.is_worked(datetime.date(2014, 12, 25)), False)
+    assert_equals(wd.is_worked(datetime.date(2014, 12, 26)), True)
+    assert_equals(wd.next_worked_day(datetime.date(2014, 12, 27)), datetime.date(2014, 12, 29))
+    assert_equals(wd.previous_worked_day(datetime.date(2014, 12, 28)), datetime.date(2014, 12, 26))
+    assert_equals(wd.nth_worked_day(datetime.date(2014, 12, 24), 3), datetime.date(2014, 12, 29))
+    assert_equals(wd.nth_worked_day_backward(datetime.date(2014, 12, 29), 3), datetime.date(2014, 12, 24))
+    assert_equals(wd.nb_worked_days(datetime.date(2014, 12, 22), datetime.date(2015, 1, 4)), 8)
+    # far away dates grow the compiled calendar
+    assert_equals(wd.nth_worked_day(datetime.date(2030, 1, 1), 1), datetime.date(2030, 1, 1))
+
+    # calendar is rebuilt when days off change
+    gantt.define_not_worked_days([6])
+    assert_equals(gantt.gantt._working_days().is_worked(datetime.date(2014, 12, 27)), True)
+    gantt.define_not_worked_days([5, 6])
+    assert_equals(gantt.gantt._working_days().is_worked(datetime.date(2014, 12, 27)), False)
+
+    gantt.add_vacations(datetime.date(2016, 2, 1))
+    assert_equals(gantt.gantt._working_days().is_worked(datetime.date(2016, 2, 1)), False)
+
+    # vacations replaced in place, as in processes of a pool
+    state = gantt.gantt._default_context_state()
+    vacations = list(state[2])
+    gantt.gantt._set_default_context_state((state[0], state[1], vacations[:-1] + [datetime.date(2016, 2, 2)], state[3]))
+    assert_equals(gantt.gantt._DEFAULT_CONTEXT.is_vacation(datetime.date(2016, 2, 1)), False)
+    assert_equals(gantt.gantt._DEFAULT_CONTEXT.is_vacation(datetime.date(2016, 2, 2)), True)
+    gantt.gantt._set_default_context_state((state[0], state[1], vacations, state[3]))
+    assert_equals(gantt.gantt._DEFAULT_CONTEXT.is_vacation(datetime.date(2016, 2, 1)), True)
+    return
+
+
+def test_vacations_intervals():
+    vac = gantt.gantt._Intervals()
+    vac.add(datetime.date(2015, 3, 2), datetime.date(2015, 3, 4))
+    vac.add(datetime.date(2015, 3, 10))
+    vac.add(datetime.date(2015, 3, 5), datetime.date(2015, 3, 6))
+    assert_equals(list(vac), [(datetime.date(2015, 3, 2), datetime.date(2015, 3, 6)), (datetime.date(2015, 3, 10), datetime.date(2015, 3, 10))])
+    assert_equals(vac.contains(datetime.date(2015, 3, 6)), True)
+    assert_equals(vac.contains(datetime.date(2015, 3, 7)), False)
+    assert_equals(vac.gaps(datetime.date(2015, 3, 1), datetime.date(2015, 3, 11)), [(datetime.date(2015, 3, 1), datetime.date(2015, 3, 1)), (datetime.date(2015, 3, 7), datetime.date(2015, 3, 9)), (datetime.date(2015, 3, 11), datetime.date(2015, 3, 11))])
+
+    # intervals are rebuilt when the version of their source changes
+    source = [datetime.date(2015, 3, 2)]
+    vac = gantt.gantt._Intervals().update_from(source, 1)
+    source[0] = datetime.date(2015, 3, 3)
+    assert_equals(vac.update_from(source, 1).contains(datetime.date(2015, 3, 3)), False)
+    assert_equals(vac.update_from(source, 2).contains(datetime.date(2015, 3, 3)), True)
+
+    # overlapping global vacations are not duplicated
+    nb = len(gantt.VACATIONS)
+    gantt.add_vacations(datetime.date(2013, 12, 24), datetime.date(2013, 12, 28))
+    assert_equals(len(gantt.VACATIONS), nb + 2)
+
+    gLUCKY = gantt.GroupOfResources('LUCKY')
+    rLUCKY = gantt.Resource('LUCKY1')
+    gLUCKY.add_resource(rLUCKY)
+    gLUCKY.add_vacations(dfrom=datetime.date(2015, 3, 2), dto=datetime.date(2015, 3, 4))
+    rLUCKY.add_vacations(dfrom=datetime.date(2015, 3, 5))
+    assert_equals(rLUCKY.is_available(datetime.date(2015, 3, 3)), False)
+    assert_equals(rLUCKY.is_available(datetime.date(2015, 3, 5)), False)
+    assert_equals(rLUCKY.is_available(datetime.date(2015, 3, 6)), True)
+    assert_equals(gLUCKY.is_available(datetime.date(2015, 3, 5)), False)
+    assert_equals(gLUCKY.is_available(datetime.date(2015, 3, 6)), True)
+    # vacations stay readable
+    assert_equals(rLUCKY.vacations, [(datetime.date(2015, 3, 5), datetime.date(2015, 3, 5))])
+    return
+
+
+def test_schedule():
+    p = gantt.Project(name='Long chain')
+    prev = gantt.Task(name='chain0', start=datetime.date(2015, 1, 5), duration=1)
+    p.add_task(prev)
+    for i in range(1, 3000):
+        t = gantt.Task(name='chain{0}'.format(i), duration=1, depends_of=[prev])
+        p.add_task(t)
+        prev = t
+    order = p.schedule()
+    assert_equals(len(order), 3000)
+    assert_equals(prev.cache_start_date, prev.start_date())
+    assert_equals(p.start_date(), datetime.date(2015, 1, 5))
+    assert prev.end_date() > datetime.date(2026, 1, 1)
+
+    # dependencies outside of the project are scheduled too
+    tOUT = gantt.Task(name='outside', start=datetime.date(2015, 1, 5), duration=5)
+    tIN = gantt.Task(name='inside', start=datetime.date(2015, 1, 5), duration=2, depends_of=[tOUT])
+    p2 = gantt.Project(name='Outside')
+    p2.add_task(tIN)
+    assert_equals(p2.schedule(), [tOUT, tIN])
+    assert_equals(tIN.cache_start_date, datetime.date(2015, 1, 12))
+
+    # circular dependencies
+    tA = gantt.Task(name='A', duration=2, depends_of=[tOUT])
+    tB = gantt.Task(name='B', duration=2, depends_of=[tA])
+    tA.add_depends([tB])
+    p3 = gantt.Project(name='Cycle')
+    p3.add_task(tA)
+    p3.add_task(tB)
+    try:
+        p3.schedule()
+    except ValueError as e:
+        assert 'A -> B -> A' in str(e) or 'B -> A -> B' in str(e)
+    else:
+        assert False, 'cycle not detected'
+    return
+
+
+def test_incremental_schedule():
+    tA = gantt.Task(name='iA', start=datetime.date(2015, 2, 2), duration=2)
+    tB = gantt.Task(name='iB', duration=3, depends_of=[tA])
+    tC = gantt.Task(name='iC', duration=1, depends_of=tB)
+    tD = gantt.Task(name='iD', start=datetime.date(2015, 2, 2), duration=2)
+    ms = gantt.Milestone(name='iMS', depends_of=[tC])
+    p = gantt.Project(name='Incremental')
+    for t in (tA, tB, tC, tD, ms):
+        p.add_task(t)
+    p.schedule()
+    assert_equals((tC.start_date(), tC.end_date()), (datetime.date(2015, 2, 9), datetime.date(2015, 2, 9)))
+
+    # progress does not change dates
+    tB.percent_done = 50
+    assert_equals(tC.cache_start_date, datetime.date(2015, 2, 9))
+
+    # only downstream tasks are dropped
+    tB.duration = 5
+    assert_equals(tA.cache_end_date, datetime.date(2015, 2, 3))
+    assert_equals(tD.cache_end_date, datetime.date(2015, 2, 3))
+    assert_equals((tB.cache_start_date, tC.cache_start_date, ms.cache_start_date), (None, None, None))
+    p.schedule()
+    assert_equals((tC.cache_start_date, ms.cache_start_date), (datetime.date(2015, 2, 11), datetime.date(2015, 2, 12)))
+
+    # new dependencies too
+    tE = gantt.Task(name='iE', start=datetime.date(2015, 2, 2), duration=10)
+    p.add_task(tE)
+    tC.add_depends(tE)
+    assert_equals(tB.cache_start_date, datetime.date(2015, 2, 4))
+    assert_equals(tC.cache_start_date, None)
+    p.schedule()
+    assert_equals(tC.cache_start_date, datetime.date(2015, 2, 16))
+    return
+
+
+def test_analyse_slack():
+    tA = gantt.Task(name='sA', start=datetime.date(2015, 3, 2), duration=5)
+    tB = gantt.Task(name='sB', start=datetime.date(2015, 3, 2), duration=2)
+    tC = gantt.Task(name='sC', duration=3, depends_of=[tA, tB])
+    ms = gantt.Milestone(name='sMS', depends_of=[tC])
+    tD = gantt.Task(name='sD', start=datetime.date(2015, 3, 2), duration=1)
+    # should be finished on 2015-03-05 but can not start before tA end
+    tY = gantt.Task(name='sY', stop=datetime.date(2015, 3, 5), duration=2, depends_of=[tA])
+    p = gantt.Project(name='Slack')
+    for t in (tA, tB, tC, ms, tD, tY):
+        p.add_task(t)
+
+    analysis = p.analyse_slack()
+    assert_equals(len(analysis), 6)
+    assert_equals(analysis.critical_tasks(), [tA, tC, ms])
+    assert_equals((analysis[tB].total_float, analysis[tB].free_float), (3, 3))
+    assert_equals(analysis[tB].late_start, datetime.date(2015, 3, 5))
+    assert_equals(analysis[tB].late_finish, datetime.date(2015, 3, 6))
+    assert_equals((analysis[tD].total_float, analysis[tD].free_float), (8, 8))
+    assert_equals(analysis[ms].late_start, datetime.date(2015, 3, 12))
+
+    # stop dates as deadlines
+    assert_equals((tY.start_date(), tY.end_date()), (datetime.date(2015, 3, 9), datetime.date(2015, 3, 10)))
+    assert_equals(analysis[tY].deadline_slack, -3)
+    assert_equals(analysis[tA].deadline_slack, -3)
+    assert_equals(analysis[tB].deadline_slack, None)
+    assert_equals([x.task for x in analysis.negative_slack()], [tA, tY])
+
+    p.make_svg_for_tasks(filename='./h.svg', highlight_critical_path=True)
+    assert os.path.isfile('./h.svg')
+    return
+
+
+def test_analyse_slack_after_milestone():
+    # successors placed from their stop date or their first dependency start
+    # the day after a milestone
+    for kwargs in ({'stop': datetime.date(2015, 2, 1)}, {}):
+        tA = gantt.Task(name='smA', start=datetime.date(2015, 3, 2), duration=1)
+        ms = gantt.Milestone(name='smMS', depends_of=[tA])
+        tB = gantt.Task(name='smB', duration=3, depends_of=[ms], **kwargs)
+        p = gantt.Project(name='Slack milestone')
+        for t in (tA, ms, tB):
+            p.add_task(t)
+
+        analysis = p.analyse_slack()
+        assert_equals(tB.start_date(), datetime.date(2015, 3, 4))
+        assert_equals(analysis.critical_tasks(), [tA, ms, tB])
+        assert_equals([analysis[t].total_float for t in (tA, ms, tB)], [0, 0, 0])
+    return
+
+
+def test_analyse_slack_stop_placed():
+    # a task placed from its stop date starts the day its dependencies end
+    # if they do not push it
+    t0 = gantt.Task(name='spA', start=datetime.date(2016, 2, 1), duration=3)
+    t1 = gantt.Task(name='spB', start=datetime.date(2016, 4, 8), stop=datetime.date(2016, 4, 15))
+    t2 = gantt.Task(name='spC', stop=datetime.date(2016, 4, 19), duration=3, depends_of=[t0, t1])
+    p = gantt.Project(name='Slack stop placed')
+    for t in (t0, t1, t2):
+        p.add_task(t)
+
+    analysis = p.analyse_slack()
+    assert_equals(t2.start_date(), datetime.date(2016, 4, 15))
+    assert_equals(analysis.critical_tasks(), [t1, t2])
+    for t in (t0, t1, t2):
+        assert_equals(analysis[t].total_float >= 0, True)
+        assert_equals(analysis[t].free_float <= analysis[t].total_float, True)
+    assert_equals(analysis[t0].total_float, analysis[t0].free_float)
+    return
+
+
+def test_schedule_with_numpy():
+    try:
+        import numpy
+    except ImportError:
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('numpy is not installed')
+
+    def build():
+        tA = gantt.Task(name='nA', start=datetime.date(2015, 4, 3), duration=4)
+        tB = gantt.Task(name='nB', start=datetime.date(2015, 4, 6), stop=datetime.date(2015, 4, 12), depends_of=[tA])
+        ms = gantt.Milestone(name='nMS', depends_of=[tA])
+        tC = gantt.Task(name='nC', duration=3, depends_of=[ms, tB])
+        tD = gantt.Task(name='nD', stop=datetime.date(2015, 4, 30), duration=5, depends_of=[tC])
+        tE = gantt.Task(name='nE', start=datetime.date(2015, 4, 7), duration=2.5, depends_of=[ms])
+        ms2 = gantt.Milestone(name='nMS2', start=datetime.date(2015, 4, 4), depends_of=[tE])
+        p = gantt.Project(name='Numpy')
+        for t in (tA, tB, ms, tC, tD, tE, ms2):
+            p.add_task(t)
+        return p
+
+    p1 = build()
+    p1.schedule()
+    p2 = build()
+    p2.schedule(engine=gantt.SCHEDULE_WITH_NUMPY)
+    dates = [(t.start_date(), t.end_date()) for t in p1.get_tasks()]
+    assert_equals([(t.start_date(), t.end_date()) for t in p2.get_tasks()], dates)
+    assert_equals(dates[3], (datetime.date(2015, 4, 13), datetime.date(2015, 4, 15)))
+
+    # only changed tasks are computed again
+    p1.get_tasks()[0].duration = 6
+    p1.schedule()
+    p2.get_tasks()[0].duration = 6
+    p2.schedule(engine=gantt.SCHEDULE_WITH_NUMPY)
+    dates = [(t.start_date(), t.end_date()) for t in p1.get_tasks()]
+    assert_equals([(t.start_date(), t.end_date()) for t in p2.get_tasks()], dates)
+    assert_equals(dates[3], (datetime.date(2015, 4, 14), datetime.date(2015, 4, 16)))
+    return
+
+
+def test_simulate():
+    try:
+        import numpy
+    except ImportError:
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('numpy is not installed')
+
+    tA = gantt.Task(name='mcA', start=datetime.date(2016, 3, 7), duration=5)
+    tB = gantt.Task(name='mcB', duration=3, depends_of=[tA])
+    tB.set_duration_distribution(3, 3, 3)
+    tC = gantt.Task(name='mcC', start=datetime.date(2016, 3, 7), duration=2)
+    tC.set_duration_distribution(1, 2, 20, law=gantt.DISTRIBUTION_PERT)
+    s1 = gantt.Project(name='MC1')
+    s1.add_task(tA)
+    s1.add_task(tB)
+    s2 = gantt.Project(name='MC2')
+    s2.add_task(tC)
+    p = gantt.Project(name='MC')
+    p.add_task(s1)
+    p.add_task(s2)
+
+    r = p.simulate(400, processes=1, seed=42, batch_size=100)
+    assert_equals(r.completion_dates(s1), {50: datetime.date(2016, 3, 16), 80: datetime.date(2016, 3, 16), 95: datetime.date(2016, 3, 16)})
+    dates = r.completion_dates()
+    assert_equals(dates[50] <= dates[80] <= dates[95] <= datetime.date(2016, 4, 1), True)
+    assert_equals(r.completion_date(100, s2) > datetime.date(2016, 3, 16), True)
+    assert_equals(r.criticality_index(tA), r.criticality_index(tB))
+    assert_equals(r.criticality_index(tA) + r.criticality_index(tC) >= 1, True)
+
+    # same samples in a pool of processes
+    r2 = p.simulate(400, processes=2, seed=42, batch_size=100)
+    assert_equals(r2.completion_dates(), dates)
+    assert_equals(r2.criticality_indices(), r.criticality_indices())
+
+    # a milestone without date nor dependency can not be scheduled
+    q = gantt.Project(name='MC unscheduled')
+    q.add_task(gantt.Task(name='mcD', start=datetime.date(2016, 3, 7), duration=2))
+    q.add_task(gantt.Milestone(name='mcMS'))
+    try:
+        q.simulate(10, processes=1)
+    except ValueError:
+        pass
+    else:
+        assert False, 'simulation should be refused'
+    return
+
+
+def test_scenarios():
+    rS = gantt.Resource('SCR')
+    tA = gantt.Task(name='scA', start=datetime.date(2016, 4, 4), duration=5, resources=[rS])
+    tB = gantt.Task(name='scB', duration=5, depends_of=[tA])
+    ms = gantt.Milestone(name='scMS', depends_of=[tB])
+    p = gantt.Project(name='Scenarios')
+    for t in (tA, tB, ms):
+        p.add_task(t)
+    assert_equals(p.end_date(), datetime.date(2016, 4, 18))
+
+    slip = gantt.Scenario(p, 'slip')
+    slip.delay(tA, 5)
+    assert_equals(slip.schedule(), [
+        (tA, datetime.date(2016, 4, 11), datetime.date(2016, 4, 15)),
+        (tB, datetime.date(2016, 4, 18), datetime.date(2016, 4, 22)),
+        (ms, datetime.date(2016, 4, 25), datetime.date(2016, 4, 25)),
+        ])
+    # the project is left unchanged
+    assert_equals((tA.start_date(), tA.end_date()), (datetime.date(2016, 4, 4), datetime.date(2016, 4, 8)))
+
+    off = gantt.Scenario(p, 'off')
+    off.add_vacations(rS, datetime.date(2016, 4, 6), datetime.date(2016, 4, 7))
+    assert_equals(off.task_dates(tA), (datetime.date(2016, 4, 8), datetime.date(2016, 4, 14)))
+    shorter = gantt.Scenario(p, 'shorter')
+    shorter.set_duration(tB, 2)
+
+    comparison = p.compare_scenarios([slip, off, shorter], processes=2)
+    assert_equals([(x.name, end, delta) for (x, end, delta) in comparison], [
+        ('slip', datetime.date(2016, 4, 25), 5),
+        ('off', datetime.date(2016, 4, 22), 4),
+        ('shorter', datetime.date(2016, 4, 13), -3),
+        ])
+    assert_equals(comparison.csv().split('\r\n')[2], '"slip";2016-04-25;5;')
+    return
+
+
+def test_project_indexes():
+    rA = gantt.Resource('IXA')
+    rB = gantt.Resource('IXB')
+    t1 = gantt.Task(name='ix1', start=datetime.date(2016, 5, 2), duration=2, resources=[rA])
+    t2 = gantt.Task(name='ix2', start=datetime.date(2016, 5, 2), duration=2, resources=[rB, rA])
+    t3 = gantt.Task(name='ix3', start=datetime.date(2016, 5, 2), duration=2, resources=[rB])
+    sub = gantt.Project(name='IXSUB')
+    p = gantt.Project(name='IX')
+    p.add_task(t1)
+    p.add_task(sub)
+    p.add_task(t3)
+    # subproject filled after being added
+    sub.add_task(t2)
+    sub.add_task(t1)
+    assert_equals(p.get_tasks(), [t1, t2, t3])
+    assert_equals(p.get_resources(), [rA, rB])
+    assert_equals(p.get_tasks_of_resource(rA), [t1, t2])
+    assert_equals(p.get_tasks_of_resource(rB), [t2, t3])
+    assert_equals(sub.get_tasks(), [t2, t1])
+    assert_equals([p.is_in_project(t3), sub.is_in_project(t3), sub.is_in_project(t2)], [True, False, True])
+    assert_equals(p.get_task('ix2'), t2)
+    assert_equals(sub.get_task('ix3'), None)
+
+    # resources do not keep the same task twice
+    rA.add_task(t1)
+    assert_equals(rA.tasks, [t1, t2])
+
+    # resources assigned after the task was added
+    rC = gantt.Resource('IXC')
+    t2.resources = [rC]
+    t3.resources = [rB, rC]
+    assert_equals(p.get_resources(), [rA, rC, rB])
+    assert_equals(p.get_tasks_of_resource(rA), [t1])
+    assert_equals(p.get_tasks_of_resource(rB), [t3])
+    assert_equals(p.get_tasks_of_resource(rC), [t2, t3])
+    assert_equals(sub.get_tasks_of_resource(rC), [t2])
+    assert_equals(rC.tasks, [t2, t3])
+    p.make_svg_for_resources('h.svg', today=datetime.date(2016, 5, 3))
+    assert_equals(open('h.svg').read().count('>ix2<'), 1)
+    return
+
+
+def test_project_cached_dates():
+    t1 = gantt.Task(name='cd1', start=datetime.date(2016, 6, 6), duration=2)
+    t2 = gantt.Task(name='cd2', duration=3, depends_of=[t1])
+    sub = gantt.Project(name='CDSUB')
+    sub.add_task(t2)
+    p = gantt.Project(name='CD')
+    p.add_task(t1)
+    p.add_task(sub)
+    assert_equals((p.start_date(), p.end_date(), p.nb_elements()), (datetime.date(2016, 6, 6), datetime.date(2016, 6, 10), 2))
+    assert_equals(p.cache_end_date, datetime.date(2016, 6, 10))
+
+    # changing a task drops cached dates of projects containing it and of
+    # projects containing tasks depending of it
+    other = gantt.Project(name='CDOTHER')
+    other.add_task(gantt.Task(name='cd3', start=datetime.date(2016, 6, 6), duration=1))
+    other.start_date()
+    t1.duration = 4
+    assert_equals((sub.cache_end_date, p.cache_end_date, p.cache_start_date), (None, None, None))
+    assert_equals(other.cache_start_date, datetime.date(2016, 6, 6))
+    assert_equals(p.end_date(), datetime.date(2016, 6, 14))
+
+    sub.add_task(gantt.Task(name='cd4', start=datetime.date(2016, 6, 20), duration=1))
+    assert_equals((p.end_date(), p.nb_elements()), (datetime.date(2016, 6, 20), 3))
+    return
+
+
+def test_render_keeps_cached_dates():
+    t1 = gantt.Task(name='rk1', start=datetime.date(2016, 6, 6), duration=2)
+    t2 = gantt.Task(name='rk2', duration=3, depends_of=[t1])
+    t3 = gantt.Task(name='rk3', duration=3, depends_of=[t2])
+    p = gantt.Project(name='RK')
+    for t in (t1, t2, t3):
+        p.add_task(t)
+    p.make_svg_for_tasks('./h.svg')
+    ends = [t1.cache_end_date, t2.cache_end_date]
+
+    # rendering again only computes the changed task and the ones after it
+    t3.duration = 5
+    p.make_svg_for_tasks('./h.svg')
+    assert_equals([t1.cache_end_date is ends[0], t2.cache_end_date is ends[1]], [True, True])
+    assert_equals(t3.end_date(), datetime.date(2016, 6, 17))
+    p.make_svg_for_resources('./h.svg')
+    p.make_outputs([gantt.Output(gantt.OUTPUT_TASKS, './h.svg')])
+    assert_equals([t1.cache_end_date is ends[0], t2.cache_end_date is ends[1]], [True, True])
+    return
+
+
+def test_context():
+    ctx = gantt.Context(not_worked_days=[6])
+    ctx.add_vacations(datetime.date(2016, 7, 8))
+    ctx.define_font_attributes(fill='red')
+    rC = gantt.Resource('CTXR')
+    tA = gantt.Task(name='ctxA', start=datetime.date(2016, 7, 1), duration=3, resources=[rC])
+    tB = gantt.Task(name='ctxB', duration=2, depends_of=[tA])
+    assert_equals(tA.end_date(), datetime.date(2016, 7, 5))
+
+    # saturdays are worked and 2016-07-08 is off in the project only
+    sub = gantt.Project(name='CTXSUB')
+    sub.add_task(tA)
+    sub.add_task(tB)
+    p = gantt.Project(name='CTX', context=ctx)
+    p.add_task(sub)
+    p.schedule()
+    assert_equals((tA.end_date(), tB.start_date(), tB.end_date()), (datetime.date(2016, 7, 4), datetime.date(2016, 7, 5), datetime.date(2016, 7, 6)))
+    tB.duration = 4
+    assert_equals(p.end_date(), datetime.date(2016, 7, 9))
+    assert_equals([rC.is_available(datetime.date(2016, 7, 8)), gantt.Resource('CTXS').is_available(datetime.date(2016, 7, 8))], [False, True])
+    assert_equals(gantt.gantt._working_days().is_worked(datetime.date(2016, 7, 2)), False)
+
+    svg, nb = tA.svg(start=datetime.date(2016, 7, 1), end=datetime.date(2016, 7, 31), color='#AAAAAA')
+    assert_equals('fill="red"' in svg.tostring(), True)
+    return
+
+
+def test_schedule_diagnostics():
+    tA = gantt.Task(name='dgA', start=datetime.date(2016, 8, 6), duration=2)
+    tB = gantt.Task(name='dgB', start=datetime.date(2016, 8, 8), duration=1, depends_of=[tA])
+    tC = gantt.Task(name='dgC', stop=datetime.date(2016, 8, 9), duration=2, depends_of=[tA])
+    p = gantt.Project(name='Diagnostics')
+    for t in (tA, tB, tC):
+        p.add_task(t)
+
+    # saturday 2016-08-06 is not worked
+    D = datetime.date
+    expected = [
+        ('dgA', gantt.DIAGNOSTIC_VACATIONS, D(2016, 8, 6), D(2016, 8, 8)),
+        ('dgB', gantt.DIAGNOSTIC_DEPENDENCIES, D(2016, 8, 8), D(2016, 8, 10)),
+        ('dgC', gantt.DIAGNOSTIC_LATE_START, D(2016, 8, 8), D(2016, 8, 10)),
+        ('dgC', gantt.DIAGNOSTIC_START_CHANGED, None, D(2016, 8, 10)),
+        ('dgC', gantt.DIAGNOSTIC_LATE_END, D(2016, 8, 9), D(2016, 8, 11)),
+        ]
+    assert_equals([(d.task.name, d.reason, d.old_date, d.new_date) for d in p.diagnostics()], expected)
+    assert_equals([d.task.name for d in p.diagnostics(gantt.DIAGNOSTIC_LATE_END)], ['dgC'])
+    tA.start = datetime.date(2016, 8, 1)
+    assert_equals([d.reason for d in p.diagnostics()], [gantt.DIAGNOSTIC_START_CHANGED])
+
+    for t in (tA, tB, tC):
+        t._reset_coord()
+    p.schedule(gantt.SCHEDULE_WITH_NUMPY)
+    assert_equals([d.reason for d in p.diagnostics()], [gantt.DIAGNOSTIC_START_CHANGED])
+
+    logger = logging.getLogger("Gantt")
+    nb_handlers = len(logger.handlers)
+    gantt.init_log_to_sysout(level=logging.CRITICAL)
+    assert_equals(len(logger.handlers), nb_handlers)
+    return
+
+
+def test_compact_objects():
+    color = ''.join(['#12', '3456'])
+    r = gantt.Resource(''.join(['CMP', 'R']))
+    tA = gantt.Task(name='cmpA', start=datetime.date(2016, 8, 1), duration=2, resources=[r], color=color)
+    tB = gantt.Task(name='cmpB', duration=2, depends_of=[tA], color='#123456')
+    m = gantt.Milestone(name='cmpM', depends_of=[tB])
+    for x in (r, tA, tB, m):
+        assert_equals(hasattr(x, '__dict__'), False)
+    assert_equals(tA.color is tB.color, True)
+    assert_equals(r.name is gantt.Resource('CMPR').name, True)
+
+    # drawing coordinates are only allocated once drawn
+    assert_equals((tA.drawn_x_begin_coord, tA._drawing), (None, None))
+    tA.svg(start=datetime.date(2016, 8, 1), end=datetime.date(2016, 8, 31))
+    assert_equals(tA.drawn_x_begin_coord is not None, True)
+    tA._reset_coord()
+    assert_equals((tA.drawn_y_coord, tA._drawing), (None, None))
+
+    assert_equals(m.start_date(), datetime.date(2016, 8, 5))
+    assert_equals(list(tA._successors), [tB])
+    tB.depends_of = None
+    assert_equals(len(tA._successors), 0)
+    return
+
+
+def test_memory_per_task():
+    # bytes allocated by task, measured with tracemalloc (python 3 only) :
+    # about 860 once built and 1140 once scheduled here, 1090 and 1350
+    # before tasks had __slots__
+    try:
+        import tracemalloc
+    except ImportError:
+        return
+    nb_tasks = 2000
+    resources = [gantt.Resource('MEM{0}'.format(i)) for i in range(50)]
+    p = gantt.Project(name='Memory')
+    tracemalloc.start()
+    try:
+        prev = None
+        for i in range(nb_tasks):
+            # colors read from a file are not the same strings
+            color = ''.join(['#80', '80FF'])
+            if prev is None:
+                t = gantt.Task(name='mem{0}'.format(i), start=datetime.date(2016, 1, 4), duration=3, resources=[resources[i % 50]], color=color)
+            else:
+                t = gantt.Task(name='mem{0}'.format(i), duration=3, depends_of=[prev], resources=[resources[i % 50]], color=color)
+            p.add_task(t)
+            prev = t if i % 100 else None
+        built = tracemalloc.get_traced_memory()[0]
+        p.schedule()
+        scheduled = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert_equals(built < nb_tasks * 1000, True)
+    assert_equals(scheduled < nb_tasks * 1250, True)
+    return
+
+
+def test_task_table():
+    rT = gantt.Resource('TBR')
+    table = gantt.TaskTable()
+    a = table.add_task('tbA', start=datetime.date(2016, 9, 2), duration=3, resources=[rT], color='#AAAAAA')
+    b = table.add_task('tbB', duration=2, depends_of=[a], resources=[rT])
+    c = table.add_task('tbC', stop=datetime.date(2016, 9, 8), duration=4, depends_of=[a], resources=[rT])
+    m = table.add_milestone('tbM', depends_of=[b, c])
+    assert_equals(len(table), 4)
+    assert_equals(table.index('tbC'), c)
+
+    # same dates as Task objects
+    tA = gantt.Task(name='tbA', start=datetime.date(2016, 9, 2), duration=3)
+    tB = gantt.Task(name='tbB', duration=2, depends_of=[tA])
+    tC = gantt.Task(name='tbC', stop=datetime.date(2016, 9, 8), duration=4, depends_of=[tA])
+    tM = gantt.Milestone(name='tbM', depends_of=[tB, tC])
+    table.schedule()
+    assert_equals([(table.start_date(i), table.end_date(i)) for i in (a, b, c, m)],
+                  [(t.start_date(), t.end_date()) for t in (tA, tB, tC, tM)])
+    assert_equals(table.start_day[c], tC.start_date().toordinal())
+
+    # Task objects are views of rows
+    p = gantt.Project(name='Table')
+    p.add_task_table(table)
+    vA = table.task(a)
+    assert_equals(p.get_tasks(), table.tasks())
+    assert_equals((vA.name, vA.duration, vA.color, vA.resources), ('tbA', 3, '#AAAAAA', [rT]))
+    assert_equals(isinstance(table.task(m), gantt.Milestone), True)
+    assert_equals(table.task(b).depends_of, [vA])
+    vA.duration = 1
+    tA.duration = 1
+    assert_equals(p.end_date(), tM.end_date())
+    q = gantt.Project(name='Objects')
+    for t in (tA, tB, tC, tM):
+        q.add_task(t)
+    assert_equals([(d.task.name, d.reason, d.old_date, d.new_date) for d in table.diagnostics()],
+                  [(d.task.name, d.reason, d.old_date, d.new_date) for d in q.diagnostics()])
+
+    assert_equals(table.search_for_task_overloads(rT), [(datetime.date(2016, 9, 5), datetime.date(2016, 9, 6), ['tbB', 'tbC'])])
+    assert_equals(table.csv().split('\r\n')[0], '"";"tbA";2016-09-02;2016-09-02;1;"TBR";')
+    try:
+        import numpy
+    except ImportError:
+        pass
+    else:
+        assert_equals(list(table.to_numpy()['end_day']), [t.end_date().toordinal() for t in (tA, tB, tC, tM)])
+
+    for (name, depends_of) in (('tbD', None), ('tbE', [10])):
+        try:
+            table.add_task(name, duration=2, depends_of=depends_of)
+        except ValueError:
+            pass
+        else:
+            assert False, 'row {0} should be refused'.format(name)
+    return
+
+
+def test_task_table_whole():
+    rT = gantt.Resource('TBWR')
+    table = gantt.TaskTable()
+    a = table.add_task('tbwA', start=datetime.date(2016, 9, 5), duration=2, resources=[rT])
+    b = table.add_task('tbwB', start=datetime.date(2016, 10, 3), duration=2)
+    tC = gantt.Task(name='tbwC', start=datetime.date(2016, 9, 1), duration=1, resources=[rT])
+    p = gantt.Project(name='Whole')
+    p.add_task(tC)
+    p.add_task_table(table)
+
+    # the table is one child of the project, no Task object is made for rows
+    assert_equals(p.tasks, [tC, table])
+    assert_equals((p.start_date(), p.end_date(), p.nb_elements()), (datetime.date(2016, 9, 1), datetime.date(2016, 10, 4), 3))
+    assert_equals(p.get_resources(), [rT])
+    p.make_svg_for_tasks('h.svg', start=datetime.date(2016, 10, 1), end=datetime.date(2016, 10, 10))
+    assert_equals(list(table._views), [b])
+
+    # rows added later are seen by the project
+    c = table.add_task('tbwD', duration=1, depends_of=[b])
+    assert_equals((p.end_date(), p.nb_elements()), (datetime.date(2016, 10, 5), 4))
+    assert_equals(p.get_task('tbwD'), table.task(c))
+    assert_equals(p.is_in_project(table.task(c)), True)
+    assert_equals(p.get_tasks_of_resource(rT), [tC, table.task(a)])
+    assert_equals(p.schedule(), [tC] + table.tasks())
+    return
+
+
+def test_task_table_mixed():
+    rT = gantt.Resource('TBMR')
+    gT = gantt.GroupOfResources('TBMG')
+    gT.add_resource(rT)
+    table = gantt.TaskTable()
+    a = table.add_task('tbmA', start=datetime.date(2016, 9, 5), duration=3, resources=[rT])
+    table.add_task('tbmB', start=datetime.date(2016, 9, 6), duration=1, resources=[rT])
+    tC = gantt.Task(name='tbmC', start=datetime.date(2016, 9, 7), duration=2, resources=[rT])
+
+    # resources see rows of tables they are assigned in with their tasks
+    overloads = [
+        (datetime.date(2016, 9, 6), datetime.date(2016, 9, 6), ['tbmA', 'tbmB']),
+        (datetime.date(2016, 9, 7), datetime.date(2016, 9, 7), ['tbmC', 'tbmA']),
+        ]
+    assert_equals(rT.search_for_task_overloads(), overloads)
+    assert_equals(gT.search_for_task_overloads(), overloads)
+    assert_equals(table.search_for_task_overloads(rT), overloads[:1])
+
+    # tasks can not depend of rows
+    for depends_of in ([table.task(a)], table.task(a)):
+        try:
+            gantt.Task(name='tbmD', duration=2, depends_of=depends_of)
+        except ValueError:
+            pass
+        else:
+            assert False, 'dependency on a row should be refused'
+    try:
+        tC.depends_of = [table.task(a)]
+    except ValueError:
+        pass
+    else:
+        assert False, 'dependency on a row should be refused'
+    return
+
+
+def test_level_resources():
+    rA = gantt.Resource('LVA')
+    rB = gantt.Resource('LVB')
+    rA.add_vacations(datetime.date(2015, 6, 3))
+    team = gantt.GroupOfResources('LVTEAM')
+    team.add_resource(rA)
+    team.add_resource(rB)
+    t1 = gantt.Task(name='lv1', start=datetime.date(2015, 6, 1), duration=2, resources=[rA])
+    t2 = gantt.Task(name='lv2', start=datetime.date(2015, 6, 1), stop=datetime.date(2015, 6, 2), resources=[rA])
+    t3 = gantt.Task(name='lv3', duration=2, depends_of=[t2], resources=[rB])
+    t4 = gantt.Task(name='lv4', start=datetime.date(2015, 6, 4), duration=1, resources=[team])
+    t5 = gantt.Task(name='lv5', start=datetime.date(2015, 6, 4), duration=1, resources=[rB])
+    t6 = gantt.Task(name='lv6', start=datetime.date(2015, 6, 1), duration=1)
+    p = gantt.Project(name='Leveling')
+    for t in (t1, t2, t3, t4, t5, t6):
+        p.add_task(t)
+
+    shifted = p.level_resources()
+    # lv2 is critical and goes first, LVA is on vacation on 3rd and LVTEAM
+    # is full on 4th with lv4 and lv5
+    assert_equals([(t.name, s, e) for (t, s, e) in shifted], [
+        ('lv1', datetime.date(2015, 6, 5), datetime.date(2015, 6, 8)),
+        ('lv3', datetime.date(2015, 6, 5), datetime.date(2015, 6, 8)),
+        ])
+    # tasks are left unchanged, the dates found can be given to them
+    assert_equals((t1.start, t1.duration, t2.stop), (datetime.date(2015, 6, 1), 2, datetime.date(2015, 6, 2)))
+    assert_equals(rA.search_for_task_conflicts() == {}, False)
+    for (t, start, end) in shifted:
+        t.duration = None
+        t.start = start
+        t.stop = end
+    assert_equals(p.level_resources(), [])
+    assert_equals(rA.search_for_task_conflicts(), {})
+    assert_equals(rB.search_for_task_conflicts(), {})
+    assert_equals(team.search_for_task_conflicts(), {})
+    return
+
+
+def test_level_resources_never_available():
+    rN = gantt.Resource('LVN')
+    rN.add_vacations(datetime.date(2016, 1, 1), repeat='+1d')
+    p = gantt.Project(name='Leveling never')
+    for name in ('lvnA', 'lvnB'):
+        p.add_task(gantt.Task(name=name, start=datetime.date(2016, 3, 7), duration=3, resources=[rN]))
+    try:
+        p.level_resources()
+    except ValueError:
+        pass
+    else:
+        assert False, 'leveling should stop'
+    return
+
+
+def test_search_for_task_overloads():
+    rA = gantt.Resource('OVA')
+    rB = gantt.Resource('OVB')
+    team = gantt.GroupOfResources('OVTEAM')
+    team.add_resource(rA)
+    team.add_resource(rB)
+    t1 = gantt.Task(name='ov1', start=datetime.date(2015, 7, 1), duration=10, resources=[rA])
+    t2 = gantt.Task(name='ov2', start=datetime.date(2015, 7, 3), duration=4, resources=[rA, rB])
+    t3 = gantt.Task(name='ov3', start=datetime.date(2015, 7, 6), duration=1, resources=[team])
+
+    # week end is not the begining of a run
+    assert_equals(rA.search_for_task_overloads(), [(datetime.date(2015, 7, 3), datetime.date(2015, 7, 8), ['ov1', 'ov2'])])
+    assert_equals(rA.search_for_task_overloads(dfrom=datetime.date(2015, 7, 4), dto=datetime.date(2015, 7, 7)),
+                  [(datetime.date(2015, 7, 6), datetime.date(2015, 7, 7), ['ov1', 'ov2'])])
+    assert_equals(rB.search_for_task_overloads(), [])
+    assert_equals(team.search_for_task_overloads(), [
+        (datetime.date(2015, 7, 3), datetime.date(2015, 7, 3), ['ov1', 'ov2', 'ov2']),
+        (datetime.date(2015, 7, 6), datetime.date(2015, 7, 6), ['ov1', 'ov2', 'ov2', 'ov3']),
+        (datetime.date(2015, 7, 7), datetime.date(2015, 7, 8), ['ov1', 'ov2', 'ov2']),
+        ])
+
+    # days API
+    assert_equals(sorted(rA.search_for_task_conflicts().keys()), [datetime.date(2015, 7, 3), datetime.date(2015, 7, 6), datetime.date(2015, 7, 7), datetime.date(2015, 7, 8)])
+    assert_equals(rB.search_for_task_conflicts(all_tasks=True)[datetime.date(2015, 7, 6)], ['ov2'])
+    assert_equals(rB.is_vacant(datetime.date(2015, 7, 9), datetime.date(2015, 7, 10)), ['OVB'])
+    return
+
+
+def test_find_free_slots():
+    rA = gantt.Resource('FSA')
+    rB = gantt.Resource('FSB')
+    rB.add_vacations(datetime.date(2015, 8, 5), datetime.date(2015, 8, 7))
+    team = gantt.GroupOfResources('FSTEAM')
+    team.add_resource(rA)
+    team.add_resource(rB)
+    t1 = gantt.Task(name='fs1', start=datetime.date(2015, 8, 3), duration=2, resources=[rA])
+    t2 = gantt.Task(name='fs2', start=datetime.date(2015, 8, 10), duration=5, resources=[rA])
+
+    assert_equals(rA.find_free_slots(3, datetime.date(2015, 8, 1)), [
+        (datetime.date(2015, 8, 5), datetime.date(2015, 8, 7)),
+        (datetime.date(2015, 8, 17), None),
+        ])
+    assert_equals(rA.find_free_slots(4, datetime.date(2015, 8, 1), datetime.date(2015, 8, 31)), [
+        (datetime.date(2015, 8, 17), datetime.date(2015, 8, 31)),
+        ])
+    assert_equals(team.find_free_slots(2, datetime.date(2015, 8, 3), datetime.date(2015, 8, 12)), [
+        (datetime.date(2015, 8, 3), datetime.date(2015, 8, 4), rB),
+        (datetime.date(2015, 8, 5), datetime.date(2015, 8, 7), rA),
+        (datetime.date(2015, 8, 10), datetime.date(2015, 8, 12), rB),
+        ])
+
+    # follows tasks changes
+    t1.duration = 4
+    assert_equals(rA.find_free_slots(1, datetime.date(2015, 8, 1), datetime.date(2015, 8, 14)), [
+        (datetime.date(2015, 8, 7), datetime.date(2015, 8, 7)),
+        ])
+    return
+
+
+def test_availability_matrix():
+    rA = gantt.Resource('AMA')
+    rB = gantt.Resource('AMB')
+    rB.add_vacations(datetime.date(2015, 9, 2))
+    team = gantt.GroupOfResources('AMTEAM')
+    team.add_resource(rA)
+    team.add_resource(rB)
+    t1 = gantt.Task(name='am1', start=datetime.date(2015, 9, 1), duration=2, resources=[rA])
+    t2 = gantt.Task(name='am2', start=datetime.date(2015, 9, 4), duration=1, resources=[team])
+    p = gantt.Project(name='Matrix')
+    p.add_task(t1)
+    p.add_task(t2)
+
+    m = p.availability_matrix(start=datetime.date(2015, 8, 31), end=datetime.date(2015, 9, 6), resources=[rA, rB, team])
+    F, B, V, N = gantt.AVAILABILITY_FREE, gantt.AVAILABILITY_BUSY, gantt.AVAILABILITY_VACATION, gantt.AVAILABILITY_NOT_WORKED
+    assert_equals(m.row(rA), [F, B, B, F, F, N, N])
+    assert_equals(m.row(rB), [F, F, V, F, F, N, N])
+    assert_equals(m.row(team), [F, F, B, F, F, N, N])
+    assert_equals(m.get(rB, datetime.date(2015, 9, 2)), V)
+    assert_equals(m.free_resources(datetime.date(2015, 9, 1)), [rB, team])
+
+    s = m.slice(resources=[team, rA], start=datetime.date(2015, 9, 2), end=datetime.date(2015, 9, 3))
+    assert_equals((s.nb_days, s.column(datetime.date(2015, 9, 2))), (2, [B, B]))
+    assert_equals(s.csv().split('\r\n')[:2], ['"Resource";2015-09-02;2015-09-03;', '"AMTEAM";B;F;'])
+
+    # by default, days of the project and its resources
+    assert_equals(p.availability_matrix().resources, [rA, team])
+    return
+
+
+def test_recurring_vacations():
+    rA = gantt.Resource('RVA')
+    # every monday of october
+    rA.add_vacations(datetime.date(2015, 10, 5), repeat='+1w', until=datetime.date(2015, 10, 31))
+    team = gantt.GroupOfResources('RVTEAM')
+    team.add_resource(rA)
+    # first day of each month
+    team.add_vacations(datetime.date(2015, 1, 1), repeat='++1m')
+    assert_equals([rA.is_available(datetime.date(2015, 10, d)) for d in (5, 6, 12, 26)], [False, True, False, False])
+    assert_equals(rA.is_available(datetime.date(2015, 11, 2)), True)
+    assert_equals(rA.is_available(datetime.date(2016, 3, 1)), False)
+    assert_equals(rA.find_free_slots(3, datetime.date(2015, 10, 1), datetime.date(2015, 10, 20)), [
+        (datetime.date(2015, 10, 6), datetime.date(2015, 10, 9)),
+        (datetime.date(2015, 10, 13), datetime.date(2015, 10, 16)),
+        ])
+
+    # global ones change worked days, every other friday till end of november
+    tA = gantt.Task(name='rv1', start=datetime.date(2015, 11, 2), duration=10)
+    assert_equals(tA.end_date(), datetime.date(2015, 11, 13))
+    gantt.add_vacations(datetime.date(2015, 11, 6), repeat='+2w', until=datetime.date(2015, 11, 30))
+    tA.duration = 10
+    assert_equals(tA.end_date(), datetime.date(2015, 11, 16))
+    assert_equals(gantt.Resource('RVB').is_available(datetime.date(2015, 11, 20)), False)
+    assert_equals(gantt.Resource('RVB').is_available(datetime.date(2015, 12, 4)), True)
+    return
+
+
+def test_recurring_vacations_with_numpy():
+    try:
+        import numpy
+    except ImportError:
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('numpy is not installed')
+
+    # repeated vacations are only computed for the longest chain of tasks,
+    # not for the sum of durations of independent ones
+    context = gantt.Context()
+    context.add_vacations(datetime.date(2016, 12, 26), datetime.date(2016, 12, 30), repeat='+1y')
+    p = gantt.Project(name='Recurring numpy', context=context)
+    for i in range(200):
+        p.add_task(gantt.Task(name='rvn{0}'.format(i), start=datetime.date(2016, 1, 4), duration=5000))
+    tA = gantt.Task(name='rvnA', start=datetime.date(2016, 1, 4), duration=300)
+    tB = gantt.Task(name='rvnB', duration=300, depends_of=[tA])
+    p.add_task(tA)
+    p.add_task(tB)
+    p.schedule(gantt.SCHEDULE_WITH_NUMPY)
+    assert_equals(tB.end_date(), datetime.date(2018, 5, 3))
+    return
+
+
+def test_svg_stream():
+    import re
+    rS = gantt.Resource('SVGR', fullname='SVG "R" & <co>')
+    tA = gantt.Task(name='svgA', start=datetime.date(2016, 9, 5), duration=3, resources=[rS], percent_done=50)
+    tB = gantt.Task(name='svgB <&>', duration=2, depends_of=[tA], resources=[rS])
+    m = gantt.Milestone(name='svgM', depends_of=[tB])
+    tC = gantt.Task(name='svgC', start=datetime.date(2016, 9, 5), duration=1, display=False)
+    sub = gantt.Project(name='svg sub')
+    sub.add_task(tB)
+    sub.add_task(gantt.Project(name='svg empty'))
+    p = gantt.Project(name='svg')
+    for x in (tA, sub, m, tC):
+        p.add_task(x)
+
+    def render(method, **kwargs):
+        getattr(p, method)('./h.svg', **kwargs)
+        with open('./h.svg') as f:
+            # markers ids are automatic
+            return re.sub('id[0-9]+', 'id', f.read())
+
+    for scale in (gantt.DRAW_WITH_DAILY_SCALE, gantt.DRAW_WITH_WEEKLY_SCALE):
+        kwargs = {'today': datetime.date(2016, 9, 6), 'scale': scale, 'highlight_critical_path': True}
+        svg = render('make_svg_for_tasks', **kwargs)
+        assert_equals(render('make_svg_for_tasks', renderer=gantt.RENDER_WITH_STREAM, **kwargs), svg)
+        assert_equals(svg.count('<g id="svgM">'), 1)
+    kwargs = {'end': datetime.date(2016, 9, 7)}
+    assert_equals(render('make_svg_for_tasks', renderer=gantt.RENDER_WITH_STREAM, **kwargs), render('make_svg_for_tasks', **kwargs))
+    svg = render('make_svg_for_resources')
+    assert_equals(render('make_svg_for_resources', renderer=gantt.RENDER_WITH_STREAM), svg)
+    return
+
+
+def test_svg_compact():
+    rC = gantt.Resource('CMPR')
+    rC.add_vacations(dfrom=datetime.date(2016, 9, 14))
+    tA = gantt.Task(name='cmpA', start=datetime.date(2016, 9, 12), duration=3, resources=[rC])
+    tB = gantt.Task(name='cmpB', duration=2, depends_of=[tA], resources=[rC])
+    m = gantt.Milestone(name='cmpM', depends_of=[tB])
+    p = gantt.Project(name='compact')
+    for x in (tA, tB, m):
+        p.add_task(x)
+
+    def render(method, **kwargs):
+        getattr(p, method)('./h.svg', **kwargs)
+        with open('./h.svg') as f:
+            return f.read()
+
+    kwargs = {'today': datetime.date(2016, 9, 13), 'highlight_critical_path': True}
+    plain = render('make_svg_for_tasks', **kwargs)
+    svg = render('make_svg_for_tasks', compact=True, **kwargs)
+    assert_equals(render('make_svg_for_tasks', compact=True, renderer=gantt.RENDER_WITH_STREAM, **kwargs), svg)
+    assert_equals(svg.count('<marker'), 1)
+    assert_equals('url(#gantt-dependency)' in svg, True)
+    assert_equals('<use' in svg and '<style' in svg and 'viewBox' in svg, True)
+    assert_equals(len(svg) < len(plain), True)
+    svg = render('make_svg_for_resources', compact=True)
+    assert_equals(render('make_svg_for_resources', compact=True, renderer=gantt.RENDER_WITH_STREAM), svg)
+    assert_equals('#gantt-day-mark' in svg, True)
+    return
+
+
+def test_svg_calendar_patterns():
+    ctx = gantt.Context(not_worked_days=[6])
+    ctx.add_vacations(datetime.date(2016, 9, 20), datetime.date(2016, 9, 22))
+    p = gantt.Project(name='calendar', context=ctx)
+    p.add_task(gantt.Task(name='calA', start=datetime.date(2016, 9, 12), duration=30))
+    p.make_svg_for_tasks('./h.svg', today=datetime.date(2016, 9, 13))
+    with open('./h.svg') as f:
+        svg = f.read()
+    # sundays are a pattern, vacations one rect, no lines of the grid
+    assert_equals(svg.count('<pattern'), 2)
+    assert_equals(svg.count('fill="gray"'), 2)
+    assert_equals(svg.count('<line'), 2)
+    p.make_svg_for_tasks('./h.svg', scale=gantt.DRAW_WITH_WEEKLY_SCALE)
+    with open('./h.svg') as f:
+        assert_equals(f.read().count('<pattern'), 1)
+    return
+
+
+def test_svg_tiles():
+    import shutil
+    tA = gantt.Task(name='tileA', start=datetime.date(2016, 9, 5), duration=2)
+    tB = gantt.Task(name='tileB', duration=5, depends_of=[tA])
+    tC = gantt.Task(name='tileC', start=datetime.date(2016, 9, 5), duration=1)
+    p = gantt.Project(name='tiles')
+    for x in (tA, tB, tC):
+        p.add_task(x)
+    tiles = p.make_svg_tiles('./tiles', size=4, scales=(gantt.DRAW_WITH_WEEKLY_SCALE, gantt.DRAW_WITH_DAILY_SCALE))
+    # 9 days, 2 lines of calendar and 5 lines from the title of the project
+    assert_equals(tiles, {0: (1, 2), 1: (3, 2)})
+
+    def tile(z, x, y):
+        with open(os.path.join('tiles', str(z), str(x), '{0}.svg'.format(y))) as f:
+            return f.read()
+
+    assert_equals('viewBox="0.0 0.0 ' in tile(1, 0, 0), True)
+    assert_equals('<g id="tileA">' in tile(1, 0, 0), True)
+    assert_equals('<g id="tileA">' in tile(1, 0, 1), False)
+    # tileB is drawn from day 2 to day 8 on line 4
+    assert_equals([x for x in range(3) if '<g id="tileB">' in tile(1, x, 1)], [0, 1, 2])
+    assert_equals('<g id="tileC">' in tile(1, 0, 1), True)
+    assert_equals('<g id="tileC">' in tile(1, 1, 1), False)
+    assert_equals('stroke-dasharray' in tile(1, 0, 1), True)
+    assert_equals('stroke-dasharray' in tile(1, 2, 1), False)
+    assert_equals('<g id="tileB">' in tile(0, 0, 1), True)
+    shutil.rmtree('./tiles')
+    return
+
+
+def test_svg_level_of_detail():
+    p = gantt.Project(name='lod')
+    for s in range(2):
+        sub = gantt.Project(name='lodsub{0}'.format(s))
+        for i in range(20):
+            sub.add_task(gantt.Task(name='lodt{0}_{1}'.format(s, i), start=datetime.date(2016, 6, 1) + datetime.timedelta(days=3*i), duration=2, percent_done=50))
+        p.add_task(sub)
+    p.make_svg_for_tasks('./h.svg', max_elements=40)
+    # 9 weeks and one summary bar by subproject
+    assert_equals(p._svg_level_of_detail(p.start_date(), p.end_date(), gantt.DRAW_WITH_DAILY_SCALE, 40), (gantt.DRAW_WITH_WEEKLY_SCALE, 0))
+    done, days = p.tasks[0]._progress()
+    assert_equals(done * 2, days)
+    # cached progress follows changes of tasks
+    p.tasks[0].tasks[0].percent_done = 100
+    assert_equals(p.tasks[0]._progress()[0] > done, True)
+    assert_equals(p._progress()[0] > done * 2, True)
+    p.tasks[0].tasks[0].percent_done = 50
+    with open('./h.svg') as f:
+        svg = f.read()
+    assert_equals('lodsub1 (20 tasks)' in svg, True)
+    assert_equals('<g id="lodt0_0">' in svg, False)
+    # everything fits
+    assert_equals(p._svg_level_of_detail(p.start_date(), p.end_date(), gantt.DRAW_WITH_DAILY_SCALE, 1000), (gantt.DRAW_WITH_DAILY_SCALE, None))
+    p.make_svg_for_tasks('./h.svg', max_elements=1000)
+    with open('./h.svg') as f:
+        assert_equals('<g id="lodt0_0">' in f.read(), True)
+    # 3 months and the project itself as a summary bar
+    assert_equals(p._svg_level_of_detail(p.start_date(), p.end_date(), gantt.DRAW_WITH_DAILY_SCALE, 5), (gantt.DRAW_WITH_MONTHLY_SCALE, -1))
+    p.make_svg_for_tasks('./h.svg', max_elements=5)
+    with open('./h.svg') as f:
+        assert_equals('lod (40 tasks)' in f.read(), True)
+    return
+
+
+def test_make_outputs():
+    import re
+    rO = gantt.Resource('OUTR')
+    tA = gantt.Task(name='outA', start=datetime.date(2016, 10, 3), duration=3, resources=[rO])
+    tB = gantt.Task(name='outB', duration=2, depends_of=[tA], resources=[rO])
+    p = gantt.Project(name='out')
+    p.add_task(tA)
+    p.add_task(tB)
+
+    def read(filename):
+        with open(filename) as f:
+            # markers ids are automatic
+            return re.sub('id[0-9]+', 'id', f.read())
+
+    today = datetime.date(2016, 10, 4)
+    p.make_svg_for_tasks('./h.svg', today=today, scale=gantt.DRAW_WITH_WEEKLY_SCALE)
+    tasks_svg = read('./h.svg')
+    conflicts = p.make_svg_for_resources('./h.svg', today=today)
+    resources_svg = read('./h.svg')
+
+    outputs = [
+        gantt.Output(gantt.OUTPUT_TASKS, './h_tasks.svg', scale=gantt.DRAW_WITH_WEEKLY_SCALE, today=today),
+        gantt.Output(gantt.OUTPUT_RESOURCES, './h_resources.svg', today=today),
+        gantt.Output(gantt.OUTPUT_CSV, './h.csv'),
+        ]
+    for processes in (1, 2):
+        results = p.make_outputs(outputs, processes=processes)
+        assert_equals(results[0], None)
+        assert_equals(results[1], conflicts)
+        assert_equals(read('./h_tasks.svg'), tasks_svg)
+        assert_equals(read('./h_resources.svg'), resources_svg)
+        assert_equals(os.path.exists('./h.csv'), True)
+        for filename in ('./h_tasks.svg', './h_resources.svg', './h.csv'):
+            os.remove(filename)
+
+    try:
+        gantt.Output('png', './h.png')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('unknown kind of output')
+    return
+
+
+def test_make_outputs_spawn():
+    import multiprocessing
+    import re
+    if not hasattr(multiprocessing, 'get_context'):
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('no start methods in this version of python')
+
+    # processes started with spawn do not inherit global vacations
+    gantt.add_vacations(datetime.date(2017, 5, 3), datetime.date(2017, 5, 4))
+    rO = gantt.Resource('OUTSR')
+    tA = gantt.Task(name='outsA', start=datetime.date(2017, 5, 1), duration=4, resources=[rO])
+    p = gantt.Project(name='outs')
+    p.add_task(tA)
+    # a long chain of dependencies is not pickled recursively
+    previous = tA
+    for i in range(3000):
+        previous = gantt.Task(name='outsC{0}'.format(i), duration=1, depends_of=[previous])
+        p.add_task(previous)
+
+    outputs = [
+        gantt.Output(gantt.OUTPUT_TASKS, './h_tasks.svg', end=datetime.date(2017, 5, 31)),
+        gantt.Output(gantt.OUTPUT_RESOURCES, './h_resources.svg', end=datetime.date(2017, 5, 31)),
+        ]
+    rendered = []
+    for method in (None, 'spawn'):
+        if method is not None:
+            gantt.gantt.multiprocessing = multiprocessing.get_context(method)
+        try:
+            p.make_outputs(outputs, processes=1 if method is None else 2)
+        finally:
+            gantt.gantt.multiprocessing = multiprocessing
+        svgs = []
+        for filename in ('./h_tasks.svg', './h_resources.svg'):
+            with open(filename) as f:
+                svgs.append(re.sub('id[0-9]+', 'id', f.read()))
+            os.remove(filename)
+        rendered.append(svgs)
+    assert_equals(rendered[1], rendered[0])
+    return
+
+
+def test_scenarios_spawn():
+    import multiprocessing
+    if not hasattr(multiprocessing, 'get_context'):
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('no start methods in this version of python')
+
+    # processes started with spawn do not inherit global vacations
+    gantt.add_vacations(datetime.date(2017, 6, 7), datetime.date(2017, 6, 9))
+    tA = gantt.Task(name='scsA', start=datetime.date(2017, 6, 5), duration=5)
+    p = gantt.Project(name='Scenarios spawn')
+    p.add_task(tA)
+    slip = gantt.Scenario(p, 'slip')
+    slip.delay(tA, 1)
+    longer = gantt.Scenario(p, 'longer')
+    longer.set_duration(tA, 6)
+
+    gantt.gantt.multiprocessing = multiprocessing.get_context('spawn')
+    try:
+        comparison = p.compare_scenarios([slip, longer], processes=2)
+    finally:
+        gantt.gantt.multiprocessing = multiprocessing
+    assert_equals([(x.name, end, delta) for (x, end, delta) in comparison], [
+        ('slip', datetime.date(2017, 6, 15), 1),
+        ('longer', datetime.date(2017, 6, 15), 1),
+        ])
+
+    # a long chain of dependencies is not pickled recursively
+    previous = tA
+    for i in range(3000):
+        previous = gantt.Task(name='scsC{0}'.format(i), duration=1, depends_of=[previous])
+        p.add_task(previous)
+    expected = [(x.name, end, delta) for (x, end, delta) in p.compare_scenarios([slip, longer], processes=1)]
+    gantt.gantt.multiprocessing = multiprocessing.get_context('spawn')
+    try:
+        comparison = p.compare_scenarios([slip, longer], processes=2)
+    finally:
+        gantt.gantt.multiprocessing = multiprocessing
+    assert_equals([(x.name, end, delta) for (x, end, delta) in comparison], expected)
+    assert_equals([delta for (x, end, delta) in comparison], [1, 1])
+    return
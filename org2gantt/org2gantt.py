@@ -76,6 +76,36 @@ def _iso_date_to_datetime(isodate):
         d = d[1]
     return "datetime.date({0}, {1}, {2})".format(y, m, d)
 
+
+def _parse_vacations(line):
+    """
+    Returns (start, end, repeat, until) for a vacation line, None if it is not
+    understood. Dates are iso strings or None.
+
+    A vacation is a date, or a range of dates (<2015-07-20>--<2015-07-24>).
+    With an org-mode repeater (+1w, ++1m, .+1y) vacations are repeated until
+    the next date on the line, if any.
+    """
+    dates = re.findall('[1-9][0-9]{3}-[0-9]{2}-[0-9]{2}', line)
+    repeater = re.search(r'(\.\+|\+\+|\+)[1-9][0-9]*[dwmy]', line)
+    if repeater is None:
+        if len(dates) == 2:
+            return (dates[0], dates[1], None, None)
+        elif len(dates) == 1:
+            return (dates[0], None, None, None)
+        return None
+
+    if len(dates) == 0:
+        return None
+    if len(dates) >= 2 and re.search(r'[>\]]--[<\[]', line) is not None:
+        start, end, others = dates[0], dates[1], dates[2:]
+    else:
+        start, end, others = dates[0], None, dates[1:]
+    until = None
+    if len(others) > 0:
+        until = others[0]
+    return (start, end, repeater.group(0), until)
+
 ############################################################################
 
 __LOG__ = None
@@ -275,12 +305,14 @@ def make_task_from_node(n, prop={}, prev_task=''):
         'svg': ('S',),
         'resource': ('r',),
         'availibility': ('a',),
+        'availibility_matrix': ('m',),
         'one_line_for_tasks': ('o',),
         'start_date': ('s',),
         'end_date': ('e',),
         'today': ('t',),
         'filter': ('f',),
         'scale': ('k',),
+        'parallel': ('p',),
         },
     extra = (
         clize.make_flag(
@@ -290,7 +322,7 @@ def make_task_from_node(n, prop={}, prev_task=''):
             ),
         )
     )
-def __main__(org, csv='', gantt='', start_date='', end_date='', today='', debug=False, resource=False, svg='project', filter='', availibility='', warning=False, one_line_for_tasks=False, scale='d'):
+def __main__(org, csv='', gantt='', start_date='', end_date='', today='', debug=False, resource=False, svg='project', filter='', availibility='', availibility_matrix='', warning=False, one_line_for_tasks=False, scale='d', parallel=False):
     """
     org2gantt.py
     
@@ -304,6 +336,8 @@ def __main__(org, csv='', gantt='', start_date='', end_date='', today='', debug=
 
     availibility: check resource availibility between start_date and end_date
 
+    availibility_matrix: filename for csv output of the availibility of every resource for each day between start_date and end_date
+
     one_line_for_tasks: generate graph for each resources with all tasks on the same line
 
     start_date: force start date for output or used for checking resource availibility (format : 'yyyy-mm-dd' or '-1w' (from today))
@@ -316,6 +350,8 @@ def __main__(org, csv='', gantt='', start_date='', end_date='', today='', debug=
 
     scale: scale for the graph (d: days, w: weeks, m: months, q: quaterly)
 
+    parallel: schedule once and render svg and csv outputs in parallel processes
+
     csv: filename for csv output
     
     debug: debug
@@ -581,13 +617,17 @@ import gantt
         # Vacations in body of node
         for line in r.body.split('\n'):
             if line.startswith('-'):
-                dates = re.findall('[1-9][0-9]{3}-[0-9]{2}-[0-9]{2}', line)
-                if len(dates) == 2:
-                    start, end = dates
-                    gantt_code += "{0}.add_vacations(dfrom={1}, dto={2})\n".format(rid, _iso_date_to_datetime(start), _iso_date_to_datetime(end))
-                elif len(dates) == 1:
-                    start = dates[0]
-                    gantt_code += "{0}.add_vacations(dfrom={1})\n".format(rid, _iso_date_to_datetime(start))
+                vacations = _parse_vacations(line)
+                if vacations is not None:
+                    start, end, repeat, until = vacations
+                    arguments = "dfrom={0}".format(_iso_date_to_datetime(start))
+                    if end is not None:
+                        arguments += ", dto={0}".format(_iso_date_to_datetime(end))
+                    if repeat is not None:
+                        arguments += ", repeat='{0}'".format(repeat)
+                    if until is not None:
+                        arguments += ", until={0}".format(_iso_date_to_datetime(until))
+                    gantt_code += "{0}.add_vacations({1})\n".format(rid, arguments)
                 
             else:
                 if line != '' and not line.strip().startswith(':'):
@@ -613,13 +653,17 @@ import gantt
     if n_vacations is not None:
         for line in n_vacations.body.split('\n'):
             if line.startswith('-'):
-                dates = re.findall('[1-9][0-9]{3}-[0-9]{2}-[0-9]{2}', line)
-                if len(dates) == 2:
-                    start, end = dates
-                    gantt_code += "gantt.add_vacations({0}, {1})\n".format(_iso_date_to_datetime(start), _iso_date_to_datetime(end))
-                elif len(dates) == 1:
-                    start = dates[0]
-                    gantt_code += "gantt.add_vacations({0})\n".format(_iso_date_to_datetime(start))
+                vacations = _parse_vacations(line)
+                if vacations is not None:
+                    start, end, repeat, until = vacations
+                    arguments = _iso_date_to_datetime(start)
+                    if end is not None:
+                        arguments += ", {0}".format(_iso_date_to_datetime(end))
+                    if repeat is not None:
+                        arguments += ", repeat='{0}'".format(repeat)
+                    if until is not None:
+                        arguments += ", until={0}".format(_iso_date_to_datetime(until))
+                    gantt_code += "gantt.add_vacations({0})\n".format(arguments)
 
             else:
                 if line != '':
@@ -858,7 +902,15 @@ import gantt
         gantt_code += "task_{0}.add_depends(depends_of={1})\n".format(name, dep)
 
 
-    if availibility == '':
+    # Outputs rendered together by project.make_outputs
+    outputs = []
+
+    if availibility == '' and parallel:
+        outputs.append("gantt.Output(gantt.OUTPUT_TASKS, '{3}.svg', today={0}, start={1}, end={2}, scale=gantt.{4})".format(planning_today_date, planning_start_date, planning_end_date, svg, scale_name))
+        if resource:
+            outputs.append("gantt.Output(gantt.OUTPUT_RESOURCES, '{4}_resources.svg', today={0}, start={1}, end={2}, one_line_for_tasks={3}, filter='{5}', scale=gantt.{6})".format(planning_today_date, planning_start_date, planning_end_date, one_line_for_tasks, svg, filter, scale_name))
+
+    elif availibility == '':
         # Full project
         gantt_code += "\n#### Outputs \n"
 
@@ -874,11 +926,29 @@ import gantt
         
 
 
-    if csv != '':
+    if csv != '' and parallel:
+        outputs.append("gantt.Output(gantt.OUTPUT_CSV, '{0}')".format(csv))
+
+    elif csv != '':
         gantt_code += "\n#### CSV Outputs \n"
         gantt_code += "project.csv('{0}')\n".format(csv)
 
 
+    if len(outputs) > 0:
+        gantt_code += "\n#### Outputs, scheduled once and rendered in parallel \n"
+        # processes of the pool may import this script again
+        gantt_code += "if __name__ == '__main__':\n"
+        gantt_code += "    project.make_outputs([\n"
+        for output in outputs:
+            gantt_code += "        {0},\n".format(output)
+        gantt_code += "        ])\n"
+
+
+    if availibility_matrix != '':
+        gantt_code += "\n#### Resources availibility for each day \n"
+        gantt_code += "project.availability_matrix(start={0}, end={1}).csv('{2}')\n".format(planning_start_date, planning_end_date, availibility_matrix)
+
+
     # write Gantt code
     if gantt == '':
         import gantt